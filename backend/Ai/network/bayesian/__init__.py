@@ -4,9 +4,11 @@ Bayesian Network learning system for Taskinator.
 This package provides a complete Bayesian Network implementation for learning
 user task preferences and predicting optimal scheduling times.
 
-Main entry point: UserBayesianNetwork class from bn_user_network module.
+Main entry point: UserBayesianNetwork class from bn_user_network module;
+bn_registry shares loaded networks across requests.
 """
 
 from .bn_user_network import UserBayesianNetwork
+from .bn_registry import BNRegistry, bn_registry
 
-__all__ = ["UserBayesianNetwork"]
+__all__ = ["UserBayesianNetwork", "BNRegistry", "bn_registry"]
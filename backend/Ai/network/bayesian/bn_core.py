@@ -12,10 +12,12 @@ Classes:
 """
 
 from __future__ import annotations
-from typing import Dict, List, Any, Optional, Callable, Tuple
-from collections import defaultdict
+from typing import Dict, Iterable, List, Any, Optional, Callable, Tuple
+from collections import defaultdict, deque
 import copy
 
+import numpy as np
+
 
 class BNNode:
     """
@@ -32,8 +34,11 @@ class BNNode:
         states: List of possible discrete values this node can take
         parents: List of parent BNNode objects
         cpt: Conditional Probability Table
+        historical_data: Learned statistics (set by bn_learning, optional)
     """
     
+    __slots__ = ("name", "states", "state_index", "parents", "cpt", "historical_data")
+    
     def __init__(
         self,
         name: str,
@@ -50,6 +55,7 @@ class BNNode:
         """
         self.name = name
         self.states = states
+        self.state_index = {state: i for i, state in enumerate(states)}
         self.parents = parents or []
         self.cpt: Optional[CPT] = None
     
@@ -57,6 +63,21 @@ class BNNode:
         """Attach a CPT to this node."""
         self.cpt = cpt
     
+    def fork(self) -> BNNode:
+        """
+        Copy of this node whose CPT can learn independently.
+        
+        States and parents are shared; the CPT is forked (see CPT.fork).
+        Learned historical_data is not copied.
+        """
+        clone = BNNode.__new__(BNNode)
+        clone.name = self.name
+        clone.states = self.states
+        clone.state_index = self.state_index
+        clone.parents = self.parents
+        clone.cpt = self.cpt.fork(clone) if self.cpt else None
+        return clone
+    
     def __repr__(self) -> str:
         parent_names = [p.name for p in self.parents]
         return f"BNNode({self.name}, states={self.states}, parents={parent_names})"
@@ -69,19 +90,38 @@ class CPT:
     Stores P(node=state | parent_values) for all combinations of node states
     and parent configurations. Supports both:
     - Explicit tables (dict-based lookup)
-    - Functional CPTs (computed on-the-fly via a function)
+    - Functional CPTs, compiled once into a dense array
+    
+    A functional CPT is evaluated over every parent configuration when it
+    is created; lookups then index `values` by state indices and only call
+    the function for configurations outside the node's states.
+    
+    Functional CPTs built with `history` mix a learned distribution into
+    their prior, linearly: with a non-empty historical distribution h,
+    P(state | parents) = func(state, parents, zeros) + weight * h.get(state, default).
+    set_history() applies that blend to the compiled array in one step.
     
     Attributes:
         node: The BNNode this CPT belongs to
         table: Explicit probability table (if not using a function)
         func: Optional function to compute probabilities dynamically
+        values: Compiled probabilities of a functional CPT, indexed by
+                (parent state indices..., node state index)
+        history: (weight, default) of the historical blend, or None
+        historical_dist: Learned distribution currently mixed in, or None
     """
     
+    __slots__ = (
+        "node", "table", "func", "history", "historical_dist",
+        "values", "_prior_values", "_history_base",
+    )
+    
     def __init__(
         self,
         node: BNNode,
         table: Optional[Dict[Tuple, Dict[str, float]]] = None,
-        func: Optional[Callable[[str, Dict[str, str]], float]] = None
+        func: Optional[Callable[..., float]] = None,
+        history: Optional[Tuple[float, float]] = None
     ):
         """
         Initialize a CPT.
@@ -91,15 +131,29 @@ class CPT:
             table: Explicit probability table:
                    {(parent1_val, parent2_val, ...): {node_state: probability}}
             func: Function that computes P(node_state | parent_values)
-                  Signature: func(node_state: str, parent_vals: Dict[str, str]) -> float
+                  Signature: func(node_state: str, parent_vals: Dict[str, str]) -> float,
+                  with a third historical_dist argument if `history` is given
+            history: (weight, default) of the historical blend func applies
+                     (see class docstring)
         
         Note: Either table or func must be provided, not both.
         """
         self.node = node
         self.table = table or {}
         self.func = func
-        
-        if not table and not func:
+        self.history = history
+        self.historical_dist: Optional[Dict[str, float]] = None
+        self.values: Optional[np.ndarray] = None
+        self._prior_values: Optional[np.ndarray] = None
+        self._history_base: Optional[np.ndarray] = None
+        
+        if func:
+            self._prior_values = self.compile()
+            if history:
+                zeros = {state: 0.0 for state in node.states}
+                self._history_base = self.compile(zeros)
+            self.values = self._prior_values
+        elif not table:
             # Initialize uniform distribution if nothing provided
             self._initialize_uniform()
     
@@ -137,6 +191,67 @@ class CPT:
         
         return _recurse(0)
     
+    def fork(self, node: BNNode) -> CPT:
+        """
+        Copy of this CPT for `node` (a fork of self.node).
+        
+        The compiled arrays are shared, not copied: they are never
+        modified in place (set_history() replaces `values`).
+        """
+        clone = CPT.__new__(CPT)
+        clone.node = node
+        clone.table = {config: dict(probs) for config, probs in self.table.items()}
+        clone.func = self.func
+        clone.history = self.history
+        clone.historical_dist = self.historical_dist
+        clone.values = self.values
+        clone._prior_values = self._prior_values
+        clone._history_base = self._history_base
+        return clone
+    
+    def _call(self, node_state: str, parent_values: Dict[str, str], historical_dist=None) -> float:
+        if self.history:
+            return self.func(node_state, parent_values, historical_dist)
+        return self.func(node_state, parent_values)
+    
+    def compile(self, historical_dist: Optional[Dict[str, float]] = None) -> np.ndarray:
+        """
+        Evaluate the CPT function over every parent configuration.
+        
+        Args:
+            historical_dist: Historical distribution passed to the function
+                             (CPTs with `history` only)
+        
+        Returns:
+            Array indexed by (parent state indices..., node state index)
+        """
+        shape = tuple(len(p.states) for p in self.node.parents) + (len(self.node.states),)
+        values = np.empty(shape)
+        parent_names = [p.name for p in self.node.parents]
+        # Combinations come in row-major order, like np.ndindex
+        for index, combo in zip(np.ndindex(*shape[:-1]), self._generate_parent_combinations()):
+            parent_values = dict(zip(parent_names, combo))
+            values[index] = [self._call(state, parent_values, historical_dist) for state in self.node.states]
+        return values
+    
+    def set_history(self, historical_dist: Optional[Dict[str, float]]) -> None:
+        """
+        Mix a learned distribution into a history-aware CPT.
+        
+        Args:
+            historical_dist: Distribution over the node's states, or
+                             None/empty to fall back to the prior
+        """
+        if not self.history:
+            return
+        self.historical_dist = historical_dist or None
+        if not historical_dist:
+            self.values = self._prior_values
+            return
+        weight, default = self.history
+        learned = np.array([historical_dist.get(state, default) for state in self.node.states])
+        self.values = self._history_base + weight * learned
+    
     def get_probability(
         self,
         node_state: str,
@@ -155,9 +270,15 @@ class CPT:
         Raises:
             KeyError: If configuration not found in table
         """
-        if self.func:
-            # Use functional CPT
-            return self.func(node_state, parent_values)
+        if self.values is not None:
+            try:
+                index = tuple(
+                    p.state_index[parent_values[p.name]] for p in self.node.parents
+                ) + (self.node.state_index[node_state],)
+            except KeyError:
+                # Missing or unknown value: let the function apply its defaults
+                return self._call(node_state, parent_values, self.historical_dist)
+            return float(self.values[index])
         
         # Build parent configuration tuple in same order as self.node.parents
         parent_config = tuple(
@@ -245,15 +366,35 @@ class BayesianNetwork:
     - Setting evidence (observed values)
     - Running inference queries
     
+    Structural metadata (children map, topological order, parent layout)
+    is kept alongside the nodes and only invalidated by add_node, so a
+    node's parents must not change once it is in the network.
+    
+    A complete network can serve as a template: instantiate() returns
+    light copies that share its nodes and structure.
+    
     Attributes:
         nodes: Dictionary mapping node names to BNNode objects
         evidence: Currently observed values for some nodes
     """
     
+    __slots__ = (
+        "nodes", "evidence", "_children", "_topological_order",
+        "_topological_position", "_parent_index", "_structure_key",
+    )
+    
     def __init__(self):
         """Initialize an empty Bayesian Network."""
         self.nodes: Dict[str, BNNode] = {}
         self.evidence: Dict[str, str] = {}
+        # parent name -> child names, in insertion order (parents may be
+        # added later); the lists are replaced, never appended to, because
+        # instantiate() shares them
+        self._children: Dict[str, List[str]] = {}
+        self._topological_order: Optional[Tuple[str, ...]] = None
+        self._topological_position: Optional[Dict[str, int]] = None
+        self._parent_index: Optional[Dict[str, Tuple[int, ...]]] = None
+        self._structure_key: Optional[Tuple] = None
     
     def add_node(self, node: BNNode) -> None:
         """
@@ -268,6 +409,13 @@ class BayesianNetwork:
         if node.name in self.nodes:
             raise ValueError(f"Node {node.name} already exists in network")
         self.nodes[node.name] = node
+        self._children = dict(self._children)
+        for parent in node.parents:
+            self._children[parent.name] = self._children.get(parent.name, []) + [node.name]
+        self._topological_order = None
+        self._topological_position = None
+        self._parent_index = None
+        self._structure_key = None
     
     def get_node(self, name: str) -> Optional[BNNode]:
         """Get a node by name."""
@@ -313,39 +461,124 @@ class BayesianNetwork:
         Returns:
             List of child BNNode objects
         """
-        children = []
-        for node in self.nodes.values():
-            if any(p.name == node_name for p in node.parents):
-                children.append(node)
-        return children
+        return [self.nodes[name] for name in self._children.get(node_name, ())]
     
-    def topological_sort(self) -> List[str]:
+    def topological_order(self) -> Tuple[str, ...]:
         """
-        Return nodes in topological order (parents before children).
+        Cached topological order (parents before children).
         
         Returns:
-            List of node names in topological order
+            Tuple of node names in topological order
         
         Raises:
             ValueError: If network contains cycles
         """
+        if self._topological_order is not None:
+            return self._topological_order
+        
         in_degree = {name: len(node.parents) for name, node in self.nodes.items()}
-        queue = [name for name, degree in in_degree.items() if degree == 0]
+        queue = deque(name for name, degree in in_degree.items() if degree == 0)
         result = []
         
         while queue:
-            current = queue.pop(0)
+            current = queue.popleft()
             result.append(current)
             
-            for child in self.get_children(current):
-                in_degree[child.name] -= 1
-                if in_degree[child.name] == 0:
-                    queue.append(child.name)
+            for child in self._children.get(current, ()):
+                in_degree[child] -= 1
+                if in_degree[child] == 0:
+                    queue.append(child)
         
         if len(result) != len(self.nodes):
             raise ValueError("Network contains cycles")
         
-        return result
+        self._topological_order = tuple(result)
+        return self._topological_order
+    
+    def topological_sort(self) -> List[str]:
+        """
+        Return nodes in topological order (parents before children).
+        
+        Returns:
+            List of node names in topological order
+        
+        Raises:
+            ValueError: If network contains cycles
+        """
+        return list(self.topological_order())
+    
+    def topological_position(self) -> Dict[str, int]:
+        """
+        Position of each node in topological_order().
+        
+        Raises:
+            ValueError: If network contains cycles
+        """
+        if self._topological_position is None:
+            self._topological_position = {name: i for i, name in enumerate(self.topological_order())}
+        return self._topological_position
+    
+    def parent_index(self) -> Dict[str, Tuple[int, ...]]:
+        """
+        Positions of each node's parents in topological_order().
+        
+        Returns:
+            Dictionary mapping node name -> parent positions, in the
+            order of node.parents
+        
+        Raises:
+            ValueError: If network contains cycles
+        """
+        if self._parent_index is None:
+            position = self.topological_position()
+            self._parent_index = {
+                name: tuple(position[p.name] for p in node.parents)
+                for name, node in self.nodes.items()
+            }
+        return self._parent_index
+    
+    def structure_key(self) -> Tuple:
+        """
+        Hashable description of the structure: node names, state counts
+        and parent names. Networks with equal keys share inference plans.
+        """
+        if self._structure_key is None:
+            self._structure_key = tuple(
+                (name, len(node.states), tuple(p.name for p in node.parents))
+                for name, node in self.nodes.items()
+            )
+        return self._structure_key
+    
+    def instantiate(self, private: Iterable[str] = ()) -> BayesianNetwork:
+        """
+        Light copy of this (template) network with its own evidence.
+        
+        Nodes, CPTs and structural metadata are shared with the template,
+        except the `private` nodes, which are forked (BNNode.fork) so their
+        CPTs can learn independently. Evidence starts empty. The template
+        must not be modified once it has been instantiated.
+        
+        Args:
+            private: Names of the nodes to fork
+        
+        Returns:
+            New BayesianNetwork
+        """
+        # Fill the caches once, so every instance shares them
+        self.parent_index()
+        self.structure_key()
+        
+        network = BayesianNetwork.__new__(BayesianNetwork)
+        network.nodes = dict(self.nodes)
+        for name in private:
+            network.nodes[name] = self.nodes[name].fork()
+        network.evidence = {}
+        network._children = self._children
+        network._topological_order = self._topological_order
+        network._topological_position = self._topological_position
+        network._parent_index = self._parent_index
+        network._structure_key = self._structure_key
+        return network
     
     def to_dict(self) -> Dict[str, Any]:
         """
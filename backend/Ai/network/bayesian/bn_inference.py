@@ -7,14 +7,22 @@ Provides algorithms for querying probabilities in a Bayesian Network:
 - Probability queries: computing P(node | evidence)
 
 This implementation uses simplified forward sampling and enumeration,
-suitable for small networks with discrete variables.
+suitable for small networks with discrete variables. Unobserved parents
+are filled with their most likely state, so distributions are an
+approximation of the true marginals.
+
+Exact marginals (exact=True on compute_node_distribution and
+infer_all_latent_nodes) come from variable elimination over factors
+compiled from the CPTs; see exact_node_distribution().
 """
 
 from __future__ import annotations
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, FrozenSet, List, Optional, Tuple
 from .bn_core import BayesianNetwork, BNNode
 import random
 
+import numpy as np
+
 
 def infer_most_likely_state(
     network: BayesianNetwork,
@@ -116,7 +124,8 @@ def compute_posterior_probability(
 
 def infer_all_latent_nodes(
     network: BayesianNetwork,
-    evidence: Optional[Dict[str, str]] = None
+    evidence: Optional[Dict[str, str]] = None,
+    exact: bool = False
 ) -> Dict[str, Tuple[str, float]]:
     """
     Infer most likely states for all nodes not in evidence.
@@ -127,6 +136,9 @@ def infer_all_latent_nodes(
     Args:
         network: The Bayesian Network
         evidence: Observed node values
+        exact: Use each node's exact marginal given the evidence (state
+               with the highest posterior and that posterior) instead of
+               chaining most likely states down the network
     
     Returns:
         Dictionary mapping node_name -> (most_likely_state, probability)
@@ -134,8 +146,15 @@ def infer_all_latent_nodes(
     full_evidence = {**network.evidence, **(evidence or {})}
     results = {}
     
+    if exact:
+        for node_name in network.nodes:
+            if node_name not in full_evidence:
+                distribution = exact_node_distribution(network, node_name, full_evidence)
+                results[node_name] = max(distribution.items(), key=lambda x: x[1])
+        return results
+    
     try:
-        ordered_nodes = network.topological_sort()
+        ordered_nodes = network.topological_order()
     except ValueError:
         # Fallback if network has issues
         ordered_nodes = list(network.nodes.keys())
@@ -153,7 +172,8 @@ def infer_all_latent_nodes(
 def compute_node_distribution(
     network: BayesianNetwork,
     node_name: str,
-    evidence: Optional[Dict[str, str]] = None
+    evidence: Optional[Dict[str, str]] = None,
+    exact: bool = False
 ) -> Dict[str, float]:
     """
     Compute full probability distribution P(node | evidence).
@@ -164,6 +184,8 @@ def compute_node_distribution(
         network: The Bayesian Network
         node_name: Name of the node to query
         evidence: Observed values
+        exact: Compute the exact marginal by variable elimination instead
+               of plugging in the most likely state of unobserved parents
     
     Returns:
         Dictionary mapping state -> probability
@@ -171,6 +193,9 @@ def compute_node_distribution(
     Raises:
         ValueError: If node doesn't exist
     """
+    if exact:
+        return exact_node_distribution(network, node_name, evidence)
+    
     node = network.get_node(node_name)
     if not node:
         raise ValueError(f"Node {node_name} not found")
@@ -198,6 +223,206 @@ def compute_node_distribution(
     return distribution
 
 
+# =============================================================================
+# Exact inference (variable elimination)
+# =============================================================================
+
+# A factor: its variables and an array with one axis per variable, indexed
+# by state index in node.states
+Factor = Tuple[Tuple[str, ...], np.ndarray]
+
+# (structure signature, query node, observed nodes) -> elimination order
+_elimination_orders: Dict[Tuple, Tuple[str, ...]] = {}
+
+
+def _relevant_nodes(network: BayesianNetwork, targets) -> List[str]:
+    """
+    Targets and all their ancestors, in topological order. Other nodes are
+    barren: summing them out of their own CPTs gives 1, so they can't
+    change the query.
+    """
+    order = network.topological_order()
+    parent_index = network.parent_index()
+    position = network.topological_position()
+    
+    relevant = [False] * len(order)
+    stack = [position[name] for name in targets]
+    while stack:
+        i = stack.pop()
+        if not relevant[i]:
+            relevant[i] = True
+            stack.extend(parent_index[order[i]])
+    return [name for name, keep in zip(order, relevant) if keep]
+
+
+def _elimination_order(
+    network: BayesianNetwork,
+    query: str,
+    observed: FrozenSet[str]
+) -> Tuple[str, ...]:
+    """
+    Order in which to sum out the hidden variables for a query.
+    
+    Greedy min-neighbors over the moral graph of the relevant nodes,
+    cached per network structure, query node and set of observed nodes.
+    
+    Args:
+        network: The Bayesian Network
+        query: Query node name
+        observed: Names of the observed nodes
+    
+    Returns:
+        Hidden node names in elimination order
+    """
+    key = (network.structure_key(), query, observed)
+    order = _elimination_orders.get(key)
+    if order is not None:
+        return order
+    
+    relevant = _relevant_nodes(network, {query} | observed)
+    hidden = [name for name in relevant if name != query and name not in observed]
+    
+    # Moral graph restricted to unobserved variables (evidence is sliced away)
+    free = set(hidden) | {query}
+    neighbors: Dict[str, set] = {name: set() for name in free}
+    for name in relevant:
+        family = {name, *(p.name for p in network.nodes[name].parents)} & free
+        for var in family:
+            neighbors[var] |= family - {var}
+    
+    order = []
+    remaining = list(hidden)
+    while remaining:
+        var = min(remaining, key=lambda v: len(neighbors[v]))
+        remaining.remove(var)
+        order.append(var)
+        for a in neighbors[var]:
+            neighbors[a] |= neighbors[var] - {a}
+            neighbors[a].discard(var)
+        del neighbors[var]
+    
+    order = tuple(order)
+    _elimination_orders[key] = order
+    return order
+
+
+def _compile_factor(network: BayesianNetwork, node: BNNode, evidence: Dict[str, str]) -> Factor:
+    """
+    Factor P(node | parents) with observed variables sliced away.
+    
+    Each parent configuration's row is normalized, as the approximate
+    routines normalize what they read from a CPT. Nodes without a CPT get
+    a uniform prior.
+    """
+    parents = [p.name for p in node.parents]
+    # Observed parents take only their observed state
+    domains = [
+        [evidence[p.name]] if p.name in evidence else p.states
+        for p in node.parents
+    ]
+    shape = tuple(len(d) for d in domains) + (len(node.states),)
+    
+    if not node.cpt:
+        values = np.full(shape, 1.0 / len(node.states))
+    else:
+        if node.cpt.values is not None:
+            # Compiled CPT: slice the observed parents' rows out of the array
+            rows = tuple(
+                slice(p.state_index[evidence[p.name]], p.state_index[evidence[p.name]] + 1)
+                if p.name in evidence else slice(None)
+                for p in node.parents
+            )
+            values = node.cpt.values[rows]
+        else:
+            values = np.empty(shape)
+            for index in np.ndindex(*shape[:-1]):
+                parent_values = {parents[i]: domains[i][k] for i, k in enumerate(index)}
+                values[index] = [node.cpt.get_probability(s, parent_values) for s in node.states]
+        totals = values.sum(axis=-1, keepdims=True)
+        values = np.divide(values, totals, out=np.zeros_like(values), where=totals > 0)
+    
+    if node.name in evidence:
+        values = values[..., node.state_index[evidence[node.name]]]
+        variables = tuple(parents)
+    else:
+        variables = tuple(parents) + (node.name,)
+    
+    # Drop the axes of observed parents (each has length 1)
+    keep = [i for i, v in enumerate(variables) if v not in evidence]
+    return tuple(variables[i] for i in keep), values.reshape([values.shape[i] for i in keep])
+
+
+def _sum_product(factors: List[Factor], out_vars: Tuple[str, ...]) -> Factor:
+    """Multiply factors and sum out every variable not in out_vars."""
+    ids: Dict[str, int] = {}
+    operands = []
+    for variables, values in factors:
+        operands.append(values)
+        operands.append([ids.setdefault(v, len(ids)) for v in variables])
+    result = np.einsum(*operands, [ids[v] for v in out_vars])
+    return out_vars, result
+
+
+def exact_node_distribution(
+    network: BayesianNetwork,
+    node_name: str,
+    evidence: Optional[Dict[str, str]] = None
+) -> Dict[str, float]:
+    """
+    Compute the exact marginal P(node | evidence) by variable elimination.
+    
+    Only the query, the observed nodes and their ancestors are compiled
+    into factors; the elimination order comes from _elimination_order().
+    
+    Args:
+        network: The Bayesian Network
+        node_name: Name of the node to query
+        evidence: Observed values (merged with network.evidence); values
+                  that are not states of their node are ignored
+    
+    Returns:
+        Dictionary mapping state -> probability (uniform if the evidence
+        has zero probability)
+    
+    Raises:
+        ValueError: If node doesn't exist
+    """
+    node = network.get_node(node_name)
+    if not node:
+        raise ValueError(f"Node {node_name} not found")
+    
+    full_evidence = {**network.evidence, **(evidence or {})}
+    if node_name in full_evidence:
+        return {
+            state: (1.0 if state == full_evidence[node_name] else 0.0)
+            for state in node.states
+        }
+    
+    # A value outside the node's states (a free-form task type, say) has no
+    # row in the compiled factors; that node is left unobserved
+    full_evidence = {
+        name: value for name, value in full_evidence.items()
+        if name not in network.nodes or value in network.nodes[name].state_index
+    }
+    observed = frozenset(name for name in full_evidence if name in network.nodes)
+    factors = [
+        _compile_factor(network, network.nodes[name], full_evidence)
+        for name in _relevant_nodes(network, {node_name} | observed)
+    ]
+    
+    for var in _elimination_order(network, node_name, observed):
+        involved = [f for f in factors if var in f[0]]
+        factors = [f for f in factors if var not in f[0]]
+        out_vars = tuple(dict.fromkeys(v for f in involved for v in f[0] if v != var))
+        factors.append(_sum_product(involved, out_vars))
+    
+    _, values = _sum_product(factors, (node_name,))
+    total = values.sum()
+    if total <= 0:
+        return {state: 1.0 / len(node.states) for state in node.states}
+    return {state: float(p / total) for state, p in zip(node.states, values)}
+
+
 def sample_network(
     network: BayesianNetwork,
     evidence: Optional[Dict[str, str]] = None,
@@ -220,7 +445,7 @@ def sample_network(
     full_evidence = {**network.evidence, **(evidence or {})}
     
     try:
-        ordered_nodes = network.topological_sort()
+        ordered_nodes = network.topological_order()
     except ValueError:
         ordered_nodes = list(network.nodes.keys())
     
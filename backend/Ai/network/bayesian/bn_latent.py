@@ -0,0 +1,122 @@
+"""
+Process-wide posterior table for the latent layer.
+
+Layer 2 (UserPersona, EnergyPattern, TaskBatchingPreference,
+PlanningHorizon) depends only on the six Layer 1 evidence nodes, and its
+CPTs are the fixed functions of bn_nodes.py, identical for every user.
+There are 5 x 4 x 4 x 4 x 4 x 3 = 3,840 evidence combinations, so the
+latent posteriors are a pure function of a small key: this module keeps
+them in one table shared by all users instead of re-running recursive
+inference on every prediction.
+
+Entries are computed on first use (or all at once with
+precompute_latent_table()) exactly as bn_inference would: each latent
+node's distribution over its states given its (observed) parents, and
+its most likely state with the unnormalized probability that
+infer_most_likely_state() reports.
+
+Networks whose evidence is not exactly the full Layer 1 set (partial
+evidence, or a latent node observed) have no table entry; callers fall
+back to bn_inference for those.
+"""
+
+from __future__ import annotations
+from itertools import product
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from .bn_core import BayesianNetwork
+
+EVIDENCE_NODES = (
+    "WorkdayWindow", "FocusPeakState", "DaysOffPattern",
+    "FlexibilityLevel", "DeadlineBehavior", "DurationPreference",
+)
+LATENT_NODES = ("UserPersona", "EnergyPattern", "TaskBatchingPreference", "PlanningHorizon")
+
+
+class LatentPosterior(NamedTuple):
+    """
+    Latent layer posterior for one evidence combination.
+
+    Attributes:
+        states: node -> (most likely state, its probability)
+        distributions: node -> normalized {state: probability}
+    """
+    states: Dict[str, Tuple[str, float]]
+    distributions: Dict[str, Dict[str, float]]
+
+
+# Evidence tuple (in EVIDENCE_NODES order) -> LatentPosterior
+_LATENT_TABLE: Dict[Tuple[str, ...], LatentPosterior] = {}
+
+
+def evidence_key(network: BayesianNetwork) -> Optional[Tuple[str, ...]]:
+    """
+    Table key of a network's evidence.
+
+    Returns:
+        Evidence values in EVIDENCE_NODES order, or None if the evidence
+        is not exactly the Layer 1 nodes
+    """
+    evidence = network.evidence
+    if len(evidence) != len(EVIDENCE_NODES):
+        return None
+    try:
+        return tuple(evidence[name] for name in EVIDENCE_NODES)
+    except KeyError:
+        return None
+
+
+def _compute(network: BayesianNetwork, key: Tuple[str, ...]) -> LatentPosterior:
+    """Evaluate the latent CPTs of `network` for evidence `key`."""
+    evidence = dict(zip(EVIDENCE_NODES, key))
+    states = {}
+    distributions = {}
+    for name in LATENT_NODES:
+        node = network.nodes[name]
+        parent_values = {p.name: evidence[p.name] for p in node.parents}
+        probs = {s: node.cpt.get_probability(s, parent_values) for s in node.states}
+
+        # First state wins ties, like infer_most_likely_state()
+        states[name] = max(probs.items(), key=lambda x: x[1])
+        total = sum(probs.values())
+        distributions[name] = {s: p / total for s, p in probs.items()} if total > 0 else probs
+    return LatentPosterior(states, distributions)
+
+
+def latent_posterior(network: BayesianNetwork) -> Optional[LatentPosterior]:
+    """
+    Look up the latent posterior for a network's current evidence.
+
+    Args:
+        network: A user preference network (structure of UserBayesianNetwork)
+
+    Returns:
+        The shared LatentPosterior (do not modify it), or None if the
+        network's evidence has no table entry (see evidence_key())
+    """
+    key = evidence_key(network)
+    if key is None:
+        return None
+    entry = _LATENT_TABLE.get(key)
+    if entry is None:
+        # Concurrent misses compute the same value; either write is fine
+        entry = _compute(network, key)
+        _LATENT_TABLE[key] = entry
+    return entry
+
+
+def precompute_latent_table(network: BayesianNetwork) -> int:
+    """
+    Fill the table for every Layer 1 evidence combination.
+
+    Args:
+        network: Any user preference network (only its structure and
+                 latent CPTs are used)
+
+    Returns:
+        Number of entries in the table
+    """
+    for key in product(*(network.nodes[name].states for name in EVIDENCE_NODES)):
+        if key not in _LATENT_TABLE:
+            _LATENT_TABLE[key] = _compute(network, key)
+    return len(_LATENT_TABLE)
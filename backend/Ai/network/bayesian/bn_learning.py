@@ -12,10 +12,12 @@ Learning Strategy:
 """
 
 from __future__ import annotations
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Optional
 from datetime import datetime
 from collections import defaultdict
 
+import numpy as np
+
 from .bn_core import BayesianNetwork, BNNode, CPT
 from .bn_nodes import PreferredTimeOfDay, PreferredDayType
 
@@ -59,6 +61,45 @@ def map_weekday_to_day_type(weekday: int) -> str:
         return PreferredDayType.WEEKEND.value
 
 
+HOURS_PER_WEEK = 7 * 24
+
+
+def hour_of_week(dt: datetime) -> int:
+    """
+    Map a datetime to its hour-of-week index [0-167].
+    
+    Args:
+        dt: Datetime to map
+    
+    Returns:
+        weekday * 24 + hour (0 = Monday 00:00, per Python weekday convention)
+    """
+    return dt.weekday() * 24 + dt.hour
+
+
+def hour_of_week_array(starts) -> np.ndarray:
+    """
+    Vectorized hour_of_week().
+    
+    Args:
+        starts: Array (or sequence) of datetime64 values or naive datetimes
+    
+    Returns:
+        Integer array of hour-of-week indices [0-167]
+    """
+    hours = np.asarray(starts, dtype="datetime64[us]").astype("datetime64[h]").astype(np.int64)
+    # 1970-01-01 (hour 0) was a Thursday, weekday 3
+    return (hours + 3 * 24) % HOURS_PER_WEEK
+
+
+def _decrement(counts: Dict, key) -> None:
+    """Decrement counts[key], removing the key at 0."""
+    if counts.get(key, 0) > 1:
+        counts[key] -= 1
+    else:
+        counts.pop(key, None)
+
+
 class HistoricalStatistics:
     """
     Tracks aggregated task statistics for learning.
@@ -72,10 +113,12 @@ class HistoricalStatistics:
         weekday_counts_by_type: Count of tasks on each weekday, per type
         duration_counts_by_type: Count of task durations, per type
         priority_counts_by_type: Count of priority levels, per type
+        version: Incremented on every change (used to invalidate derived caches)
     """
     
     def __init__(self):
         """Initialize empty statistics."""
+        self.version = 0
         self.task_type_counts: Dict[str, int] = defaultdict(int)
         
         # hour -> count
@@ -118,6 +161,7 @@ class HistoricalStatistics:
         if not start or not isinstance(start, datetime):
             return
         
+        self.version += 1
         self.task_type_counts[task_type] += 1
         self.hour_counts_by_type[task_type][start.hour] += 1
         self.weekday_counts_by_type[task_type][start.weekday()] += 1
@@ -139,20 +183,19 @@ class HistoricalStatistics:
         if not start or not isinstance(start, datetime):
             return
         
-        # Decrement counts (don't go below 0)
-        self.task_type_counts[task_type] = max(0, self.task_type_counts[task_type] - 1)
-        self.hour_counts_by_type[task_type][start.hour] = max(
-            0, self.hour_counts_by_type[task_type][start.hour] - 1
-        )
-        self.weekday_counts_by_type[task_type][start.weekday()] = max(
-            0, self.weekday_counts_by_type[task_type][start.weekday()] - 1
-        )
-        self.duration_counts_by_type[task_type][duration] = max(
-            0, self.duration_counts_by_type[task_type][duration] - 1
-        )
-        self.priority_counts_by_type[task_type][priority] = max(
-            0, self.priority_counts_by_type[task_type][priority] - 1
-        )
+        self.version += 1
+        
+        # Decrement counts, dropping those that reach 0 so the statistics
+        # match ones built from the remaining observations
+        _decrement(self.task_type_counts, task_type)
+        _decrement(self.hour_counts_by_type[task_type], start.hour)
+        _decrement(self.weekday_counts_by_type[task_type], start.weekday())
+        _decrement(self.duration_counts_by_type[task_type], duration)
+        _decrement(self.priority_counts_by_type[task_type], priority)
+        for counts in (self.hour_counts_by_type, self.weekday_counts_by_type,
+                       self.duration_counts_by_type, self.priority_counts_by_type):
+            if not counts[task_type]:
+                del counts[task_type]
     
     def get_time_of_day_distribution(self, task_type: str) -> Dict[str, float]:
         """
@@ -251,7 +294,8 @@ def update_network_from_statistics(
     Update CPT parameters for Layer 3 prediction nodes based on statistics.
     
     This modifies the CPTs to incorporate learned distributions from
-    observed tasks, blending with the priors from Layer 1/2.
+    observed tasks, blending with the priors from Layer 1/2 (a vectorized
+    update of the compiled CPT arrays, see CPT.set_history).
     
     Args:
         network: The Bayesian Network to update
@@ -274,6 +318,8 @@ def update_network_from_statistics(
             if not hasattr(node, 'historical_data'):
                 node.historical_data = {}
             node.historical_data['time_dist'] = time_dist
+            # Blend it into the compiled CPT
+            node.cpt.set_history(time_dist)
     
     # Update PreferredDayType distribution
     day_dist = stats.get_day_type_distribution(task_type)
@@ -284,6 +330,7 @@ def update_network_from_statistics(
             if not hasattr(node, 'historical_data'):
                 node.historical_data = {}
             node.historical_data['day_dist'] = day_dist
+            node.cpt.set_history(day_dist)
     
     # Update ExpectedDuration
     avg_duration = stats.get_average_duration(task_type)
@@ -306,9 +353,38 @@ def update_network_from_statistics(
             node.historical_data['common_priority'] = common_priority
 
 
+def refresh_task_type(
+    network: BayesianNetwork,
+    stats: HistoricalStatistics,
+    task_type: str
+) -> None:
+    """
+    Re-derive one task type's Layer 3 nodes from the current statistics.
+    
+    Unlike update_network_from_statistics() alone, this also returns the
+    nodes to their priors when the task type has no observations left.
+    It touches only that task type's nodes, so it costs the same whatever
+    the size of the history (use it after removing an observation).
+    
+    Args:
+        network: The Bayesian Network to update
+        stats: Accumulated statistics from observations
+        task_type: Task type whose nodes to refresh
+    """
+    for prefix in ("PreferredTimeOfDay", "PreferredDayType", "ExpectedDuration", "ExpectedPriority"):
+        node = network.get_node(f"{prefix}_{task_type}")
+        if node is None:
+            continue
+        if hasattr(node, 'historical_data'):
+            del node.historical_data
+        if node.cpt:
+            node.cpt.set_history(None)
+    update_network_from_statistics(network, stats, task_type)
+
+
 def recompute_all_cpts_from_observations(
     network: BayesianNetwork,
-    observations: List[Dict]
+    observations: Iterable[Dict]
 ) -> None:
     """
     Recompute all CPT parameters from scratch given all observations.
@@ -318,7 +394,7 @@ def recompute_all_cpts_from_observations(
     
     Args:
         network: The Bayesian Network
-        observations: List of all task observation dicts
+        observations: All task observation dicts
     """
     # Build statistics from all observations
     stats = HistoricalStatistics()
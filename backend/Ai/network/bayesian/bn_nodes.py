@@ -126,6 +126,11 @@ class PreferredDayType(str, Enum):
 # CPT Functions (Conditional Probability Tables)
 # =============================================================================
 
+# (weight, default) of the historical distribution mixed into the Layer 3
+# CPTs; default is used for states the distribution doesn't mention
+TIME_OF_DAY_HISTORY = (0.5, 0.0)
+DAY_TYPE_HISTORY = (0.6, 0.33)
+
 def cpt_user_persona(
     persona: str,
     parent_values: Dict[str, str]
@@ -350,15 +355,15 @@ def cpt_preferred_time_of_day(
         persona_probs = energy_probs  # Use energy as default
     
     # Historical data (if available)
-    hist_weight = 0.5 if historical_dist else 0.0
-    energy_weight = 0.4 + (0.5 if not historical_dist else 0.0)
+    hist_weight, hist_default = TIME_OF_DAY_HISTORY
+    energy_weight = 0.4 + (hist_weight if not historical_dist else 0.0)
     
     # Combine
     prob = energy_weight * energy_probs.get(time_of_day, 0.2)
     prob += persona_weight * persona_probs.get(time_of_day, 0.2)
     
     if historical_dist:
-        prob += hist_weight * historical_dist.get(time_of_day, 0.0)
+        prob += hist_weight * historical_dist.get(time_of_day, hist_default)
     
     return prob
 
@@ -391,8 +396,9 @@ def cpt_preferred_day_type(
     
     # Mix with historical if available
     if historical_dist:
+        hist_weight, hist_default = DAY_TYPE_HISTORY
         for dt in probs:
-            probs[dt] = 0.4 * probs[dt] + 0.6 * historical_dist.get(dt, 0.33)
+            probs[dt] = (1 - hist_weight) * probs[dt] + hist_weight * historical_dist.get(dt, hist_default)
     
     return probs.get(day_type, 0.33)
 
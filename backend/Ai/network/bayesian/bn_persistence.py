@@ -205,6 +205,23 @@ def bn_exists(user_id: int) -> bool:
     return get_bn_file_path(user_id).exists()
 
 
+def bn_version(user_id: int) -> Optional[tuple]:
+    """
+    Cheap version stamp of a user's saved BN (changes on every save).
+    
+    Args:
+        user_id: User ID
+    
+    Returns:
+        (mtime_ns, size) of the BN file, or None if there is no BN
+    """
+    try:
+        stat = get_bn_file_path(user_id).stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
 def delete_bn_state(user_id: int) -> bool:
     """
     Delete a user's BN state file.
@@ -0,0 +1,174 @@
+"""
+Process-wide registry of loaded user Bayesian Networks.
+
+Loading a UserBayesianNetwork parses the user's JSON file, rebuilds the
+network and replays every observation, and a single request used to do
+that several times (readiness check, scoring, the task hook). The
+registry keeps loaded networks in an LRU map keyed by user ID so they are
+loaded once and shared by every request of the worker.
+
+A cached network is only served while it still mirrors the file on disk:
+each network remembers the bn_version() (mtime, size) of the file it was
+loaded from or last saved, and a lookup whose file stamp differs (another
+worker saved, the retrain script ran, the file was deleted) reloads it.
+Networks mutated through the registry record their own saves, so they
+stay valid.
+
+Shared networks are not thread-safe on their own: use lease() (which
+holds the network's lock) to read or modify one.
+
+Capacity comes from BN_CACHE_MAX_ENTRIES and BN_CACHE_MAX_MB; the memory
+bound uses an estimate per network (BN_BASE_BYTES plus BN_OBSERVATION_BYTES
+per observation, measured on loaded networks).
+"""
+
+from __future__ import annotations
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from .bn_persistence import bn_version
+from .bn_user_network import UserBayesianNetwork
+
+BN_CACHE_MAX_ENTRIES = int(os.environ.get("BN_CACHE_MAX_ENTRIES", "512"))
+BN_CACHE_MAX_MB = float(os.environ.get("BN_CACHE_MAX_MB", "64"))
+
+BN_BASE_BYTES = 13_000
+BN_OBSERVATION_BYTES = 500
+
+
+def _approx_bytes(bn: UserBayesianNetwork) -> int:
+    return BN_BASE_BYTES + BN_OBSERVATION_BYTES * len(bn.observations)
+
+
+class BNRegistry:
+    """
+    Thread-safe LRU cache of UserBayesianNetwork instances.
+
+    Attributes:
+        max_entries: Networks kept before the least recently used is evicted
+        max_bytes: Estimated memory kept before evicting
+        hits: Lookups served from the cache
+        misses: Lookups that loaded a network not in the cache
+        invalidations: Lookups that reloaded a cached network whose file changed
+        evictions: Networks dropped to stay within the bounds
+    """
+
+    def __init__(self, max_entries: int = BN_CACHE_MAX_ENTRIES,
+                 max_bytes: int = int(BN_CACHE_MAX_MB * 1024 * 1024)):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[int, UserBayesianNetwork]" = OrderedDict()
+        self._sizes: Dict[int, int] = {}
+        self._load_locks: Dict[int, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _cached(self, user_id: int, version: Optional[tuple]) -> Optional[UserBayesianNetwork]:
+        """Cached network if it mirrors file `version` (call with _lock held)."""
+        bn = self._entries.get(user_id)
+        if bn is None or bn.file_version != version:
+            return None
+        self._entries.move_to_end(user_id)
+        self._sizes[user_id] = _approx_bytes(bn)
+        self.hits += 1
+        return bn
+
+    def get(self, user_id: int) -> UserBayesianNetwork:
+        """
+        Get a user's network, loading it if it isn't cached or is stale.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            Shared UserBayesianNetwork (untrained if the user has no BN
+            file); hold its lock, e.g. through lease(), while using it
+        """
+        version = bn_version(user_id)
+        with self._lock:
+            bn = self._cached(user_id, version)
+            if bn is not None:
+                return bn
+            load_lock = self._load_locks.setdefault(user_id, threading.Lock())
+
+        # One load per user at a time; other users load concurrently
+        with load_lock:
+            with self._lock:
+                bn = self._cached(user_id, bn_version(user_id))
+                if bn is not None:
+                    return bn
+
+            bn = UserBayesianNetwork(user_id)
+            with self._lock:
+                if user_id in self._entries:
+                    self.invalidations += 1
+                else:
+                    self.misses += 1
+                self._entries[user_id] = bn
+                self._entries.move_to_end(user_id)
+                self._sizes[user_id] = _approx_bytes(bn)
+                self._evict(keep=user_id)
+        return bn
+
+    @contextmanager
+    def lease(self, user_id: int) -> Iterator[UserBayesianNetwork]:
+        """
+        Use a user's network exclusively (get() plus the network's lock).
+
+        Args:
+            user_id: User ID
+
+        Yields:
+            The shared UserBayesianNetwork
+        """
+        bn = self.get(user_id)
+        with bn.lock:
+            yield bn
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop a user's network, e.g. after replacing its file wholesale."""
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._sizes.pop(user_id, None)
+
+    def clear(self) -> None:
+        """Drop every cached network."""
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._load_locks.clear()
+
+    def _evict(self, keep: int) -> None:
+        """Drop least recently used networks beyond the bounds (call with _lock held)."""
+        total = sum(self._sizes.values())
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries or total > self.max_bytes
+        ):
+            user_id = next(iter(self._entries))
+            if user_id == keep:
+                break
+            del self._entries[user_id]
+            total -= self._sizes.pop(user_id, 0)
+            self._load_locks.pop(user_id, None)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Counters and current size of the registry."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "approx_bytes": sum(self._sizes.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+            }
+
+
+bn_registry = BNRegistry()
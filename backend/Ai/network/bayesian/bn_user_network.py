@@ -21,10 +21,14 @@ Usage Example:
 """
 
 from __future__ import annotations
+import threading
+from itertools import count
 from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime, time as Time
 from models import UserPreferences
 
+import numpy as np
+
 from .bn_core import BayesianNetwork, BNNode, CPT
 from .bn_nodes import (
     # Layer 1 states
@@ -37,6 +41,7 @@ from .bn_nodes import (
     # CPT functions
     cpt_user_persona, cpt_energy_pattern, cpt_task_batching_pref,
     cpt_planning_horizon, cpt_preferred_time_of_day, cpt_preferred_day_type,
+    TIME_OF_DAY_HISTORY, DAY_TYPE_HISTORY,
     # Helper functions
     extract_workday_window_state, extract_focus_peak_state,
     extract_days_off_pattern, extract_duration_preference
@@ -46,13 +51,169 @@ from .bn_inference import (
     infer_all_latent_nodes, compute_map_assignment
 )
 from .bn_learning import (
-    HistoricalStatistics, update_network_from_statistics,
-    recompute_all_cpts_from_observations, map_hour_to_time_of_day
+    HistoricalStatistics, update_network_from_statistics, refresh_task_type,
+    recompute_all_cpts_from_observations, map_hour_to_time_of_day,
+    map_weekday_to_day_type, hour_of_week, hour_of_week_array, HOURS_PER_WEEK
 )
 from .bn_persistence import (
-    save_bn_state, load_bn_state, bn_exists, get_bn_file_path
+    save_bn_state, load_bn_state, bn_exists, get_bn_file_path, bn_version
+)
+from .bn_latent import latent_posterior
+
+
+# =============================================================================
+# Shared network template
+# =============================================================================
+
+TASK_TYPES = ("Meeting", "Training", "Studies")
+
+# Layer 3 nodes: the only ones whose CPTs learn per user
+LEARNED_NODES = tuple(
+    f"{prefix}_{task_type}"
+    for task_type in TASK_TYPES
+    for prefix in ("PreferredTimeOfDay", "PreferredDayType")
 )
 
+_template: Optional[BayesianNetwork] = None
+_template_lock = threading.Lock()
+
+
+def _build_template_network() -> BayesianNetwork:
+    """
+    Build the complete BN structure with all nodes and CPTs.
+    
+    Returns:
+        Initialized BayesianNetwork (no evidence, no learned data)
+    """
+    network = BayesianNetwork()
+    
+    # =================================================================
+    # LAYER 1: Evidence nodes (from UserPreferences)
+    # =================================================================
+    
+    workday_node = BNNode(
+        "WorkdayWindow",
+        [s.value for s in WorkdayWindowState],
+        parents=[]
+    )
+    network.add_node(workday_node)
+    
+    focus_node = BNNode(
+        "FocusPeakState",
+        [s.value for s in FocusPeakState],
+        parents=[]
+    )
+    network.add_node(focus_node)
+    
+    days_off_node = BNNode(
+        "DaysOffPattern",
+        [s.value for s in DaysOffPattern],
+        parents=[]
+    )
+    network.add_node(days_off_node)
+    
+    flexibility_node = BNNode(
+        "FlexibilityLevel",
+        [s.value for s in FlexibilityLevel],
+        parents=[]
+    )
+    network.add_node(flexibility_node)
+    
+    deadline_node = BNNode(
+        "DeadlineBehavior",
+        [s.value for s in DeadlineBehaviorType],
+        parents=[]
+    )
+    network.add_node(deadline_node)
+    
+    duration_pref_node = BNNode(
+        "DurationPreference",
+        [s.value for s in DurationPreference],
+        parents=[]
+    )
+    network.add_node(duration_pref_node)
+    
+    # =================================================================
+    # LAYER 2: Latent trait nodes
+    # =================================================================
+    
+    persona_node = BNNode(
+        "UserPersona",
+        [s.value for s in UserPersona],
+        parents=[flexibility_node, workday_node, days_off_node]
+    )
+    persona_node.set_cpt(CPT(persona_node, func=cpt_user_persona))
+    network.add_node(persona_node)
+    
+    energy_node = BNNode(
+        "EnergyPattern",
+        [s.value for s in EnergyPattern],
+        parents=[focus_node, workday_node]
+    )
+    energy_node.set_cpt(CPT(energy_node, func=cpt_energy_pattern))
+    network.add_node(energy_node)
+    
+    batching_node = BNNode(
+        "TaskBatchingPreference",
+        [s.value for s in TaskBatchingPreference],
+        parents=[duration_pref_node, flexibility_node]
+    )
+    batching_node.set_cpt(CPT(batching_node, func=cpt_task_batching_pref))
+    network.add_node(batching_node)
+    
+    horizon_node = BNNode(
+        "PlanningHorizon",
+        [s.value for s in PlanningHorizon],
+        parents=[deadline_node, flexibility_node]
+    )
+    horizon_node.set_cpt(CPT(horizon_node, func=cpt_planning_horizon))
+    network.add_node(horizon_node)
+    
+    # =================================================================
+    # LAYER 3: Task prediction nodes (one set per task type)
+    # =================================================================
+    
+    for task_type in TASK_TYPES:
+        # PreferredTimeOfDay for this task type
+        time_node = BNNode(
+            f"PreferredTimeOfDay_{task_type}",
+            [s.value for s in PreferredTimeOfDay],
+            parents=[energy_node, persona_node]
+        )
+        # Historical data is mixed in later (update_network_from_statistics)
+        time_node.set_cpt(CPT(time_node, func=cpt_preferred_time_of_day, history=TIME_OF_DAY_HISTORY))
+        network.add_node(time_node)
+        
+        # PreferredDayType for this task type
+        day_node = BNNode(
+            f"PreferredDayType_{task_type}",
+            [s.value for s in PreferredDayType],
+            parents=[days_off_node]
+        )
+        day_node.set_cpt(CPT(day_node, func=cpt_preferred_day_type, history=DAY_TYPE_HISTORY))
+        network.add_node(day_node)
+    
+    return network
+
+
+def network_template() -> BayesianNetwork:
+    """
+    The process-wide network template, built on first use.
+    
+    Structure and compiled CPTs are the same for every user, so they are
+    built once; users get light instances of it (see
+    BayesianNetwork.instantiate). The template itself must not be modified.
+    
+    Returns:
+        The shared template BayesianNetwork
+    """
+    global _template
+    if _template is None:
+        with _template_lock:
+            if _template is None:
+                _template = _build_template_network()
+    return _template
+
 
 class UserBayesianNetwork:
     """
@@ -68,11 +229,31 @@ class UserBayesianNetwork:
     Attributes:
         user_id: User identifier
         network: The underlying BayesianNetwork
-        observations: List of all task observations used for training
+        observations: Task observations used for training, keyed by task
+                      ID (observations without one get an ("untracked", n) key)
         statistics: Aggregated statistics for learning
         is_initialized: Whether network has been set up
+        file_version: bn_version() of the BN file this state was loaded
+                      from or last saved to (None if there was none)
+        lock: Guards the instance while it is shared (see bn_registry)
+        
+    Slot scores are compiled into per-task-type hour-of-week tables
+    (see score_table) and rebuilt only when evidence or statistics change.
+    Latent (Layer 2) states come from the process-wide table in bn_latent.
+    
+    Removing or replacing a task's observation adjusts the statistics in
+    place and refreshes only its task type's Layer 3 nodes.
+    
+    The network is an instance of the shared template (network_template):
+    per user it only holds the evidence and the learned Layer 3 nodes.
     """
     
+    __slots__ = (
+        "user_id", "network", "observations", "statistics", "is_initialized",
+        "file_version", "lock", "_score_tables", "_score_table_key",
+        "_untracked_keys", "_untracked",
+    )
+    
     def __init__(self, user_id: int):
         """
         Initialize user's BN (loads from disk if exists).
@@ -82,9 +263,19 @@ class UserBayesianNetwork:
         """
         self.user_id = user_id
         self.network: Optional[BayesianNetwork] = None
-        self.observations: List[Dict] = []
+        self.observations: Dict[Any, Dict] = {}
         self.statistics: HistoricalStatistics = HistoricalStatistics()
         self.is_initialized = False
+        self.file_version: Optional[tuple] = None
+        self.lock = threading.RLock()
+        
+        # task_type -> 168 hour-of-week scores, valid for _score_table_key
+        self._score_tables: Dict[str, List[float]] = {}
+        self._score_table_key: Optional[Tuple] = None
+        
+        # Keys for observations without a task ID, and how many are stored
+        self._untracked_keys = count()
+        self._untracked = 0
         
         # Try to load existing BN
         self._load_from_disk()
@@ -96,6 +287,8 @@ class UserBayesianNetwork:
         Returns:
             True if loaded successfully, False otherwise
         """
+        # Stamp before reading: a save racing with the read makes it stale
+        self.file_version = bn_version(self.user_id)
         if not bn_exists(self.user_id):
             return False
         
@@ -105,11 +298,13 @@ class UserBayesianNetwork:
         
         try:
             # Load observations
-            self.observations = data.get("observations", [])
+            self.observations = {}
+            for obs in data.get("observations", []):
+                self.observations[self._observation_key(obs)] = obs
             
             # Rebuild statistics from observations
             self.statistics = HistoricalStatistics()
-            for obs in self.observations:
+            for obs in self.observations.values():
                 self.statistics.add_observation(obs)
             
             # CRITICAL FIX: Rebuild the network structure
@@ -127,7 +322,7 @@ class UserBayesianNetwork:
             # Recompute learned CPTs from observations
             if self.observations:
                 from .bn_learning import recompute_all_cpts_from_observations
-                recompute_all_cpts_from_observations(self.network, self.observations)
+                recompute_all_cpts_from_observations(self.network, self.observations.values())
             
             self.is_initialized = True
             return True
@@ -163,173 +358,13 @@ class UserBayesianNetwork:
     
     def _build_network_structure(self) -> BayesianNetwork:
         """
-        Build the complete BN structure with all nodes and CPTs.
+        Build this user's network: an instance of the shared template with
+        its own evidence and its own copies of the learned Layer 3 nodes.
         
         Returns:
             Initialized BayesianNetwork
         """
-        network = BayesianNetwork()
-        
-        # =================================================================
-        # LAYER 1: Evidence nodes (from UserPreferences)
-        # =================================================================
-        
-        workday_node = BNNode(
-            "WorkdayWindow",
-            [s.value for s in WorkdayWindowState],
-            parents=[]
-        )
-        network.add_node(workday_node)
-        
-        focus_node = BNNode(
-            "FocusPeakState",
-            [s.value for s in FocusPeakState],
-            parents=[]
-        )
-        network.add_node(focus_node)
-        
-        days_off_node = BNNode(
-            "DaysOffPattern",
-            [s.value for s in DaysOffPattern],
-            parents=[]
-        )
-        network.add_node(days_off_node)
-        
-        flexibility_node = BNNode(
-            "FlexibilityLevel",
-            [s.value for s in FlexibilityLevel],
-            parents=[]
-        )
-        network.add_node(flexibility_node)
-        
-        deadline_node = BNNode(
-            "DeadlineBehavior",
-            [s.value for s in DeadlineBehaviorType],
-            parents=[]
-        )
-        network.add_node(deadline_node)
-        
-        duration_pref_node = BNNode(
-            "DurationPreference",
-            [s.value for s in DurationPreference],
-            parents=[]
-        )
-        network.add_node(duration_pref_node)
-        
-        # =================================================================
-        # LAYER 2: Latent trait nodes
-        # =================================================================
-        
-        persona_node = BNNode(
-            "UserPersona",
-            [s.value for s in UserPersona],
-            parents=[flexibility_node, workday_node, days_off_node]
-        )
-        persona_node.set_cpt(CPT(persona_node, func=cpt_user_persona))
-        network.add_node(persona_node)
-        
-        energy_node = BNNode(
-            "EnergyPattern",
-            [s.value for s in EnergyPattern],
-            parents=[focus_node, workday_node]
-        )
-        energy_node.set_cpt(CPT(energy_node, func=cpt_energy_pattern))
-        network.add_node(energy_node)
-        
-        batching_node = BNNode(
-            "TaskBatchingPreference",
-            [s.value for s in TaskBatchingPreference],
-            parents=[duration_pref_node, flexibility_node]
-        )
-        batching_node.set_cpt(CPT(batching_node, func=cpt_task_batching_pref))
-        network.add_node(batching_node)
-        
-        horizon_node = BNNode(
-            "PlanningHorizon",
-            [s.value for s in PlanningHorizon],
-            parents=[deadline_node, flexibility_node]
-        )
-        horizon_node.set_cpt(CPT(horizon_node, func=cpt_planning_horizon))
-        network.add_node(horizon_node)
-        
-        # =================================================================
-        # LAYER 3: Task prediction nodes (one set per task type)
-        # =================================================================
-        
-        for task_type in ["Meeting", "Training", "Studies"]:
-            # PreferredTimeOfDay for this task type
-            time_node = BNNode(
-                f"PreferredTimeOfDay_{task_type}",
-                [s.value for s in PreferredTimeOfDay],
-                parents=[energy_node, persona_node]
-            )
-            # CPT will be set with historical data later
-            time_node.set_cpt(CPT(time_node, func=lambda state, parents, tt=task_type: 
-                self._time_cpt_with_history(state, parents, tt)))
-            network.add_node(time_node)
-            
-            # PreferredDayType for this task type
-            day_node = BNNode(
-                f"PreferredDayType_{task_type}",
-                [s.value for s in PreferredDayType],
-                parents=[days_off_node]
-            )
-            day_node.set_cpt(CPT(day_node, func=lambda state, parents, tt=task_type:
-                self._day_cpt_with_history(state, parents, tt)))
-            network.add_node(day_node)
-        
-        return network
-    
-    def _time_cpt_with_history(
-        self,
-        state: str,
-        parent_values: Dict[str, str],
-        task_type: str
-    ) -> float:
-        """
-        CPT function for PreferredTimeOfDay that incorporates historical data.
-        
-        Args:
-            state: PreferredTimeOfDay state
-            parent_values: Parent node values
-            task_type: Task type
-        
-        Returns:
-            Probability
-        """
-        # Get historical distribution if available
-        hist_dist = None
-        if self.network:
-            node = self.network.get_node(f"PreferredTimeOfDay_{task_type}")
-            if node and hasattr(node, 'historical_data'):
-                hist_dist = node.historical_data.get('time_dist')
-        
-        return cpt_preferred_time_of_day(state, parent_values, hist_dist)
-    
-    def _day_cpt_with_history(
-        self,
-        state: str,
-        parent_values: Dict[str, str],
-        task_type: str
-    ) -> float:
-        """
-        CPT function for PreferredDayType that incorporates historical data.
-        
-        Args:
-            state: PreferredDayType state
-            parent_values: Parent node values
-            task_type: Task type
-        
-        Returns:
-            Probability
-        """
-        hist_dist = None
-        if self.network:
-            node = self.network.get_node(f"PreferredDayType_{task_type}")
-            if node and hasattr(node, 'historical_data'):
-                hist_dist = node.historical_data.get('day_dist')
-        
-        return cpt_preferred_day_type(state, parent_values, hist_dist)
+        return network_template().instantiate(LEARNED_NODES)
     
     def _set_evidence_from_preferences(self, prefs: UserPreferences) -> None:
         """
@@ -385,10 +420,13 @@ class UserBayesianNetwork:
         Update BN from a task observation (create/update).
         
         This adds the observation to history, updates statistics,
-        and recomputes Layer 3 CPTs.
+        and recomputes Layer 3 CPTs. An observation already stored for the
+        same task ID is replaced.
         
         Args:
             task_obs: Task observation dict with keys:
+                - task_id: int (optional; without it the observation can
+                  only be removed by an equal dict)
                 - user_id: int
                 - task_type: str
                 - priority: str
@@ -401,41 +439,171 @@ class UserBayesianNetwork:
             # (This shouldn't happen if enforcement is correct, but handle gracefully)
             return
         
-        # Add to observations
-        self.observations.append(task_obs)
+        self._store(task_obs, replaced=self._discard(task_obs, match_fields=False))
+    
+    def remove_task(self, task_obs: Dict) -> None:
+        """
+        Remove a task observation (for deletions).
+        
+        Args:
+            task_obs: Task observation dict (same format as update_from_task)
+        """
+        if not self.is_trained():
+            return
+        
+        removed = self._discard(task_obs)
+        if removed is None:
+            return
+        
+        refresh_task_type(self.network, self.statistics, removed.get("task_type", "Meeting"))
+        self._save_to_disk()
+    
+    def replace_task(self, before: Dict, after: Dict) -> None:
+        """
+        Replace a task's observation (for updates), saving once.
         
-        # Update statistics
+        Args:
+            before: Task observation before the change (same format as
+                    update_from_task); nothing is removed if it isn't stored
+            after: Task observation after the change
+        """
+        if not self.is_trained():
+            return
+        
+        self._store(after, replaced=self._discard(before))
+    
+    def _store(self, task_obs: Dict, replaced: Optional[Dict]) -> None:
+        """Add an observation, update the Layer 3 CPTs and save."""
+        # Add to observations and statistics
+        self.observations[self._observation_key(task_obs)] = task_obs
         self.statistics.add_observation(task_obs)
         
-        # Update Layer 3 CPTs
+        # Update Layer 3 CPTs of the task types involved
         task_type = task_obs.get("task_type", "Meeting")
-        update_network_from_statistics(self.network, self.statistics, task_type)
+        if replaced is None:
+            update_network_from_statistics(self.network, self.statistics, task_type)
+        else:
+            for affected in {replaced.get("task_type", "Meeting"), task_type}:
+                refresh_task_type(self.network, self.statistics, affected)
         
         # Save to disk
         self._save_to_disk()
     
-    def remove_task(self, task_obs: Dict) -> None:
+    def _observation_key(self, task_obs: Dict) -> Any:
+        """Key under which to store an observation in self.observations."""
+        task_id = task_obs.get("task_id")
+        if task_id is not None:
+            return task_id
+        self._untracked += 1
+        return ("untracked", next(self._untracked_keys))
+    
+    def _discard(self, task_obs: Dict, match_fields: bool = True) -> Optional[Dict]:
         """
-        Remove a task observation (for deletions).
+        Remove the stored observation of a task and its statistics.
+        
+        Looks the observation up by task ID. Observations stored without
+        one (files saved before observations carried IDs) are matched by
+        comparing the other fields, unless match_fields is False.
+        
+        Returns:
+            The removed observation, or None if it wasn't stored
+        """
+        removed = self.observations.pop(task_obs.get("task_id"), None)
+        if removed is None and match_fields and self._untracked:
+            fields = {k: v for k, v in task_obs.items() if k != "task_id"}
+            for key, obs in self.observations.items():
+                if isinstance(key, tuple) and obs == fields:
+                    removed = self.observations.pop(key)
+                    self._untracked -= 1
+                    break
+        if removed is not None:
+            self.statistics.remove_observation(removed)
+        return removed
+    
+    def _current_score_table_key(self) -> Tuple:
+        """Cache key covering everything the score tables depend on."""
+        evidence = tuple(sorted(self.network.evidence.items())) if self.network else ()
+        return (evidence, id(self.statistics), self.statistics.version)
+    
+    def score_table(self, task_type: str) -> List[float]:
+        """
+        Get the compiled slot score table for a task type.
+        
+        predict_slot_score only depends on (task_type, time-of-day bucket,
+        day type), so the scores for all 168 hours of the week are computed
+        with a single pair of distribution queries and cached until the
+        evidence or the historical statistics change.
         
         Args:
-            task_obs: Task observation dict (same format as update_from_task)
+            task_type: Type of task (Meeting/Training/Studies)
+        
+        Returns:
+            List of 168 scores in [0, 10], indexed by hour_of_week(slot_start)
         """
         if not self.is_trained():
-            return
+            return [5.0] * HOURS_PER_WEEK
+        
+        key = self._current_score_table_key()
+        if key != self._score_table_key:
+            self._score_tables = {}
+            self._score_table_key = key
+        
+        table = self._score_tables.get(task_type)
+        if table is None:
+            table = self._compile_score_table(task_type)
+            self._score_tables[task_type] = table
+        return table
+    
+    def _compile_score_table(self, task_type: str) -> List[float]:
+        """
+        Run BN inference once per task type and expand it to hour-of-week scores.
         
-        # Remove from statistics
-        self.statistics.remove_observation(task_obs)
+        Args:
+            task_type: Type of task (Meeting/Training/Studies)
         
-        # Rebuild from remaining observations
-        # (Simpler than trying to selectively update)
-        self.observations = [obs for obs in self.observations if obs != task_obs]
+        Returns:
+            List of 168 scores in [0, 10]
+        """
+        # Query PreferredTimeOfDay / PreferredDayType for this task type
+        time_dist = self._prediction_distribution(f"PreferredTimeOfDay_{task_type}")
+        day_dist = self._prediction_distribution(f"PreferredDayType_{task_type}")
+        
+        table: List[float] = []
+        for weekday in range(7):
+            day_prob = day_dist.get(map_weekday_to_day_type(weekday), 0.33)
+            for hour in range(24):
+                time_prob = time_dist.get(map_hour_to_time_of_day(hour), 0.2)
+                
+                # Weight: 60% time-of-day, 40% day-type, scaled to [0, 10]
+                score = (0.6 * time_prob + 0.4 * day_prob) * 10.0
+                table.append(max(0.0, min(10.0, score)))
+        return table
+    
+    def _prediction_distribution(self, node_name: str) -> Dict[str, float]:
+        """
+        Distribution of a Layer 3 node, with its latent parents taken from
+        the shared latent table (same result as compute_node_distribution).
         
-        # Recompute CPTs from scratch
-        recompute_all_cpts_from_observations(self.network, self.observations)
+        Args:
+            node_name: Layer 3 node name
         
-        # Save
-        self._save_to_disk()
+        Returns:
+            Dictionary mapping state -> probability
+        """
+        latent = latent_posterior(self.network)
+        if latent is None:
+            return compute_node_distribution(self.network, node_name)
+        
+        node = self.network.get_node(node_name)
+        parent_values = {
+            p.name: latent.states[p.name][0] if p.name in latent.states else self.network.evidence[p.name]
+            for p in node.parents
+        }
+        distribution = {s: node.cpt.get_probability(s, parent_values) for s in node.states}
+        total = sum(distribution.values())
+        if total > 0:
+            distribution = {s: p / total for s, p in distribution.items()}
+        return distribution
     
     def predict_slot_score(
         self,
@@ -461,37 +629,35 @@ class UserBayesianNetwork:
             # Return neutral score if not trained
             return 5.0
         
-        # Infer latent traits first (Layer 2)
-        latent_states = infer_all_latent_nodes(self.network)
-        
-        # Query PreferredTimeOfDay for this task type
-        time_node_name = f"PreferredTimeOfDay_{task_type}"
-        time_dist = compute_node_distribution(self.network, time_node_name)
-        
-        # Map slot time to PreferredTimeOfDay state
-        slot_time_state = map_hour_to_time_of_day(slot_start.hour)
-        
-        # Get probability for this time
-        time_prob = time_dist.get(slot_time_state, 0.2)
-        
-        # Query PreferredDayType
-        day_node_name = f"PreferredDayType_{task_type}"
-        day_dist = compute_node_distribution(self.network, day_node_name)
+        return self.score_table(task_type)[hour_of_week(slot_start)]
+    
+    def predict_slot_scores(
+        self,
+        task_type: str,
+        starts: np.ndarray,
+        ends: np.ndarray
+    ) -> np.ndarray:
+        """
+        Vectorized predict_slot_score for many slots of one task type.
         
-        # Map slot weekday to PreferredDayType
-        from .bn_learning import map_weekday_to_day_type
-        slot_day_state = map_weekday_to_day_type(slot_start.weekday())
-        day_prob = day_dist.get(slot_day_state, 0.33)
+        Slot starts are mapped to hour-of-week indices with array
+        arithmetic (weekday and hour, i.e. day type and time-of-day bucket)
+        and the scores are gathered from the compiled score table.
         
-        # Combine probabilities into score [0..10]
-        # Weight: 60% time-of-day, 40% day-type
-        combined_prob = 0.6 * time_prob + 0.4 * day_prob
+        Args:
+            task_type: Type of task (Meeting/Training/Studies)
+            starts: datetime64 array of slot starts
+            ends: datetime64 array of slot ends (same length)
         
-        # Scale to [0, 10]
-        score = combined_prob * 10.0
+        Returns:
+            Float array of scores in [0, 10]
+        """
+        if not self.is_trained():
+            return np.full(len(starts), 5.0)
+        if not len(starts):
+            return np.zeros(0)
         
-        # Clamp to valid range
-        return max(0.0, min(10.0, score))
+        return np.asarray(self.score_table(task_type))[hour_of_week_array(starts)]
     
     def get_status(self) -> Dict[str, Any]:
         """
@@ -514,7 +680,8 @@ class UserBayesianNetwork:
         
         if self.is_trained():
             # Infer current latent traits
-            latent = infer_all_latent_nodes(self.network)
+            posterior = latent_posterior(self.network)
+            latent = posterior.states if posterior else infer_all_latent_nodes(self.network)
             status["latent_traits"] = {
                 node: state for node, (state, prob) in latent.items()
                 if node in ["UserPersona", "EnergyPattern", "TaskBatchingPreference", "PlanningHorizon"]
@@ -532,11 +699,14 @@ class UserBayesianNetwork:
             save_bn_state(
                 user_id=self.user_id,
                 network_dict=network_dict,
-                observations=self.observations,
+                observations=list(self.observations.values()),
                 metadata={
                     "num_observations": len(self.observations),
                     "is_initialized": self.is_initialized
                 }
             )
+            self.file_version = bn_version(self.user_id)
         except Exception as e:
             print(f"[BN] Failed to save network for user {self.user_id}: {e}")
+            # Matches no file, so the registry reloads the saved state
+            self.file_version = ()
@@ -14,15 +14,25 @@ Functions:
     - remove_observation: Update BN from task deletion
     - update_observation: Update BN from task modification
     - score_bonus_for_slot: Get BN prediction for a time slot
+    - score_bonuses_for_slots: Batch form of score_bonus_for_slot
+
+Networks come from bn_registry, so each one is loaded from disk once per
+worker and reused until its file changes; every function holds the
+network's lock while it uses it.
 """
 
 from __future__ import annotations
 from datetime import datetime
 from typing import Optional, Dict
 from models import UserPreferences, db
+from services.logging_setup import get_logger
+
+import numpy as np
 
 # NEW: Bayesian Network system
-from .bayesian import UserBayesianNetwork
+from .bayesian import UserBayesianNetwork, bn_registry
+
+logger = get_logger(__name__)
 
 
 
@@ -60,8 +70,11 @@ def initialize_bn_for_user(user_id: int) -> bool:
         bn.initialize_from_preferences(prefs)
         return True
     except Exception as e:
-        print(f"[BN] Failed to initialize BN for user {user_id}: {e}")
+        logger.warning("[BN] Failed to initialize BN for user %s: %s", user_id, e)
         return False
+    finally:
+        # The next lookup loads the new file
+        bn_registry.invalidate(user_id)
 
 
 def is_bn_trained(user_id: int) -> bool:
@@ -75,8 +88,8 @@ def is_bn_trained(user_id: int) -> bool:
         True if BN exists and is trained, False otherwise
     """
     try:
-        bn = UserBayesianNetwork(user_id)
-        return bn.is_trained()
+        with bn_registry.lease(user_id) as bn:
+            return bn.is_trained()
     except Exception:
         return False
 
@@ -111,17 +124,17 @@ def ensure_bn_initialized(user_id: int) -> bool:
         return False
     
     # User has preferences but no BN → lazy initialization
-    print(f"[BN] Lazy initialization for user {user_id} (preferences exist, BN missing)")
+    logger.info("[BN] Lazy initialization for user %s (preferences exist, BN missing)", user_id)
     try:
         success = initialize_bn_for_user(user_id)
         if success:
-            print(f"[BN] Lazy initialization successful for user {user_id}")
+            logger.info("[BN] Lazy initialization successful for user %s", user_id)
             return True
         else:
-            print(f"[BN] Lazy initialization failed for user {user_id}")
+            logger.warning("[BN] Lazy initialization failed for user %s", user_id)
             return False
     except Exception as e:
-        print(f"[BN] Lazy initialization error for user {user_id}: {e}")
+        logger.warning("[BN] Lazy initialization error for user %s: %s", user_id, e)
         return False
 
 
@@ -136,8 +149,8 @@ def get_bn_status(user_id: int) -> Dict:
         Status dictionary with training info and metadata
     """
     try:
-        bn = UserBayesianNetwork(user_id)
-        return bn.get_status()
+        with bn_registry.lease(user_id) as bn:
+            return bn.get_status()
     except Exception as e:
         return {
             "user_id": user_id,
@@ -173,12 +186,12 @@ def score_bonus_for_slot(
         Score bonus in [0..3] range (to match old scoring scale)
     """
     try:
-        bn = UserBayesianNetwork(user_id)
-        if not bn.is_trained():
-            return 0.0
-        
-        # Get BN prediction [0..10]
-        bn_score = bn.predict_slot_score(task_type, slot_start, slot_end)
+        with bn_registry.lease(user_id) as bn:
+            if not bn.is_trained():
+                return 0.0
+            
+            # Get BN prediction [0..10]
+            bn_score = bn.predict_slot_score(task_type, slot_start, slot_end)
         
         # Normalize to [0..3] bonus range
         # BN score 0-10 maps to bonus -1 to +2
@@ -187,10 +200,42 @@ def score_bonus_for_slot(
         return max(-1.0, min(2.0, bonus))
     
     except Exception as e:
-        print(f"[BN] score_bonus_for_slot failed: {e}")
+        logger.warning("[BN] score_bonus_for_slot failed: %s", e)
         return 0.0
 
 
+def score_bonuses_for_slots(
+    user_id: int,
+    task_type: str,
+    slot_starts: np.ndarray,
+    slot_ends: np.ndarray,
+) -> np.ndarray:
+    """
+    Batch form of score_bonus_for_slot: one BN lookup for many slots.
+    
+    Args:
+        user_id: User ID
+        task_type: Type of task (Meeting/Training/Studies)
+        slot_starts: datetime64 array of slot starts
+        slot_ends: datetime64 array of slot ends (same length)
+    
+    Returns:
+        Float array of score bonuses in [-1..2] (zeros if the BN is not
+        trained or fails)
+    """
+    try:
+        with bn_registry.lease(user_id) as bn:
+            if not bn.is_trained():
+                return np.zeros(len(slot_starts))
+            bn_scores = bn.predict_slot_scores(task_type, slot_starts, slot_ends)
+        
+        return np.clip((bn_scores - 5.0) / 5.0 * 1.5, -1.0, 2.0)
+    
+    except Exception as e:
+        logger.warning("[BN] score_bonuses_for_slots failed: %s", e)
+        return np.zeros(len(slot_starts))
+
+
 
 # =============================================================================
 # Observation Management (BN Learning)
@@ -205,6 +250,7 @@ def record_observation(obs_dict: Dict) -> None:
     
     Args:
         obs_dict: Task observation dict with keys:
+            - task_id: int
             - user_id: int
             - task_type: str
             - priority: str
@@ -217,15 +263,15 @@ def record_observation(obs_dict: Dict) -> None:
         if not user_id:
             return
         
-        bn = UserBayesianNetwork(user_id)
-        if not bn.is_trained():
-            print(f"[BN] Cannot record observation: BN not trained for user {user_id}")
-            return
-        
-        bn.update_from_task(obs_dict)
+        with bn_registry.lease(user_id) as bn:
+            if not bn.is_trained():
+                logger.warning("[BN] Cannot record observation: BN not trained for user %s", user_id)
+                return
+            
+            bn.update_from_task(obs_dict)
     
     except Exception as e:
-        print(f"[BN] record_observation failed: {e}")
+        logger.warning("[BN] record_observation failed: %s", e)
 
 
 def remove_observation(obs_dict: Dict) -> None:
@@ -242,21 +288,22 @@ def remove_observation(obs_dict: Dict) -> None:
         if not user_id:
             return
         
-        bn = UserBayesianNetwork(user_id)
-        if not bn.is_trained():
-            return
-        
-        bn.remove_task(obs_dict)
+        with bn_registry.lease(user_id) as bn:
+            if not bn.is_trained():
+                return
+            
+            bn.remove_task(obs_dict)
     
     except Exception as e:
-        print(f"[BN] remove_observation failed: {e}")
+        logger.warning("[BN] remove_observation failed: %s", e)
 
 
 def update_observation(before_dict: Dict, after_dict: Dict) -> None:
     """
     Update BN when a task is modified (called on task PATCH/PUT).
     
-    This removes the old observation and adds the new one.
+    This replaces the task's observation (looked up by task ID) and
+    refreshes only the affected task types.
     
     Args:
         before_dict: Task state before update
@@ -267,16 +314,12 @@ def update_observation(before_dict: Dict, after_dict: Dict) -> None:
         if not user_id:
             return
         
-        bn = UserBayesianNetwork(user_id)
-        if not bn.is_trained():
-            return
-        
-        # Remove old observation
-        bn.remove_task(before_dict)
-        
-        # Add new observation
-        bn.update_from_task(after_dict)
+        with bn_registry.lease(user_id) as bn:
+            if not bn.is_trained():
+                return
+            
+            bn.replace_task(before_dict, after_dict)
     
     except Exception as e:
-        print(f"[BN] update_observation failed: {e}")
+        logger.warning("[BN] update_observation failed: %s", e)
 
@@ -1,10 +1,25 @@
 from __future__ import annotations
-from datetime import datetime, timedelta, time
-from typing import List, Dict, Optional
+import hashlib
+import heapq
+import logging
+from bisect import bisect_right
+from functools import wraps
+from itertools import islice
+from time import perf_counter
+from datetime import date, datetime, timedelta, time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
 
 from models import Task, UserPreferences, db
 # NEW: Bayesian Network scoring (replaces old statistical bonus)
-from Ai.network.bayesian import UserBayesianNetwork
+from Ai.network.bayesian import UserBayesianNetwork, bn_registry
+from Ai.network.bayesian.bn_learning import hour_of_week, HOURS_PER_WEEK
+from Ai.network.bayesian.bn_persistence import bn_version
+from services.suggestion_cache import suggestion_cache, schedule_version
+from services.logging_setup import get_logger
+
+logger = get_logger(__name__)
 
 
 # ---------- internal helpers ----------
@@ -39,88 +54,1044 @@ def _is_day_off(dt: datetime, days_off: List[int]) -> bool:
     return our in days_off
 
 
-def _load_busy_intervals(user_id: int) -> List[tuple[datetime, datetime]]:
-    """Collect existing scheduled intervals from tasks."""
-    busy: List[tuple[datetime, datetime]] = []
-    q = db.session.query(Task).filter(Task.user_id == user_id)
-    task_count = 0
-    for t in q:
-        task_count += 1
-        start: Optional[datetime] = getattr(t, "scheduled_start", None)
-        end: Optional[datetime] = getattr(t, "scheduled_end", None)
+# Legacy (due_date only) tasks due this long before a range are only read
+# if their duration could still reach into it
+BUSY_LOOKBACK = timedelta(days=7)
+
+
+def _load_busy_intervals(
+    user_id: int,
+    window_start: Optional[datetime] = None,
+    window_end: Optional[datetime] = None,
+) -> List[tuple[datetime, datetime]]:
+    """
+    Collect scheduled intervals from the user's tasks.
+
+    Only the columns needed for an interval are selected (no Task objects
+    are built), and with a range only tasks that can overlap it are read,
+    so the cost depends on the range rather than on the user's history:
+    scheduled tasks are read through ix_task_user_end (tasks that ended
+    before the range are never visited, however long ago they started),
+    legacy tasks when due within BUSY_LOOKBACK of the range or lasting
+    longer than that.
+
+    Args:
+        user_id: User whose tasks to read
+        window_start: Optional start of the range of interest
+        window_end: Optional end of the range of interest
+
+    Returns:
+        (start, end) of every scheduled task overlapping the range (all
+        tasks without a range); legacy tasks with only a due_date span
+        due_date + duration_minutes (60 if unset)
+    """
+    scheduled = db.and_(Task.scheduled_start.isnot(None), Task.scheduled_end.isnot(None))
+    legacy = db.and_(Task.scheduled_start.is_(None), Task.due_date.isnot(None))
+    if window_start is not None and window_end is not None:
+        # Bounded by end only, so the range scan is on ix_task_user_end
+        # (the start bound would let SQLite pick ix_task_user_start and read
+        # all history); later tasks are dropped in the loop below
+        scheduled = db.and_(Task.scheduled_start.isnot(None), Task.scheduled_end > window_start)
+        legacy = db.and_(
+            legacy,
+            Task.due_date < window_end,
+            db.or_(
+                Task.due_date >= window_start - BUSY_LOOKBACK,
+                Task.duration_minutes > BUSY_LOOKBACK // timedelta(minutes=1),
+            ),
+        )
+
+    # One branch per kind of task, so each is an index range scan
+    columns = (Task.scheduled_start, Task.scheduled_end, Task.due_date, Task.duration_minutes)
+    rows = (
+        db.session.query(*columns).filter(Task.user_id == user_id, scheduled)
+        .union_all(db.session.query(*columns).filter(Task.user_id == user_id, legacy))
+    )
 
+    busy: List[tuple[datetime, datetime]] = []
+    for start, end, due_date, duration in rows:
         # Fallbacks: if only due_date exists (legacy)
-        if not start and getattr(t, "due_date", None):
-            dd = t.due_date
-            if isinstance(dd, datetime):
-                start = dd
-                dur = getattr(t, "duration_minutes", None) or 60
-                end = start + timedelta(minutes=int(dur))
-
-        if start and end:
-            busy.append((start, end))
-            print(f"[BUSY INTERVALS] Task {task_count} (ID={t.id}): {start} to {end}")
-        else:
-            print(f"[BUSY INTERVALS] Task {task_count} (ID={t.id}): No schedule (skipped)")
-    
-    print(f"[BUSY INTERVALS] Total: {len(busy)} scheduled intervals found")
+        if start is None:
+            start = due_date
+            end = due_date + timedelta(minutes=int(duration or 60))
+            if window_start is not None and end <= window_start:
+                continue
+        elif window_end is not None and start >= window_end:
+            continue
+        busy.append((start, end))
+
+    logger.debug("[BUSY INTERVALS] Total: %s scheduled intervals found (range: %s to %s)", len(busy), window_start, window_end)
     return busy
 
 
-def _slot_is_free(start: datetime, end: datetime,
-                  busy: List[tuple[datetime, datetime]]) -> bool:
-    for (b_start, b_end) in busy:
-        overlaps = _overlaps(start, end, b_start, b_end)
-        if overlaps:
-            print(f"[OVERLAP CHECK] ❌ Overlap detected: [{start} to {end}] vs [{b_start} to {b_end}]")
-            return False
-    return True
+class BusyIndex:
+    """
+    Sorted, disjoint view of a user's busy intervals with O(log n) lookups.
 
+    Built from the output of _load_busy_intervals(): overlapping intervals
+    are merged, so "is [s, e) free" and "next free instant after t" are
+    answered with a single bisect over the interval ends instead of a linear
+    scan per candidate slot. Overlap semantics match _overlaps(): intervals
+    that only touch at an endpoint do not conflict.
 
-def _score_slot(
-    dt_start: datetime,
-    dt_end: datetime,
-    user_id: int,
-    task_type: str,
-    prefs: Optional[UserPreferences]
-) -> float:
+    Attributes:
+        starts: Start of each merged busy interval (ascending)
+        ends: End of each merged busy interval (ascending)
     """
-    Score a time slot using Bayesian Network predictions.
-    
-    This replaces the old heuristic scoring with pure BN inference.
-    The BN learns from stated preferences and observed task patterns.
-    
+
+    def __init__(self, busy: List[tuple[datetime, datetime]]):
+        self.starts: List[datetime] = []
+        self.ends: List[datetime] = []
+
+        # Malformed intervals (end before start) can't block anything sensible
+        for b_start, b_end in sorted(iv for iv in busy if iv[0] <= iv[1]):
+            if self.ends and b_start < self.ends[-1]:
+                if b_end > self.ends[-1]:
+                    self.ends[-1] = b_end
+            else:
+                self.starts.append(b_start)
+                self.ends.append(b_end)
+
+    @classmethod
+    def for_user(cls, user_id: int, window_start: Optional[datetime] = None,
+                 window_end: Optional[datetime] = None) -> BusyIndex:
+        """
+        Build the index from the user's scheduled tasks.
+
+        With a range, only tasks overlapping [window_start, window_end) are
+        loaded; the index then answers correctly for slots inside that range.
+        """
+        return cls(_load_busy_intervals(user_id, window_start, window_end))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def fingerprint(self) -> str:
+        """Short digest of the busy set; changes whenever the merged intervals do."""
+        digest = hashlib.sha1()
+        for b_start, b_end in zip(self.starts, self.ends):
+            digest.update(f"{b_start.isoformat()}/{b_end.isoformat()};".encode())
+        return digest.hexdigest()[:16]
+
+    def conflict(self, start: datetime, end: datetime) -> Optional[tuple[datetime, datetime]]:
+        """Return the merged busy interval overlapping [start, end), or None."""
+        # First interval that ends after the slot starts
+        i = bisect_right(self.ends, start)
+        if i < len(self.starts) and self.starts[i] < end:
+            return self.starts[i], self.ends[i]
+        return None
+
+    def is_free(self, start: datetime, end: datetime) -> bool:
+        """Check that [start, end) overlaps no busy interval."""
+        return self.conflict(start, end) is None
+
+    def add(self, start: datetime, end: datetime) -> None:
+        """Mark [start, end) busy, e.g. a slot a batch has just assigned."""
+        merged = BusyIndex(list(zip(self.starts, self.ends)) + [(start, end)])
+        self.starts, self.ends = merged.starts, merged.ends
+
+    def next_free(self, t: datetime) -> datetime:
+        """Earliest instant >= t that is not inside a busy interval."""
+        i = bisect_right(self.ends, t)
+        # Follow chains of back-to-back intervals
+        while i < len(self.starts) and self.starts[i] <= t:
+            t = self.ends[i]
+            i += 1
+        return t
+
+
+_DAY = timedelta(days=1)
+_TICK = timedelta(microseconds=1)  # turns an exclusive bound into an inclusive one
+
+
+def _time_window_starts(day: date, t_start: time, t_end: time,
+                        duration: timedelta) -> List[tuple[datetime, datetime]]:
+    """
+    Closed ranges of slot starts on `day` for which both the start and the
+    end time of day fall within [t_start, t_end] (the _within() checks).
+
+    The end may land on a later day (long durations), so every day offset
+    that can bring the end back into the window is considered.
+    """
+    lo = datetime.combine(day, t_start)
+    hi = datetime.combine(day, t_end)
+    if hi < lo:
+        return []
+
+    ranges: List[tuple[datetime, datetime]] = []
+    k = (duration - (hi - lo)) // _DAY
+    while True:
+        end_lo = lo + k * _DAY - duration
+        end_hi = hi + k * _DAY - duration
+        if end_lo > hi:
+            break
+        a, b = max(lo, end_lo), min(hi, end_hi)
+        if a <= b:
+            ranges.append((a, b))
+        k += 1
+    return ranges
+
+
+def _intersect_windows(a: List[tuple[datetime, datetime]],
+                       b: List[tuple[datetime, datetime]]) -> List[tuple[datetime, datetime]]:
+    """Intersect two ascending lists of disjoint closed ranges."""
+    out: List[tuple[datetime, datetime]] = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        lo = max(a[i][0], b[j][0])
+        hi = min(a[i][1], b[j][1])
+        if lo <= hi:
+            out.append((lo, hi))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return out
+
+
+def _scan_windows(
+    start: datetime,
+    end: datetime,
+    duration: timedelta,
+    days_off: List[int],
+    time_windows: List[tuple[time, time]],
+    date_lock: Optional[date] = None,
+) -> Iterator[tuple[datetime, datetime]]:
+    """
+    Yield, day by day, the closed ranges within [start, end] where a slot
+    may start: not a day off, and start/end inside every time-of-day window.
+
+    With a date lock the scan stops at the first day that isn't the locked
+    date, like the cursor scans it replaces.
+    """
+    day = start.date()
+    while day <= end.date():
+        if date_lock and day != date_lock:
+            return
+        midnight = datetime.combine(day, time())
+        if not _is_day_off(midnight, days_off):
+            allowed = [(max(midnight, start), min(midnight + _DAY - _TICK, end))]
+            for t_start, t_end in time_windows:
+                allowed = _intersect_windows(
+                    allowed, _time_window_starts(day, t_start, t_end, duration)
+                )
+            yield from allowed
+        day += _DAY
+
+
+def _windows_by_day(windows: Iterable[tuple[datetime, datetime]]) -> Dict[date, List[tuple[datetime, datetime]]]:
+    """Group _scan_windows() ranges (each lies within one day) by their day, in order."""
+    by_day: Dict[date, List[tuple[datetime, datetime]]] = {}
+    for lo, hi in windows:
+        by_day.setdefault(lo.date(), []).append((lo, hi))
+    return by_day
+
+
+def _next_grid_point(origin: datetime, step: timedelta, t: datetime) -> datetime:
+    """First point of the grid origin + k*step (k >= 0) that is >= t."""
+    if t <= origin:
+        return origin
+    return origin + -((origin - t) // step) * step
+
+
+def _snap_to_quarter_hour(cursor: datetime) -> datetime:
+    """Advance to the next 15-minute mark (the precision scan's re-anchoring)."""
+    remainder = cursor.minute % 15
+    if remainder != 0:
+        return cursor.replace(minute=cursor.minute - remainder, second=0, microsecond=0) + timedelta(minutes=15)
+    return cursor + timedelta(minutes=15)
+
+
+def _gap_scan(
+    busy: BusyIndex,
+    windows: Iterable[tuple[datetime, datetime]],
+    duration: timedelta,
+    origin: datetime,
+    step: timedelta,
+    only_at: Optional[Tuple[int, int]] = None,
+    snap_time: Optional[time] = None,
+    keep_day: Optional[Callable[[date], bool]] = None,
+) -> Iterator[datetime]:
+    """
+    Yield free slot starts on the grid origin + k*step, in time order.
+
+    Only grid points inside the allowed windows are visited, and a busy
+    block is skipped in one jump: every grid point before the end of the
+    block that conflicts with the current point conflicts as well. The
+    result is the same sequence a fixed-step cursor scan would produce.
+
     Args:
-        dt_start: Slot start datetime
-        dt_end: Slot end datetime
+        busy: Busy interval index
+        windows: Ascending, disjoint closed ranges a slot may start in
+        duration: Slot length
+        origin: Grid origin (first cursor position)
+        step: Grid step
+        only_at: Optional (hour, minute) free slots must start at
+                 (fixed-time search)
+        snap_time: Precision scan re-anchoring: the first time a visited
+                   point is exactly this time of day (and is busy or
+                   accepted), the grid moves to the next 15-minute mark
+        keep_day: Optional pruning hook; windows on days it rejects are
+                  skipped (only once the grid can no longer re-anchor)
+    """
+    snapped = snap_time is None
+    for lo, hi in windows:
+        if keep_day is not None and snapped and not keep_day(lo.date()):
+            continue
+        g = _next_grid_point(origin, step, lo)
+        while g <= hi:
+            conflict = busy.conflict(g, g + duration)
+            if conflict is None:
+                ok = only_at is None or (g.hour, g.minute) == only_at
+                if ok:
+                    yield g
+                if ok and not snapped and g.time() == snap_time:
+                    snapped = True
+                    origin = g = _snap_to_quarter_hour(g)
+                else:
+                    g += step
+                continue
+
+            target = conflict[1]
+            if not snapped:
+                w = datetime.combine(g.date(), snap_time)
+                if g <= w < target and w <= hi and (w - origin) % step == timedelta(0):
+                    snapped = True
+                    origin = _snap_to_quarter_hour(w)
+            g = _next_grid_point(origin, step, target)
+
+
+# Grid points above which the vectorized engine replaces the gap scan
+# (~3 weeks of 15-minute steps: month strategy, long fixed-time searches)
+GRID_ENGINE_MIN_POINTS = 2000
+
+_MINUTE = timedelta(minutes=1)
+_MINUTE_US = _MINUTE // _TICK
+
+
+class OccupancyGrid:
+    """
+    Minute-resolution occupancy of a scan horizon, for vectorized slot search.
+
+    Cell i covers [origin + i min, origin + (i+1) min) and is occupied when a
+    busy interval overlaps it. With whole-minute durations and steps, a slot
+    starting on cell a conflicts with the busy set exactly when one of its
+    cells is occupied, so a prefix sum answers every grid point at once.
+    Zero-length busy intervals sitting on a cell boundary occupy no cell
+    and are tracked separately (they block slots strictly containing them).
+
+    Attributes:
+        origin: Time of cell 0 (the scan's first grid point)
+        size: Number of cells
+    """
+
+    def __init__(self, busy: BusyIndex, origin: datetime, end: datetime):
+        self.origin = origin
+        self.size = max(0, -((origin - end) // _MINUTE))
+
+        cover = np.zeros(self.size + 1, dtype=np.int32)
+        points = np.zeros(self.size + 1, dtype=np.int32)
+        for b_start, b_end in zip(busy.starts, busy.ends):
+            if b_end < origin or b_start > end:
+                continue
+            s_us = (b_start - origin) // _TICK
+            e_us = (b_end - origin) // _TICK
+            lo = max(0, s_us // _MINUTE_US)
+            hi = min(self.size, -(-e_us // _MINUTE_US))
+            if lo < hi:
+                cover[lo] += 1
+                cover[hi] -= 1
+            elif s_us == e_us and 0 <= s_us <= self.size * _MINUTE_US:
+                points[s_us // _MINUTE_US] += 1
+
+        occupied = np.cumsum(cover[:-1]) > 0
+        self._busy_prefix = np.concatenate(([0], np.cumsum(occupied)))
+        self._point_prefix = np.concatenate(([0], np.cumsum(points)))
+        self._minute_of_day = origin.hour * 60 + origin.minute
+        self._minute_of_week = origin.weekday() * 1440 + self._minute_of_day
+
+    def _offset(self, t: datetime, ceil: bool) -> int:
+        if ceil:
+            return -((self.origin - t) // _MINUTE)
+        return (t - self.origin) // _MINUTE
+
+    def _evaluate(self, offsets, windows, d: int, only_at):
+        """Return (allowed, free, accepted) masks for the given cell offsets."""
+        lo = np.array([self._offset(w[0], ceil=True) for w in windows], dtype=np.int64)
+        hi = np.array([self._offset(w[1], ceil=False) for w in windows], dtype=np.int64)
+        j = np.searchsorted(lo, offsets, side="right") - 1
+        allowed = (j >= 0) & (offsets <= hi[np.maximum(j, 0)])
+
+        end = np.minimum(offsets + d, self.size)
+        busy = self._busy_prefix[end] - self._busy_prefix[offsets] > 0
+        inner = np.minimum(offsets + 1, end)
+        busy |= self._point_prefix[end] - self._point_prefix[inner] > 0
+        free = allowed & ~busy
+
+        accepted = free
+        if only_at is not None:
+            minute = (self._minute_of_day + offsets) % 1440
+            accepted = free & (minute == only_at[0] * 60 + only_at[1])
+        return allowed, free, accepted
+
+    def free_starts(
+        self,
+        windows: List[tuple[datetime, datetime]],
+        duration: timedelta,
+        step: timedelta,
+        only_at: Optional[Tuple[int, int]] = None,
+        snap_time: Optional[time] = None,
+    ):
+        """
+        Offsets (in minutes from origin) of free slot starts, in time order.
+
+        Same contract as _gap_scan() with origin as the grid origin; the
+        windows must lie in [origin, end - duration].
+        """
+        d, s = duration // _MINUTE, step // _MINUTE
+        offsets = np.arange(0, max(0, self.size - d + 1), s, dtype=np.int64)
+        if not windows or not len(offsets):
+            return offsets[:0]
+
+        allowed, free, accepted = self._evaluate(offsets, windows, d, only_at)
+        result = offsets[accepted]
+
+        # Precision scan re-anchoring (see _gap_scan); only reachable when
+        # grid points can be exactly snap_time
+        aligned = self.origin.second == 0 and self.origin.microsecond == 0
+        if snap_time is None or not aligned or snap_time.second or snap_time.microsecond:
+            return result
+        snap_minute = snap_time.hour * 60 + snap_time.minute
+        hits = np.flatnonzero(
+            allowed & (~free | accepted)
+            & ((self._minute_of_day + offsets) % 1440 == snap_minute)
+        )
+        if not len(hits):
+            return result
+
+        w = int(offsets[hits[0]])
+        snapped = _snap_to_quarter_hour(self.origin + w * _MINUTE)
+        rest = np.arange((snapped - self.origin) // _MINUTE, max(0, self.size - d + 1), s, dtype=np.int64)
+        _, _, rest_accepted = self._evaluate(rest, windows, d, only_at)
+        return np.concatenate((result[result <= w], rest[rest_accepted]))
+
+    def datetimes(self, offsets) -> List[datetime]:
+        return [self.origin + int(o) * _MINUTE for o in offsets]
+
+    def hours_of_week(self, offsets):
+        """Vectorized hour_of_week() of the given offsets."""
+        return ((self._minute_of_week + offsets) // 60) % HOURS_PER_WEEK
+
+
+def _use_grid_engine(start: datetime, end: datetime, duration: timedelta, step: timedelta) -> bool:
+    """Pick the vectorized engine for long, whole-minute scans."""
+    if duration % _MINUTE or step % _MINUTE:
+        return False
+    return (end - start) / step > GRID_ENGINE_MIN_POINTS
+
+
+class ScoringSession:
+    """
+    Per-request Bayesian Network scoring context.
+
+    suggest_slots_for_user() opens one session per call and hands it to every
+    scan loop, so the user's BN is fetched from bn_registry (which loads
+    bn_user_<id>.json only when it isn't cached or has changed) at most
+    once per request instead of once per candidate slot. The network is
+    fetched lazily on the first score() call, so requests that find no
+    free slot never touch the BN at all, and slot scoring reads the BN's
+    compiled hour-of-week score table instead of running inference per
+    slot.
+
+    Attributes:
         user_id: User ID for BN lookup
         task_type: Type of task (Meeting/Training/Studies)
-        prefs: UserPreferences (kept for compatibility, not used)
-    
-    Returns:
-        Score in [0..10] where higher is better
+        load_count: How many times this session fetched the BN (0 or 1)
+        scored: Slots scored so far (the scan work of the requests using it)
+        days_pruned: Days skipped because no slot on them could reach the
+                     result page (see _day_filter)
+
+    Class Attributes:
+        total_loads: Process-wide number of BN fetches made by scoring sessions
+                     (used by regression tests to assert one per request)
     """
-    try:
-        # Load user's BN
-        bn = UserBayesianNetwork(user_id)
-        
-        if not bn.is_trained():
-            # Fallback: return neutral score if BN not trained
+
+    total_loads = 0
+
+    def __init__(self, user_id: int, task_type: str):
+        self.user_id = user_id
+        self.task_type = task_type
+        self.load_count = 0
+        self.scored = 0
+        self.days_pruned = 0
+        self._table: Optional[List[float]] = None
+        self._table_array = None
+        self._day_bounds: Optional[List[int]] = None
+        self._loaded = False
+        self._bn: Optional[UserBayesianNetwork] = None
+        self._network = self._load_network
+
+    def _load_network(self) -> UserBayesianNetwork:
+        if self._bn is None:
+            self.load_count += 1
+            ScoringSession.total_loads += 1
+            self._bn = bn_registry.get(self.user_id)
+        return self._bn
+
+    def for_task_type(self, task_type: str) -> ScoringSession:
+        """
+        Session scoring another task type against the same loaded BN.
+
+        Args:
+            task_type: Type of task (Meeting/Training/Studies)
+
+        Returns:
+            ScoringSession that shares this session's (lazy) BN load
+        """
+        if task_type == self.task_type:
+            return self
+        sibling = ScoringSession(self.user_id, task_type)
+        sibling._network = self._network
+        return sibling
+
+    def _load(self) -> Optional[List[float]]:
+        if not self._loaded:
+            self._loaded = True
+            try:
+                bn = self._network()
+                with bn.lock:
+                    # Fallback: neutral scores if BN not trained
+                    if bn.is_trained():
+                        self._table = bn.score_table(self.task_type)
+            except Exception as e:
+                logger.warning("[BN Scoring] Error: %s", e)
+                self._table = None
+        return self._table
+
+    def score(self, dt_start: datetime, dt_end: datetime) -> float:
+        """
+        Score a time slot using Bayesian Network predictions.
+
+        Args:
+            dt_start: Slot start datetime
+            dt_end: Slot end datetime
+
+        Returns:
+            Score in [0..10] where higher is better (5.0 if BN unavailable)
+        """
+        self.scored += 1
+        table = self._load()
+        if table is None:
+            # Fallback: neutral score
             return 5.0
-        
-        # Get BN prediction for this slot
-        score = bn.predict_slot_score(task_type, dt_start, dt_end)
-        
-        return score
-    
-    except Exception as e:
-        print(f"[BN Scoring] Error: {e}")
-        # Fallback: neutral score
-        return 5.0
+        return table[hour_of_week(dt_start)]
+
+    def day_bound(self, day: date) -> int:
+        """
+        Upper bound on the (rounded) candidate score of any slot on a day.
+
+        Args:
+            day: Calendar date
+
+        Returns:
+            Highest candidate score the score table allows on that weekday
+        """
+        if self._day_bounds is None:
+            table = self._load()
+            if table is None:
+                self._day_bounds = [5] * 7
+            else:
+                self._day_bounds = [
+                    int(round(max(0.0, min(10.0, float(max(table[wd * 24:(wd + 1) * 24]))))))
+                    for wd in range(7)
+                ]
+        return self._day_bounds[day.weekday()]
+
+    def hours_at_least(self, min_score: float) -> List[bool]:
+        """
+        Hours of the week in which a slot reaches a candidate score.
+
+        Args:
+            min_score: Minimum (rounded) candidate score
+
+        Returns:
+            One flag per hour_of_week() index
+        """
+        table = self._load()
+        if table is None:
+            return [5 >= min_score] * HOURS_PER_WEEK
+        return [int(round(max(0.0, min(10.0, float(s))))) >= min_score for s in table]
+
+    def score_many(self, hours):
+        """
+        Vectorized score() for an array of hour-of-week indexes.
+
+        Args:
+            hours: NumPy array of hour_of_week() values
+
+        Returns:
+            NumPy array of scores (5.0 where the BN is unavailable)
+        """
+        if not len(hours):
+            return np.zeros(0)
+        self.scored += len(hours)
+        table = self._load()
+        if table is None:
+            return np.full(len(hours), 5.0)
+        if self._table_array is None:
+            self._table_array = np.asarray(table)
+        return self._table_array[hours]
+
+    def score_starts(self, starts: List[datetime]):
+        """
+        Vectorized score() for a batch of slot starts.
+
+        Args:
+            starts: Slot start datetimes
+
+        Returns:
+            NumPy array of scores, one per start
+        """
+        # Converting datetimes to datetime64 costs more than this per-item
+        # index computation, so only the table gather is vectorized
+        hours = np.fromiter(map(hour_of_week, starts), dtype=np.int64, count=len(starts))
+        return self.score_many(hours)
+
+
+def _candidate(slot_start: datetime, slot_end: datetime, bn_score: float,
+               work_start: Optional[time], work_end: Optional[time]) -> Dict:
+    """Build a suggestion dict for a free slot with its BN score."""
+    final_score = max(0.0, min(10.0, float(bn_score)))
+
+    # Check if slot exceeds work hours
+    exceeds_work_hours = False
+    if work_start and work_end:
+        if not (_within(slot_start.time(), work_start, work_end) and
+                _within(slot_end.time(), work_start, work_end)):
+            exceeds_work_hours = True
+
+    return {
+        "scheduledStart": slot_start.replace(second=0, microsecond=0).isoformat(),
+        "scheduledEnd": slot_end.replace(second=0, microsecond=0).isoformat(),
+        "score": int(round(final_score)),
+        "exceedsWorkHours": exceeds_work_hours,
+    }
+
+
+def _collect_candidates(
+    busy: BusyIndex,
+    windows: Iterable[tuple[datetime, datetime]],
+    duration: timedelta,
+    origin: datetime,
+    end: datetime,
+    step: timedelta,
+    limit: int,
+    scorer: ScoringSession,
+    work_start: Optional[time],
+    work_end: Optional[time],
+    only_at: Optional[Tuple[int, int]] = None,
+    snap_time: Optional[time] = None,
+) -> List[Dict]:
+    """
+    First `limit` scored candidates of a scan, in time order.
+
+    Long scans (more than GRID_ENGINE_MIN_POINTS grid points between origin
+    and end) run on the vectorized OccupancyGrid; shorter ones use the lazy
+    gap scan, which stops as soon as `limit` slots are found.
+    """
+    if _use_grid_engine(origin, end, duration, step):
+        grid = OccupancyGrid(busy, origin, end + duration)
+        offsets = grid.free_starts(list(windows), duration, step, only_at, snap_time)[:limit]
+        scores = scorer.score_many(grid.hours_of_week(offsets))
+        return [
+            _candidate(slot_start, slot_start + duration, score, work_start, work_end)
+            for slot_start, score in zip(grid.datetimes(offsets), scores)
+        ]
+
+    starts = _gap_scan(busy, windows, duration, origin, step, only_at, snap_time)
+    return [
+        _candidate(slot_start, slot_start + duration, scorer.score(slot_start, slot_start + duration),
+                   work_start, work_end)
+        for slot_start in islice(starts, limit)
+    ]
+
+
+def rank_key(candidate: Dict) -> Tuple[int, str, str]:
+    """
+    Position of a suggestion in the result order (best first).
+
+    Every path orders by score descending, then start, then end (the end
+    only differs between duration variants of the same start).
+    """
+    return -candidate["score"], candidate["scheduledStart"], candidate["scheduledEnd"]
+
+
+def _paginate(candidates: List[Dict], page: int, page_size: int,
+              after: Optional[Tuple[int, str, str]] = None) -> List[Dict]:
+    """
+    Slice a sorted candidate list: by page number, or (continuation) the
+    page_size candidates ranked after the `after` cursor.
+    """
+    if after is not None:
+        return [c for c in candidates if rank_key(c) > after][:page_size]
+    start_idx = (page - 1) * page_size
+    return candidates[start_idx:start_idx + page_size]
+
+
+class _TopK:
+    """
+    The best k candidates by (score desc, start asc), fed in time order.
+
+    Kept in a min-heap on (score, -arrival) so the root is the candidate a
+    better one would evict. Candidates arrive in time order, so a newcomer
+    with the same score as the root is later and never displaces it.
+    With an `after` cursor (see rank_key) only candidates ranked after it
+    are kept, which is how continuation pages resume. `on_accept` is called
+    with every candidate that makes it into the current best k.
+    """
+
+    def __init__(self, k: int, after: Optional[Tuple[int, str, str]] = None,
+                 on_accept: Optional[Callable[[Dict], None]] = None):
+        self.k = max(1, k)
+        self.after = after
+        self.on_accept = on_accept
+        self._heap: List[tuple] = []
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @property
+    def threshold(self) -> Optional[int]:
+        """Score a candidate must beat to get in (None while not full)."""
+        if len(self._heap) < self.k:
+            return None
+        return self._heap[0][0]
+
+    def can_improve(self, bound: Callable[[], int]) -> bool:
+        """Whether candidates with at most bound() score could still get in."""
+        if self.threshold is None:
+            return True
+        best = bound()
+        if self.after is not None:
+            # Anything scoring above the cursor was on an earlier page
+            best = min(best, -self.after[0])
+        return best > self.threshold
+
+    def push(self, candidate: Dict) -> None:
+        if self.after is not None and rank_key(candidate) <= self.after:
+            return
+        self._seq += 1
+        entry = (candidate["score"], -self._seq, candidate)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+        else:
+            return
+        if self.on_accept is not None:
+            self.on_accept(candidate)
+
+    def items(self) -> List[Dict]:
+        return [entry[2] for entry in self._heap]
+
+
+def _feed_scored(
+    windows: Iterable[tuple[datetime, datetime]],
+    scan: Callable[[Iterable[tuple[datetime, datetime]]], Iterator[datetime]],
+    duration: timedelta,
+    scorer: ScoringSession,
+    work_start: Optional[time],
+    work_end: Optional[time],
+    sink: Callable[[Dict], None],
+) -> None:
+    """
+    Run a gap scan over `windows`, scoring each window's free starts (a
+    day's, for day-sized windows) with one score_starts() call.
+
+    A window's candidates reach `sink` before the scan pulls the next
+    window, so pruning checks made on the way (_expanding_windows, the
+    scan's keep_day) see the same candidates as with per-slot scoring.
+    """
+    pending: List[datetime] = []
+
+    def flush() -> None:
+        if pending:
+            for slot_start, score in zip(pending, scorer.score_starts(pending)):
+                sink(_candidate(slot_start, slot_start + duration, score, work_start, work_end))
+            pending.clear()
+
+    def flushing(it: Iterator[tuple[datetime, datetime]]) -> Iterator[tuple[datetime, datetime]]:
+        while True:
+            flush()
+            window = next(it, None)
+            if window is None:
+                return
+            yield window
+
+    for slot_start in scan(flushing(iter(windows))):
+        pending.append(slot_start)
+    flush()
+
+
+def _ranked_after(grid: OccupancyGrid, offsets, rounded, duration: timedelta,
+                  after: Tuple[int, str, str]):
+    """
+    Mask of the grid starts whose candidates rank_key() places after `after`.
+
+    Args:
+        grid: The grid the offsets belong to
+        offsets: Free start offsets (minutes from grid.origin)
+        rounded: Their candidate scores (rounded, as _candidate() does)
+        duration: Slot duration
+        after: Continuation cursor (a rank_key())
+
+    Returns:
+        Boolean array aligned with `offsets`
+    """
+    cursor_score, cursor_start, cursor_end = after
+    # Candidate times are truncated to the minute, like the cursor's
+    minute0 = grid.origin.replace(second=0, microsecond=0)
+    cursor = (datetime.fromisoformat(cursor_start) - minute0) // _MINUTE
+    cursor_slot_end = (minute0 + cursor * _MINUTE + duration).isoformat()
+    later_start = (offsets > cursor) | ((offsets == cursor) & (cursor_slot_end > cursor_end))
+    return (-rounded > cursor_score) | ((-rounded == cursor_score) & later_start)
+
+
+def _day_filter(top: _TopK, scorer: ScoringSession) -> Callable[[date], bool]:
+    """
+    keep_day hook for _gap_scan(): rejects days whose best possible score
+    can't get into `top`, counting each in scorer.days_pruned.
+    """
+    pruned = set()
+
+    def keep_day(day: date) -> bool:
+        if top.can_improve(lambda: scorer.day_bound(day)):
+            return True
+        if day not in pruned:
+            pruned.add(day)
+            scorer.days_pruned += 1
+        return False
+
+    return keep_day
+
+
+def _collect_top_candidates(
+    busy: BusyIndex,
+    windows: Iterable[tuple[datetime, datetime]],
+    duration: timedelta,
+    origin: datetime,
+    end: datetime,
+    step: timedelta,
+    top: _TopK,
+    scorer: ScoringSession,
+    work_start: Optional[time],
+    work_end: Optional[time],
+    only_at: Optional[Tuple[int, int]] = None,
+    snap_time: Optional[time] = None,
+) -> None:
+    """
+    Feed the best-scoring free slots of a whole scan into `top`.
+
+    The gap scan skips every day whose best possible score (the score
+    table's per-day maximum) can't beat the current k-th candidate; the
+    grid engine ranks all free starts of the horizon at once.
+    """
+    if _use_grid_engine(origin, end, duration, step):
+        grid = OccupancyGrid(busy, origin, end + duration)
+        offsets = grid.free_starts(list(windows), duration, step, only_at, snap_time)
+        scores = scorer.score_many(grid.hours_of_week(offsets))
+        rounded = np.rint(np.clip(scores, 0.0, 10.0))
+        if top.after is not None:
+            # Only starts ranked after the cursor, or the top k would be
+            # the slots of the earlier pages that push() then drops
+            keep = _ranked_after(grid, offsets, rounded, duration, top.after)
+            offsets, scores, rounded = offsets[keep], scores[keep], rounded[keep]
+        best = np.sort(np.lexsort((offsets, -rounded))[:top.k])
+        for slot_start, score in zip(grid.datetimes(offsets[best]), scores[best]):
+            top.push(_candidate(slot_start, slot_start + duration, score, work_start, work_end))
+        return
+
+    keep_day = _day_filter(top, scorer)
+    scan = lambda w: _gap_scan(busy, w, duration, origin, step, only_at, snap_time, keep_day)
+    _feed_scored(windows, scan, duration, scorer, work_start, work_end, top.push)
+
+
+def _horizon_bound(scorer: ScoringSession, day: date, last_day: date) -> int:
+    """
+    Upper bound on the candidate score of any slot from `day` to `last_day`.
+
+    Day bounds repeat weekly, so at most the next seven days are consulted.
+    """
+    days_left = (last_day - day).days + 1
+    return max(scorer.day_bound(day + i * _DAY) for i in range(min(7, days_left)))
+
+
+def _expanding_windows(
+    windows: Iterable[tuple[datetime, datetime]],
+    top: _TopK,
+    scorer: ScoringSession,
+    last_day: date,
+    examined: List[date],
+) -> Iterator[tuple[datetime, datetime]]:
+    """
+    Pass scan windows through until no unscanned day can outrank `top`.
+
+    Before a new day's windows are handed out, the best score any day left
+    in the horizon allows is checked against the current k-th candidate;
+    once nothing can get in, the horizon stops expanding. Every day whose
+    windows were handed out is appended to `examined`.
+    """
+    for lo, hi in windows:
+        day = lo.date()
+        if not examined or examined[-1] != day:
+            if not top.can_improve(lambda: _horizon_bound(scorer, day, last_day)):
+                return
+            examined.append(day)
+        yield lo, hi
+
+
+def _collect_top_candidates_lazily(
+    busy: BusyIndex,
+    windows: Iterable[tuple[datetime, datetime]],
+    duration: timedelta,
+    origin: datetime,
+    last_day: date,
+    step: timedelta,
+    top: _TopK,
+    scorer: ScoringSession,
+    work_start: Optional[time],
+    work_end: Optional[time],
+    only_at: Optional[Tuple[int, int]] = None,
+    snap_time: Optional[time] = None,
+) -> int:
+    """
+    _collect_top_candidates() for open-ended horizons.
+
+    `windows` is consumed day by day (pass the lazy _scan_windows() output)
+    and the scan stops at the first day from which no slot up to `last_day`
+    could beat the current k-th candidate, so the cost follows how far the
+    top page reaches rather than the horizon length.
+
+    Returns:
+        Number of days whose slots were examined
+    """
+    examined: List[date] = []
+    pruned = _expanding_windows(windows, top, scorer, last_day, examined)
+    keep_day = _day_filter(top, scorer)
+    scan = lambda w: _gap_scan(busy, w, duration, origin, step, only_at, snap_time, keep_day)
+    _feed_scored(pruned, scan, duration, scorer, work_start, work_end, top.push)
+    return len(examined)
+
+
+# Arguments a cached result doesn't depend on beyond what the key's
+# schedule_version / bn_version already capture (stats and on_candidate
+# are outputs)
+_UNKEYED_ARGS = ("busy", "prefs", "scorer", "stats", "on_candidate")
+
+# Datetime arguments keyed (and searched) at minute precision, like the
+# current time: routes pass datetime.now() as the window start
+_MINUTE_ARGS = ("window_start", "window_end", "preferred_start")
+
+
+def _cached_suggestions(fn: Callable[..., List[Dict]]) -> Callable[..., List[Dict]]:
+    """
+    Serve repeated identical searches from suggestion_cache.
+
+    The key is the search arguments (with _MINUTE_ARGS truncated to the
+    minute, also for the search itself, so the result is a function of
+    the key) plus the minute-truncated current time, the user's
+    schedule_version and bn_version. Callers that pass a
+    BusyIndex which differs from the stored schedule (e.g. the batch,
+    which marks its own assignments busy) must pass use_cache=False.
+    The search's `stats` are stored with the result and replayed on a hit.
+    """
+    @wraps(fn)
+    def wrapper(*, use_cache: bool = True, **kwargs) -> List[Dict]:
+        if not use_cache:
+            return fn(**kwargs)
+
+        for name in _MINUTE_ARGS:
+            if isinstance(kwargs.get(name), datetime):
+                kwargs[name] = kwargs[name].replace(second=0, microsecond=0)
+
+        user_id = kwargs["user_id"]
+        key = (
+            tuple(sorted(
+                (name, tuple(value) if isinstance(value, list) else value)
+                for name, value in kwargs.items() if name not in _UNKEYED_ARGS
+            )),
+            datetime.now().replace(second=0, microsecond=0),
+            schedule_version(user_id),
+            bn_version(user_id),
+        )
+        cached = suggestion_cache.get(key)
+        if cached is not None:
+            suggestions, stats = cached
+            logger.debug("[SUGGEST CACHE] Hit for user %s (%s suggestions)", user_id, len(suggestions))
+            if kwargs.get("stats") is not None:
+                kwargs["stats"].update(stats)
+            return [dict(c) for c in suggestions]
+
+        if kwargs.get("stats") is None:
+            kwargs["stats"] = {}
+        result = fn(**kwargs)
+        suggestion_cache.put(key, ([dict(c) for c in result], dict(kwargs["stats"])))
+        return result
+
+    return wrapper
 
 
 # ---------- public API ----------
 
+def busy_range(
+    *,
+    duration_minutes: int,
+    horizon_days: int = 21,
+    preferred_start: Optional[datetime] = None,
+    window_start: Optional[datetime] = None,
+    window_end: Optional[datetime] = None,
+) -> Tuple[datetime, datetime]:
+    """
+    Range of busy intervals suggest_slots_for_user() may consult.
+
+    Covers every scan path for the given search (default horizon, explicit
+    window, preferred start +- its scan span, fixed-time duration variants),
+    so a BusyIndex.for_user(user_id, *busy_range(...)) built by the caller
+    can be passed in as `busy`.
+
+    Args:
+        duration_minutes: Task duration
+        horizon_days: Default search horizon
+        preferred_start: Preferred start datetime, if any
+        window_start: Search window start, if any
+        window_end: Search window end, if any
+
+    Returns:
+        (start, end) to load busy intervals for
+    """
+    now = datetime.now()
+    lows = [now]
+    # An explicit window replaces the default horizon on every path
+    highs = [now + timedelta(days=horizon_days)] if not (window_start and window_end) else []
+    if preferred_start:
+        lows.append(preferred_start - timedelta(hours=2))
+        highs.append(preferred_start + timedelta(days=7))
+    if window_start:
+        lows.append(window_start)
+    if window_end:
+        highs.append(window_end)
+
+    # Slots may start until the end of the last day (and the fixed-time paths
+    # try durations up to two hours)
+    tail = _DAY + timedelta(minutes=max(duration_minutes, 120))
+    return (
+        datetime.combine(min(lows).date(), time()),
+        datetime.combine(max(highs).date(), time()) + tail,
+    )
+
+
+@_cached_suggestions
 def suggest_slots_for_user(
     *,
     user_id: int,
@@ -139,27 +1110,54 @@ def suggest_slots_for_user(
     preferred_time_of_day: Optional[Tuple[int, int]] = None,
     explicit_datetime_given: bool = False,
     fixed_time_search: bool = False,  # CASE 2: Only suggest slots at exact time
+    busy: Optional[BusyIndex] = None,
+    after: Optional[Tuple[int, str, str]] = None,
+    prefs: Optional[UserPreferences] = None,
+    scorer: Optional[ScoringSession] = None,
+    stats: Optional[Dict] = None,
+    on_candidate: Optional[Callable[[Dict], None]] = None,
 ) -> List[Dict]:
-    prefs: Optional[UserPreferences] = (
-        db.session.query(UserPreferences)
-        .filter(UserPreferences.user_id == user_id)
-        .first()
-    )
+    """
+    Suggest free, BN-scored time slots for a task.
+
+    Results are ordered best first (see rank_key) and paginated by `page`,
+    or, when `after` is given, are the `page_size` suggestions ranked after
+    that cursor (continuation pages; `page` is then ignored). Callers that
+    already hold the user's BusyIndex, preferences or a ScoringSession for
+    this task type can pass them as `busy`, `prefs` and `scorer`.
+
+    Open-ended searches (no window_end) stop scanning once no later day can
+    outrank the result page; pass a dict as `stats` to receive the number
+    of days examined under "days_examined".
+
+    `on_candidate`, if given, is called with candidates while the scan runs
+    (each one that enters the current best page, or every slot on the
+    paths that rank a short list); they are provisional until the
+    returned page.
+
+    Repeated identical searches are answered from the suggestion cache
+    until the user's schedule, preferences or BN change (see
+    _cached_suggestions); pass use_cache=False to always scan.
+    """
+    if prefs is None:
+        prefs = (
+            db.session.query(UserPreferences)
+            .filter(UserPreferences.user_id == user_id)
+            .first()
+        )
     
-    print(f"\n[WORK HOURS DEBUG] ============================================")
-    print(f"[WORK HOURS DEBUG] Fetching preferences for user_id: {user_id}")
+    logger.debug("[WORK HOURS DEBUG] Fetching preferences for user_id: %s", user_id)
     if prefs:
-        print(f"[WORK HOURS DEBUG] Found preferences (ID: {prefs.id}):")
-        print(f"[WORK HOURS DEBUG]   - workday_pref_start: {prefs.workday_pref_start} (type: {type(prefs.workday_pref_start)})")
-        print(f"[WORK HOURS DEBUG]   - workday_pref_end: {prefs.workday_pref_end} (type: {type(prefs.workday_pref_end)})")
-        print(f"[WORK HOURS DEBUG]   - days_off: {prefs.days_off}")
-        print(f"[WORK HOURS DEBUG]   - created_at: {prefs.created_at}")
-        print(f"[WORK HOURS DEBUG]   - updated_at: {prefs.updated_at}")
-        print(f"[WORK HOURS DEBUG] NOTE: These are the ACTUAL values from database, not defaults!")
+        logger.debug("[WORK HOURS DEBUG] Found preferences (ID: %s):", prefs.id)
+        logger.debug("[WORK HOURS DEBUG]   - workday_pref_start: %s (type: %s)", prefs.workday_pref_start, type(prefs.workday_pref_start))
+        logger.debug("[WORK HOURS DEBUG]   - workday_pref_end: %s (type: %s)", prefs.workday_pref_end, type(prefs.workday_pref_end))
+        logger.debug("[WORK HOURS DEBUG]   - days_off: %s", prefs.days_off)
+        logger.debug("[WORK HOURS DEBUG]   - created_at: %s", prefs.created_at)
+        logger.debug("[WORK HOURS DEBUG]   - updated_at: %s", prefs.updated_at)
+        logger.debug("[WORK HOURS DEBUG] NOTE: These are the ACTUAL values from database, not defaults!")
     else:
-        print(f"[WORK HOURS DEBUG] ❌ NO PREFERENCES FOUND FOR USER {user_id}!")
-        print(f"[WORK HOURS DEBUG] This user needs to complete preferences setup!")
-    print(f"[WORK HOURS DEBUG] ============================================\n")
+        logger.warning("[WORK HOURS DEBUG] ❌ NO PREFERENCES FOUND FOR USER %s!", user_id)
+        logger.debug("[WORK HOURS DEBUG] This user needs to complete preferences setup!")
 
     raw_days_off = (prefs.days_off if prefs else []) or []
     try:
@@ -171,24 +1169,26 @@ def suggest_slots_for_user(
     work_end: Optional[time] = prefs.workday_pref_end if prefs else None
 
     now = datetime.now()
-    print(f"\n[SLOT SEARCH DEBUG] ============================================")
-    print(f"[SLOT SEARCH DEBUG] Function called with:")
-    print(f"[SLOT SEARCH DEBUG]   - duration_minutes: {duration_minutes}")
-    print(f"[SLOT SEARCH DEBUG]   - page: {page}")
-    print(f"[SLOT SEARCH DEBUG]   - page_size: {page_size}")
-    print(f"[SLOT SEARCH DEBUG]   - window_start: {window_start}")
-    print(f"[SLOT SEARCH DEBUG]   - window_end: {window_end}")
-    print(f"[SLOT SEARCH DEBUG]   - work_start: {work_start}")
-    print(f"[SLOT SEARCH DEBUG]   - work_end: {work_end}")
-    print(f"[SLOT SEARCH DEBUG]   - explicit_date_requested: {explicit_date_requested}")
-    print(f"[SLOT SEARCH DEBUG]   - ACTUAL current time (now): {now}")
-    print(f"[SLOT SEARCH DEBUG] ============================================\n")
+    logger.debug("[SLOT SEARCH DEBUG] Function called with:")
+    logger.debug("[SLOT SEARCH DEBUG]   - duration_minutes: %s", duration_minutes)
+    logger.debug("[SLOT SEARCH DEBUG]   - page: %s", page)
+    logger.debug("[SLOT SEARCH DEBUG]   - page_size: %s", page_size)
+    logger.debug("[SLOT SEARCH DEBUG]   - window_start: %s", window_start)
+    logger.debug("[SLOT SEARCH DEBUG]   - window_end: %s", window_end)
+    logger.debug("[SLOT SEARCH DEBUG]   - work_start: %s", work_start)
+    logger.debug("[SLOT SEARCH DEBUG]   - work_end: %s", work_end)
+    logger.debug("[SLOT SEARCH DEBUG]   - explicit_date_requested: %s", explicit_date_requested)
+    logger.debug("[SLOT SEARCH DEBUG]   - ACTUAL current time (now): %s", now)
+
+    # One BN scoring session per request, shared by every scan path below
+    tt = task_type if task_type in ("Meeting", "Training", "Studies") else "Meeting"
+    if scorer is None:
+        scorer = ScoringSession(user_id, tt)
+    emit = on_candidate if on_candidate is not None else (lambda candidate: None)
 
     # CASE 2.D: User provided explicit date+time but NO duration
     # Generate multiple duration suggestions at the EXACT same date+time
     if explicit_datetime_given and preferred_start:
-        tt = task_type if task_type in ("Meeting", "Training", "Studies") else "Meeting"
-        
         # Fixed date and time from user input
         fixed_datetime = preferred_start
         
@@ -203,11 +1203,14 @@ def suggest_slots_for_user(
         if is_rest_day and not explicit_date_requested:
             return []
         
-        busy = _load_busy_intervals(user_id)
-        
         # Generate duration candidates: 30, 45, 60, 90, 120 minutes
         duration_candidates = [30, 45, 60, 90, 120]
         
+        if busy is None:
+            busy = BusyIndex.for_user(
+                user_id, fixed_datetime, fixed_datetime + timedelta(minutes=max(duration_candidates))
+            )
+        
         candidates: List[Dict] = []
         
         for dur in duration_candidates:
@@ -221,15 +1224,9 @@ def suggest_slots_for_user(
                     continue
             
             # Check if slot is free
-            if _slot_is_free(slot_start, slot_end, busy):
+            if busy.is_free(slot_start, slot_end):
                 # Score with BN
-                bn_score = _score_slot(
-                    dt_start=slot_start,
-                    dt_end=slot_end,
-                    user_id=user_id,
-                    task_type=tt,
-                    prefs=prefs
-                )
+                bn_score = scorer.score(slot_start, slot_end)
                 
                 final_score = max(0.0, min(10.0, float(bn_score)))
                 
@@ -250,135 +1247,95 @@ def suggest_slots_for_user(
                     "score": int(round(final_score)),
                     "exceedsWorkHours": exceeds_work_hours,
                 })
+                emit(candidates[-1])
         
         # Sort by BN score (highest first)
         candidates.sort(key=lambda s: (-s["score"], s["scheduledEnd"]))
         
         # Return paginated results
-        start_idx = (page - 1) * page_size
-        end_idx = start_idx + page_size
-        return candidates[start_idx:end_idx]
+        return _paginate(candidates, page, page_size, after)
     
     # CASE 2.G: User provided ONLY a time (no date, no duration)
     # Fixed TIME + Flexible DATE + Flexible DURATION
     # Examples: "schedule a task at 15:00", "add a meeting at 7 in the morning"
     if preferred_time_of_day and not window_start and not preferred_start:
-        tt = task_type if task_type in ("Meeting", "Training", "Studies") else "Meeting"
         pref_hour, pref_minute = preferred_time_of_day
         
         # Use default horizon since no date constraint
         start_scan = now + timedelta(minutes=30)
         end_scan = now + timedelta(days=horizon_days)
         
-        busy = _load_busy_intervals(user_id)
-        
         # Duration candidates to try at the fixed time
         duration_candidates = [30, 45, 60, 90, 120]
         
+        if busy is None:
+            busy = BusyIndex.for_user(
+                user_id, start_scan, end_scan + _DAY + timedelta(minutes=max(duration_candidates))
+            )
+        
         candidates: List[Dict] = []
         
-        # Scan day-by-day through the horizon
-        # CRITICAL: Use actual current time for filtering past slots
-        actual_now = datetime.now()
-        current_date = start_scan.date()
-        end_date = end_scan.date()
+        # Allowed days for the whole horizon, built once: not in the past
+        # (30-minute buffer) and not a rest day (no explicit date = filter
+        # rest days)
+        scan_days_off = [] if explicit_date_requested else days_off
+        last_instant = datetime.combine(end_scan.date(), time()) + _DAY - _TICK
+        first_slot = datetime.combine(start_scan.date(), time(pref_hour, pref_minute))
+        day_windows = list(_scan_windows(start_scan, last_instant, timedelta(0), scan_days_off, []))
         
-        while current_date <= end_date:
-            # Construct datetime at the fixed time on this date
-            slot_time = datetime(
-                current_date.year, current_date.month, current_date.day,
-                pref_hour, pref_minute, 0
-            )
-            
-            # CRITICAL FIX: Filter past times using ACTUAL current time
-            # This prevents suggesting times that have already passed
-            if slot_time < actual_now + timedelta(minutes=30):
-                current_date += timedelta(days=1)
-                continue
-            
-            # Skip rest days (no explicit date = filter rest days)
-            if _is_day_off(slot_time, days_off) and not explicit_date_requested:
-                current_date += timedelta(days=1)
-                continue
-            
-            # Try each duration at this fixed time
-            for dur in duration_candidates:
-                slot_start = slot_time
-                slot_end = slot_start + timedelta(minutes=dur)
-                
-                # Check if slot fits within work hours
-                if work_start and work_end:
-                    if not (_within(slot_start.time(), work_start, work_end) and 
-                            _within(slot_end.time(), work_start, work_end)):
-                        continue
-                
-                # Check if slot is free
-                if _slot_is_free(slot_start, slot_end, busy):
-                    # Score with BN
-                    bn_score = _score_slot(
-                        dt_start=slot_start,
-                        dt_end=slot_end,
-                        user_id=user_id,
-                        task_type=tt,
-                        prefs=prefs
-                    )
-                    
-                    final_score = max(0.0, min(10.0, float(bn_score)))
-                    
-                    # Check if slot exceeds work hours
-                    exceeds_work_hours = False
-                    if work_start and work_end:
-                        if not (_within(slot_start.time(), work_start, work_end) and 
-                                _within(slot_end.time(), work_start, work_end)):
-                            exceeds_work_hours = True
-                    
-                    candidates.append({
-                        "scheduledStart": slot_start.replace(
-                            second=0, microsecond=0
-                        ).isoformat(),
-                        "scheduledEnd": slot_end.replace(
-                            second=0, microsecond=0
-                        ).isoformat(),
-                        "score": int(round(final_score)),
-                        "exceedsWorkHours": exceeds_work_hours,
-                    })
-            
-            # Move to next day
-            current_date += timedelta(days=1)
+        # Try each duration at the fixed time of every allowed day
+        for dur in duration_candidates:
+            duration = timedelta(minutes=dur)
+            # Start and end inside work hours: the same time-of-day ranges on
+            # every day, so they are computed once per duration as offsets
+            # from midnight and shifted onto each allowed day
+            midnight = datetime.combine(start_scan.date(), time())
+            limits = [
+                (lo - midnight, hi - midnight)
+                for lo, hi in _time_window_starts(start_scan.date(), work_start, work_end, duration)
+            ] if work_start and work_end else [(timedelta(0), _DAY - _TICK)]
+            windows = []
+            for lo, hi in day_windows:
+                day = datetime.combine(lo.date(), time())
+                windows += _intersect_windows([(lo, hi)], [(day + a, day + b) for a, b in limits])
+            for slot_start in _gap_scan(busy, windows, duration, first_slot, _DAY):
+                slot_end = slot_start + duration
+                candidates.append(_candidate(
+                    slot_start, slot_end, scorer.score(slot_start, slot_end), work_start, work_end
+                ))
+                emit(candidates[-1])
         
         # Sort by BN score (highest first), then by start time
         candidates.sort(key=lambda s: (-s["score"], s["scheduledStart"]))
         
         # Return paginated results
-        start_idx = (page - 1) * page_size
-        end_idx = start_idx + page_size
-        return candidates[start_idx:end_idx]
+        return _paginate(candidates, page, page_size, after)
 
     # CASE 1: Specific date window provided by NLP (e.g., "next Tuesday", "November 25th 2025")
     # Use that window directly, don't clamp to default horizon
     if window_start and window_end:
         start_scan = window_start
         end_scan = window_end
-        print(f"[SLOT SEARCH DEBUG] CASE 1: Using provided window")
-        print(f"[SLOT SEARCH DEBUG]   - Initial start_scan: {start_scan}")
-        print(f"[SLOT SEARCH DEBUG]   - Initial end_scan: {end_scan}")
+        logger.debug("[SLOT SEARCH DEBUG] CASE 1: Using provided window")
+        logger.debug("[SLOT SEARCH DEBUG]   - Initial start_scan: %s", start_scan)
+        logger.debug("[SLOT SEARCH DEBUG]   - Initial end_scan: %s", end_scan)
         
         # CRITICAL FIX: Only apply "30 minutes in future" filter if start_scan is TODAY
         # For future dates, start from the beginning of that day
         if start_scan.date() == now.date():
             # Same day - ensure start is at least 30 minutes in the future
             if start_scan < now + timedelta(minutes=30):
-                print(f"[SLOT SEARCH DEBUG]   - Adjusting start_scan for TODAY (from {start_scan} to {now + timedelta(minutes=30)})")
+                logger.debug("[SLOT SEARCH DEBUG]   - Adjusting start_scan for TODAY (from %s to %s)", start_scan, now + timedelta(minutes=30))
                 start_scan = now + timedelta(minutes=30)
                 # If the entire window is in the past, return empty
                 if start_scan >= end_scan:
-                    print(f"[SLOT SEARCH DEBUG]   - Entire window is in the past, returning empty")
+                    logger.debug("[SLOT SEARCH DEBUG]   - Entire window is in the past, returning empty")
                     return []
         else:
-            print(f"[SLOT SEARCH DEBUG]   - Future date ({start_scan.date()}), keeping start_scan at beginning of day")
+            logger.debug("[SLOT SEARCH DEBUG]   - Future date (%s), keeping start_scan at beginning of day", start_scan.date())
         
-        print(f"[SLOT SEARCH DEBUG]   - Final start_scan: {start_scan}")
-        print(f"[SLOT SEARCH DEBUG]   - Final end_scan: {end_scan}")
+        logger.debug("[SLOT SEARCH DEBUG]   - Final start_scan: %s", start_scan)
+        logger.debug("[SLOT SEARCH DEBUG]   - Final end_scan: %s", end_scan)
     
     # CASE 2: Preferred start time provided (date+time specified)
     elif preferred_start:
@@ -408,247 +1365,119 @@ def suggest_slots_for_user(
     if start_scan >= end_scan:
         return []
 
-    busy = _load_busy_intervals(user_id)
+    if busy is None:
+        # Every path below starts slots on the days from start_scan to end_scan
+        busy = BusyIndex.for_user(
+            user_id,
+            datetime.combine(start_scan.date(), time()),
+            datetime.combine(end_scan.date(), time()) + _DAY + timedelta(minutes=duration_minutes),
+        )
 
     # FIX: Increase buffer to find more candidates with finer granularity
     BUFFER_FACTOR = 20  # Increased from 8 to allow ~60 candidates per page
     target_pool = max(page * page_size * BUFFER_FACTOR, 50)  # Minimum 50 candidates
+
+    # The scanning paths below keep only the best page * page_size slots of
+    # the whole window instead of the first target_pool free ones
+    top = _TopK(page_size if after is not None else page * page_size, after, on_candidate)
     
-    print(f"[CANDIDATE POOL DEBUG] target_pool set to: {target_pool}")
+    logger.debug("[CANDIDATE POOL DEBUG] target_pool set to: %s, top-k: %s", target_pool, top.k)
 
     candidates: List[Dict] = []
-    tt = task_type if task_type in ("Meeting", "Training", "Studies") else "Meeting"
 
     # SPECIAL CASE: If preferred_time_of_day is provided with a window,
     # scan day-by-day and generate ONE slot per day at the preferred time
     # This handles cases like "sometime this week at 10am"
     if preferred_time_of_day and window_start and window_end:
         pref_hour, pref_minute = preferred_time_of_day
-        current_date = start_scan.date()
-        end_date = end_scan.date()
+        duration = timedelta(minutes=duration_minutes)
         
-        # DEBUG: Counter to limit log spam
-        debug_counter = 0
-        max_debug_logs = 10
-        print(f"[DEBUG SCAN] Starting preferred time scan: {pref_hour}:{pref_minute}, window: {start_scan} to {end_scan}")
+        # Days of the window (whole days: the preferred time counts even if it
+        # is before start_scan's time of day), never less than 30 minutes ahead
+        scan_from = max(datetime.combine(start_scan.date(), time()), now + timedelta(minutes=30))
+        last_instant = datetime.combine(end_scan.date(), time()) + _DAY - _TICK
         
-        while current_date <= end_date and len(candidates) < target_pool:
-            # CRITICAL FIX: If window is date-locked (same day), don't scan multiple days
-            if window_start.date() == window_end.date():
-                # Date-locked: only scan this one specific day
-                if current_date != window_start.date():
-                    print(f"[DATE LOCK] Stopped scanning at {current_date} (locked to {window_start.date()})")
-                    break
-            
-            # Construct slot at preferred time on this date
-            slot_start = datetime(
-                current_date.year, current_date.month, current_date.day,
-                pref_hour, pref_minute, 0
-            )
-            
-            # DEBUG: Log first few attempts
-            should_debug = debug_counter < max_debug_logs
-            
-            # Skip if slot is in the past
-            if slot_start < now + timedelta(minutes=30):
-                if should_debug:
-                    print(f"[DEBUG SCAN {debug_counter}] {slot_start} - REJECTED: In the past (now+30min: {now + timedelta(minutes=30)})")
-                    debug_counter += 1
-                current_date += timedelta(days=1)
-                continue
-            
-            # Skip rest days ONLY if user did NOT explicitly request a date
-            # For CASE 2.C (vague ranges like "sometime this week"), explicit_date_requested=False
-            # FIX: Skip this check entirely if explicit_date_requested is True (conflict resolution "Same Day")
-            if not explicit_date_requested:
-                if _is_day_off(slot_start, days_off):
-                    if should_debug:
-                        print(f"[DEBUG SCAN {debug_counter}] {slot_start} - REJECTED: Day off (days_off: {days_off})")
-                        debug_counter += 1
-                    current_date += timedelta(days=1)
-                    continue
-            elif should_debug:
-                print(f"[DEBUG SCAN {debug_counter}] {slot_start} - Explicit date requested, skipping day_off check")
-            
-            slot_end = slot_start + timedelta(minutes=duration_minutes)
-            
-            # Check if slot fits within work hours (if no day_start/day_end override)
-            # FIX: Skip work hours check if explicit_date_requested is True
-            if not explicit_date_requested and not (day_start and day_end) and work_start and work_end:
-                within_work = _within(slot_start.time(), work_start, work_end) and _within(slot_end.time(), work_start, work_end)
-                if not within_work:
-                    if should_debug:
-                        print(f"[DEBUG SCAN {debug_counter}] {slot_start}-{slot_end} - REJECTED: Outside work hours ({work_start}-{work_end})")
-                        debug_counter += 1
-                    current_date += timedelta(days=1)
-                    continue
-            elif explicit_date_requested and should_debug:
-                print(f"[DEBUG SCAN {debug_counter}] {slot_start}-{slot_end} - Explicit date requested, skipping work hours check")
-            
-            # Check if slot is free
-            is_free = _slot_is_free(slot_start, slot_end, busy)
-            if should_debug:
-                print(f"[DEBUG SCAN {debug_counter}] {slot_start}-{slot_end} - Free? {is_free} (busy intervals: {len(busy)})")
-                debug_counter += 1
-            
-            if is_free:
-                bn_score = _score_slot(
-                    dt_start=slot_start,
-                    dt_end=slot_end,
-                    user_id=user_id,
-                    task_type=tt,
-                    prefs=prefs
-                )
-                
-                final_score = max(0.0, min(10.0, float(bn_score)))
-                
-                # Check if slot exceeds work hours
-                exceeds_work_hours = False
-                if work_start and work_end:
-                    if not (_within(slot_start.time(), work_start, work_end) and 
-                            _within(slot_end.time(), work_start, work_end)):
-                        exceeds_work_hours = True
-                
-                candidates.append({
-                    "scheduledStart": slot_start.replace(
-                        second=0, microsecond=0
-                    ).isoformat(),
-                    "scheduledEnd": slot_end.replace(
-                        second=0, microsecond=0
-                    ).isoformat(),
-                    "score": int(round(final_score)),
-                    "exceedsWorkHours": exceeds_work_hours,
-                })
-            
-            current_date += timedelta(days=1)
+        # CRITICAL FIX: If window is date-locked (same day), don't scan multiple days
+        date_lock = window_start.date() if window_start.date() == window_end.date() else None
+        
+        # Skip rest days ONLY if user did NOT explicitly request a date
+        # For CASE 2.C (vague ranges like "sometime this week"), explicit_date_requested=False
+        # FIX: Skip this check entirely if explicit_date_requested is True (conflict resolution "Same Day")
+        scan_days_off = [] if explicit_date_requested else days_off
+        
+        # Work hours bound the slot unless a part-of-day window overrides them
+        # FIX: Skip work hours check if explicit_date_requested is True
+        time_windows: List[tuple[time, time]] = []
+        if not explicit_date_requested and not (day_start and day_end) and work_start and work_end:
+            time_windows.append((work_start, work_end))
+        
+        logger.debug("[DEBUG SCAN] Starting preferred time scan: %s:%s, window: %s to %s", pref_hour, pref_minute, start_scan, end_scan)
+        
+        # ONE slot per allowed day, at the preferred time
+        windows = _scan_windows(scan_from, last_instant, duration, scan_days_off, time_windows, date_lock)
+        first_slot = datetime.combine(start_scan.date(), time(pref_hour, pref_minute))
+        for slot_start in islice(_gap_scan(busy, windows, duration, first_slot, _DAY), target_pool):
+            slot_end = slot_start + duration
+            candidates.append(_candidate(
+                slot_start, slot_end, scorer.score(slot_start, slot_end), work_start, work_end
+            ))
+            emit(candidates[-1])
+        
+        logger.debug("[DEBUG SCAN] Preferred time scan found %s free slots (busy intervals: %s)", len(candidates), len(busy))
     
-    # NORMAL CASE: No preferred time, scan with 30-minute steps
+    # NORMAL CASE: No preferred time, scan the allowed windows gap by gap
     # For "Duration Only" case (no date, no time), use day-distribution strategy
     # to ensure suggestions span multiple days rather than clustering on today
     else:
         # Detect "Duration Only" case: no window, no preferred_start, no preferred_time
         is_duration_only = not window_start and not preferred_start and not preferred_time_of_day
-        
+        duration = timedelta(minutes=duration_minutes)
+
         if is_duration_only:
             # DAY-DISTRIBUTION STRATEGY for Duration Only
             # Scan day-by-day and collect best slots from each day
             # This ensures suggestions span the entire horizon rather than clustering on today
-            current_date = start_scan.date()
             end_date = end_scan.date()
             
             # Collect multiple slots per day to ensure good coverage
             slots_per_day = 8  # Collect up to 8 good slots per day
-            
-            # DEBUG: Counter to limit log spam
-            debug_counter = 0
-            max_debug_logs = 10
-            
-            while current_date <= end_date and len(candidates) < target_pool:
-                # CRITICAL FIX: If window is date-locked (same day), don't scan multiple days
-                if window_start and window_end:
-                    if window_start.date() == window_end.date():
-                        # Date-locked: only scan this one specific day
-                        if current_date != window_start.date():
-                            print(f"[DATE LOCK] Stopped scanning at {current_date} (locked to {window_start.date()})")
-                            break
-                
-                # Skip rest days UNLESS explicit date requested
-                day_start_dt = datetime(current_date.year, current_date.month, current_date.day, 0, 0, 0)
-                # FIX: Skip day_off check if explicit_date_requested is True
-                if not explicit_date_requested and _is_day_off(day_start_dt, days_off):
-                    current_date += timedelta(days=1)
+
+            # Work hours and part-of-day window bound start and end - FIX: Skip if explicit_date_requested
+            time_windows: List[tuple[time, time]] = []
+            if not explicit_date_requested:
+                if work_start and work_end:
+                    time_windows.append((work_start, work_end))
+                if day_start and day_end:
+                    time_windows.append((day_start, day_end))
+            scan_days_off = [] if explicit_date_requested else days_off
+            step = timedelta(minutes=step_minutes)
+
+            # Allowed windows of every day of the horizon, built once; days
+            # off and days without room for the task have none
+            first_cursor = start_scan.replace(second=0, microsecond=0)
+            last_instant = datetime(end_date.year, end_date.month, end_date.day, 23, 59, 59) - _TICK
+            day_windows = _windows_by_day(
+                _scan_windows(first_cursor, last_instant, duration, scan_days_off, time_windows)
+            )
+
+            keep_day = _day_filter(top, scorer)
+            for current_date, windows in day_windows.items():
+                # Skip days whose best score can't beat the current k-th candidate
+                if not keep_day(current_date):
                     continue
-                
-                # Scan this day with 30-minute steps
-                day_cursor = datetime(
-                    current_date.year, current_date.month, current_date.day,
-                    start_scan.hour if current_date == start_scan.date() else 0,
-                    start_scan.minute if current_date == start_scan.date() else 0,
-                    0
-                )
+
+                # Scan this day on the step grid, starting at start_scan's hour:minute on the first day
+                day_cursor = first_cursor if current_date == first_cursor.date() else datetime.combine(current_date, time())
                 day_end_time = datetime(current_date.year, current_date.month, current_date.day, 23, 59, 59)
-                day_slots = []
-                
-                while day_cursor < day_end_time and len(day_slots) < slots_per_day:
-                    # DEBUG: Log first few attempts
-                    should_debug = debug_counter < max_debug_logs
-                    
-                    # Check work hours - FIX: Skip if explicit_date_requested
-                    if not explicit_date_requested and work_start and work_end:
-                        if not _within(day_cursor.time(), work_start, work_end):
-                            if should_debug:
-                                print(f"[DEBUG SCAN {debug_counter}] {day_cursor} - REJECTED: Outside work hours ({work_start}-{work_end})")
-                                debug_counter += 1
-                            day_cursor += timedelta(minutes=step_minutes)
-                            continue
-                    
-                    # Enforce part-of-day window if defined - FIX: Skip if explicit_date_requested
-                    if not explicit_date_requested and day_start and day_end:
-                        if not _within(day_cursor.time(), day_start, day_end):
-                            if should_debug:
-                                print(f"[DEBUG SCAN {debug_counter}] {day_cursor} - REJECTED: Outside day window ({day_start}-{day_end})")
-                                debug_counter += 1
-                            day_cursor += timedelta(minutes=step_minutes)
-                            continue
-                    
-                    slot_start = day_cursor
-                    slot_end = slot_start + timedelta(minutes=duration_minutes)
-                    
-                    # Check if slot end is still within bounds - FIX: Skip if explicit_date_requested
-                    if not explicit_date_requested and work_start and work_end:
-                        if not _within(slot_end.time(), work_start, work_end):
-                            if should_debug:
-                                print(f"[DEBUG SCAN {debug_counter}] {slot_start}-{slot_end} - REJECTED: End time outside work hours")
-                                debug_counter += 1
-                            day_cursor += timedelta(minutes=step_minutes)
-                            continue
-                    
-                    if not explicit_date_requested and day_start and day_end:
-                        if not _within(slot_end.time(), day_start, day_end):
-                            if should_debug:
-                                print(f"[DEBUG SCAN {debug_counter}] {slot_start}-{slot_end} - REJECTED: End time outside day window")
-                                debug_counter += 1
-                            day_cursor += timedelta(minutes=step_minutes)
-                            continue
-                    
-                    # Check if slot is free
-                    is_free = _slot_is_free(slot_start, slot_end, busy)
-                    if should_debug:
-                        print(f"[DEBUG SCAN {debug_counter}] {slot_start}-{slot_end} - Free? {is_free}, Work: {work_start}-{work_end}")
-                        debug_counter += 1
-                    
-                    if is_free:
-                        bn_score = _score_slot(
-                            dt_start=slot_start,
-                            dt_end=slot_end,
-                            user_id=user_id,
-                            task_type=tt,
-                            prefs=prefs
-                        )
-                        
-                        final_score = max(0.0, min(10.0, float(bn_score)))
-                        
-                        # Check if slot exceeds work hours
-                        exceeds_work_hours = False
-                        if work_start and work_end:
-                            if not (_within(slot_start.time(), work_start, work_end) and 
-                                    _within(slot_end.time(), work_start, work_end)):
-                                exceeds_work_hours = True
-                        
-                        day_slots.append({
-                            "scheduledStart": slot_start.replace(second=0, microsecond=0).isoformat(),
-                            "scheduledEnd": slot_end.replace(second=0, microsecond=0).isoformat(),
-                            "score": int(round(final_score)),
-                            "exceedsWorkHours": exceeds_work_hours,
-                        })
-                    
-                    day_cursor += timedelta(minutes=step_minutes)
-                
-                # Add all slots from this day to candidates
-                candidates.extend(day_slots)
-                
-                # Move to next day
-                current_date += timedelta(days=1)
+
+                for candidate in _collect_candidates(
+                    busy, windows, duration, day_cursor, day_end_time, step,
+                    slots_per_day, scorer, work_start, work_end,
+                ):
+                    top.push(candidate)
+
+            candidates = top.items()
+            logger.debug("[SLOT SEARCH DEBUG] Duration-only scan kept %s candidates (step: %s minutes)", len(candidates), step_minutes)
         
         else:
             # PRECISION SCANNING: Start at exact workday_pref_start, then 15-min intervals
@@ -667,281 +1496,365 @@ def suggest_slots_for_user(
                 # If so, great! If not, we still start from start_scan
                 cursor_time = cursor.time()
                 if cursor_time == work_start:
-                    print(f"[PRECISION SCAN] Starting at exact workday_pref_start: {cursor}")
+                    logger.debug("[PRECISION SCAN] Starting at exact workday_pref_start: %s", cursor)
                 elif cursor_time < work_start:
                     # Advance to workday_pref_start on same day
                     cursor = cursor.replace(hour=work_start.hour, minute=work_start.minute, second=0, microsecond=0)
-                    print(f"[PRECISION SCAN] Advanced to workday_pref_start: {cursor}")
+                    logger.debug("[PRECISION SCAN] Advanced to workday_pref_start: %s", cursor)
                 else:
-                    print(f"[PRECISION SCAN] Starting from: {cursor}")
-            
-            print(f"[SLOT SEARCH DEBUG] Starting precision scanning:")
-            print(f"[SLOT SEARCH DEBUG]   - start_scan: {start_scan}")
-            print(f"[SLOT SEARCH DEBUG]   - cursor (precision start): {cursor}")
-            print(f"[SLOT SEARCH DEBUG]   - end_scan: {end_scan}")
-            print(f"[SLOT SEARCH DEBUG]   - work_start: {work_start}")
-            print(f"[SLOT SEARCH DEBUG]   - target_pool: {target_pool}")
-            print(f"[SLOT SEARCH DEBUG]   - step: 15 minutes")
-            
-            # Track whether we've scanned the exact workday_pref_start
-            scanned_workday_start = False
+                    logger.debug("[PRECISION SCAN] Starting from: %s", cursor)
             
-            scan_count = 0
-            max_debug_scans = 20
-
-            while cursor < end_scan and len(candidates) < target_pool:
-                scan_count += 1
-                should_log = scan_count <= max_debug_scans
-                
-                # CRITICAL FIX: If window is date-locked (start and end on same day), 
-                # ensure cursor stays within that day
-                if window_start and window_end:
-                    if window_start.date() == window_end.date():
-                        # Date-locked window: Don't scan beyond the locked date
-                        if cursor.date() != window_start.date():
-                            if should_log:
-                                print(f"[DATE LOCK] Scan {scan_count}: {cursor} - STOPPED (crossed date boundary from {window_start.date()})")
-                            break  # Stop scanning completely
-                
-                # Skip rest days ONLY if user did NOT explicitly request a specific date
-                if _is_day_off(cursor, days_off) and not explicit_date_requested:
-                    if should_log:
-                        print(f"[SLOT SEARCH DEBUG] Scan {scan_count}: {cursor} - SKIPPED (day off)")
-                    cursor += step
-                    continue
-
-                if not (day_start and day_end) and work_start and work_end:
-                    if not _within(cursor.time(), work_start, work_end):
-                        if should_log:
-                            print(f"[SLOT SEARCH DEBUG] Scan {scan_count}: {cursor} - SKIPPED (outside work hours {work_start}-{work_end})")
-                        cursor += step
-                        continue
+            logger.debug("[SLOT SEARCH DEBUG] Starting precision scanning:")
+            logger.debug("[SLOT SEARCH DEBUG]   - start_scan: %s", start_scan)
+            logger.debug("[SLOT SEARCH DEBUG]   - cursor (precision start): %s", cursor)
+            logger.debug("[SLOT SEARCH DEBUG]   - end_scan: %s", end_scan)
+            logger.debug("[SLOT SEARCH DEBUG]   - work_start: %s", work_start)
+            logger.debug("[SLOT SEARCH DEBUG]   - top-k: %s", top.k)
+            logger.debug("[SLOT SEARCH DEBUG]   - step: 15 minutes")
 
-                # Enforce part-of-day window if defined
-                if day_start and day_end:
-                    if not _within(cursor.time(), day_start, day_end):
-                        cursor += step
-                        continue
+            # Enforce part-of-day window if defined, otherwise work hours
+            if day_start and day_end:
+                time_windows = [(day_start, day_end)]
+            elif work_start and work_end:
+                time_windows = [(work_start, work_end)]
+            else:
+                time_windows = []
 
-                slot_start = cursor
-                slot_end = slot_start + timedelta(minutes=duration_minutes)
+            # CRITICAL FIX: If window is date-locked (start and end on same day),
+            # don't scan beyond the locked date
+            date_lock = None
+            if window_start and window_end and window_start.date() == window_end.date():
+                date_lock = window_start.date()
 
-            
-                if not (day_start and day_end) and work_start and work_end:
-                    if not _within(slot_end.time(), work_start, work_end):
-                        if should_log:
-                            print(f"[SLOT SEARCH DEBUG] Scan {scan_count}: {slot_start}-{slot_end} - REJECTED (end time outside work hours)")
-                        cursor += step
-                        continue
+            # CASE 2: Fixed-Time Search - Only accept slots at exact requested time
+            only_at = tuple(preferred_time_of_day) if fixed_time_search and preferred_time_of_day else None
 
-            
-                if day_start and day_end and not _within(slot_end.time(), day_start, day_end):
-                    if should_log:
-                        print(f"[SLOT SEARCH DEBUG] Scan {scan_count}: {slot_start}-{slot_end} - REJECTED (end time outside day window)")
-                    cursor += step
-                    continue
+            # Skip rest days ONLY if user did NOT explicitly request a specific date
+            windows = _scan_windows(
+                cursor, end_scan - _TICK, duration,
+                [] if explicit_date_requested else days_off,
+                time_windows, date_lock,
+            )
 
-                is_free = _slot_is_free(slot_start, slot_end, busy)
-                if should_log:
-                    print(f"[SLOT SEARCH DEBUG] Scan {scan_count}: {slot_start}-{slot_end} - Free: {is_free}")
-                
-                if is_free:
-                    # CASE 2: Fixed-Time Search - Only accept slots at exact requested time
-                    if fixed_time_search and preferred_time_of_day:
-                        required_hour, required_minute = preferred_time_of_day
-                        if slot_start.hour != required_hour or slot_start.minute != required_minute:
-                            if should_log:
-                                print(f"[FIXED-TIME FILTER] Scan {scan_count}: {slot_start} - REJECTED (time {slot_start.hour:02d}:{slot_start.minute:02d} != required {required_hour:02d}:{required_minute:02d})")
-                            cursor += step
-                            continue
-                        else:
-                            if should_log:
-                                print(f"[FIXED-TIME FILTER] Scan {scan_count}: {slot_start} - ACCEPTED (exact time match: {required_hour:02d}:{required_minute:02d})")
-                    
-                    bn_score = _score_slot(
-                        dt_start=slot_start,
-                        dt_end=slot_end,
-                        user_id=user_id,
-                        task_type=tt,
-                        prefs=prefs
-                    )
-                    
-                    final_score = max(0.0, min(10.0, float(bn_score)))
-
-                    # Check if slot exceeds work hours
-                    exceeds_work_hours = False
-                    if work_start and work_end:
-                        if not (_within(slot_start.time(), work_start, work_end) and 
-                                _within(slot_end.time(), work_start, work_end)):
-                            exceeds_work_hours = True
-
-                    candidates.append(
-                        {
-                            "scheduledStart": slot_start.replace(
-                                second=0, microsecond=0
-                            ).isoformat(),
-                            "scheduledEnd": slot_end.replace(
-                                second=0, microsecond=0
-                            ).isoformat(),
-                            "score": int(round(final_score)),
-                            "exceedsWorkHours": exceeds_work_hours,
-                        }
-                    )
-
-                # PRECISION INCREMENT: After scanning workday_pref_start (e.g., 08:25),
-                # jump to next 15-min mark (e.g., 08:30), then continue with 15-min intervals
-                if not scanned_workday_start and work_start and cursor.time() == work_start:
-                    scanned_workday_start = True
-                    # Find next 15-minute mark
-                    minutes = cursor.minute
-                    remainder = minutes % 15
-                    if remainder != 0:
-                        # Round up to next 15-min mark
-                        cursor = cursor.replace(minute=minutes - remainder, second=0, microsecond=0)
-                        cursor += timedelta(minutes=15)
-                    else:
-                        # Already on 15-min mark, just advance by 15
-                        cursor += timedelta(minutes=15)
-                    if should_log:
-                        print(f"[PRECISION SCAN] After workday_pref_start, jumped to next 15-min mark: {cursor}")
-                else:
-                    # Normal 15-minute increment
-                    cursor += timedelta(minutes=15)
+            # PRECISION INCREMENT: After scanning workday_pref_start (e.g., 08:25),
+            # the grid moves to the next 15-min mark (e.g., 08:30)
+            if window_end is None:
+                # Open horizon ("auto"): expand day by day and stop once no
+                # later day can outrank the current top page
+                days_examined = _collect_top_candidates_lazily(
+                    busy, windows, duration, cursor, (end_scan - _TICK).date(), step,
+                    top, scorer, work_start, work_end,
+                    only_at=only_at, snap_time=work_start,
+                )
+                logger.debug("[SLOT SEARCH DEBUG] Examined %s days of the %s-day horizon", days_examined, horizon_days)
+                if stats is not None:
+                    stats["days_examined"] = days_examined
+            else:
+                _collect_top_candidates(
+                    busy, windows, duration, cursor, end_scan, step,
+                    top, scorer, work_start, work_end,
+                    only_at=only_at, snap_time=work_start,
+                )
+            candidates = top.items()
             
-            # Log first 5 candidates generated (before scoring/sorting)
-            print(f"\n[CANDIDATE DEBUG] ============================================")
-            print(f"[CANDIDATE DEBUG] First 5 candidates generated (raw, before sorting):")
-            for i, c in enumerate(candidates[:5]):
-                print(f"[CANDIDATE DEBUG]   #{i+1}: {c['scheduledStart']} (score: {c['score']})")
-            print(f"[CANDIDATE DEBUG] ============================================\n")
+            # Log first 5 candidates kept (before sorting)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[CANDIDATE DEBUG] First 5 candidates kept (raw, before sorting):")
+                for i, c in enumerate(candidates[:5]):
+                    logger.debug("[CANDIDATE DEBUG]   #%s: %s (score: %s)", i+1, c['scheduledStart'], c['score'])
 
     # EMERGENCY: If we got 0 candidates with 15-min scan, fall back to 30-min scan
     if len(candidates) == 0 and step_minutes == 15:
-        print(f"\n[FALLBACK WARNING] ============================================")
-        print(f"[FALLBACK WARNING] 15-minute scan returned 0 candidates!")
-        print(f"[FALLBACK WARNING] Attempting fallback to 30-minute scan...")
-        print(f"[FALLBACK WARNING] ============================================\n")
+        logger.info("[FALLBACK WARNING] 15-minute scan returned 0 candidates, retrying with a 30-minute scan")
         
-        # Retry with 30-minute step
-        cursor = start_scan
-        step = timedelta(minutes=30)
-        scan_count = 0
-        
-        while cursor < end_scan and len(candidates) < target_pool:
-            scan_count += 1
-            should_log = scan_count <= 5
-            
-            # CRITICAL FIX: If window is date-locked, ensure cursor stays within that day
-            if window_start and window_end:
-                if window_start.date() == window_end.date():
-                    if cursor.date() != window_start.date():
-                        if should_log:
-                            print(f"[FALLBACK DATE LOCK] Stopped at {cursor} (locked to {window_start.date()})")
-                        break
-            
-            if _is_day_off(cursor, days_off) and not explicit_date_requested:
-                cursor += step
-                continue
-            
-            if not (day_start and day_end) and work_start and work_end:
-                if not _within(cursor.time(), work_start, work_end):
-                    if should_log:
-                        print(f"[FALLBACK] Scan {scan_count}: {cursor} - SKIPPED (outside work hours)")
-                    cursor += step
-                    continue
-            
-            slot_start = cursor
-            slot_end = slot_start + timedelta(minutes=duration_minutes)
-            
-            if not (day_start and day_end) and work_start and work_end:
-                if not _within(slot_end.time(), work_start, work_end):
-                    cursor += step
-                    continue
-            
-            is_free = _slot_is_free(slot_start, slot_end, busy)
-            
-            if is_free:
-                if should_log:
-                    print(f"[FALLBACK] Scan {scan_count}: {slot_start} - FREE")
-                
-                bn_score = _score_slot(
-                    dt_start=slot_start,
-                    dt_end=slot_end,
-                    user_id=user_id,
-                    task_type=tt,
-                    prefs=prefs
-                )
-                final_score = max(0.0, min(10.0, float(bn_score)))
-                
-                exceeds_work_hours = False
-                if work_start and work_end:
-                    if not (_within(slot_start.time(), work_start, work_end) and 
-                            _within(slot_end.time(), work_start, work_end)):
-                        exceeds_work_hours = True
-                
-                candidates.append({
-                    "scheduledStart": slot_start.replace(second=0, microsecond=0).isoformat(),
-                    "scheduledEnd": slot_end.replace(second=0, microsecond=0).isoformat(),
-                    "score": int(round(final_score)),
-                    "exceedsWorkHours": exceeds_work_hours,
-                })
-            
-            cursor += step
+        # Retry with 30-minute step (work hours only; the day window is not enforced here)
+        duration = timedelta(minutes=duration_minutes)
+        time_windows = [(work_start, work_end)] if not (day_start and day_end) and work_start and work_end else []
+        date_lock = None
+        if window_start and window_end and window_start.date() == window_end.date():
+            date_lock = window_start.date()
+        windows = _scan_windows(
+            start_scan, end_scan - _TICK, duration,
+            [] if explicit_date_requested else days_off,
+            time_windows, date_lock,
+        )
+
+        _collect_top_candidates(
+            busy, windows, duration, start_scan, end_scan, timedelta(minutes=30),
+            top, scorer, work_start, work_end,
+        )
+        candidates = top.items()
         
-        print(f"[FALLBACK] Found {len(candidates)} candidates with 30-minute scan\n")
+        logger.debug("[FALLBACK] Found %s candidates with 30-minute scan", len(candidates))
 
     # CRITICAL: Sort by SCORE (descending), then by time
     # This ensures the BEST suggestions appear first, regardless of time
     # Workday start (e.g., 08:25) will find its natural position based on Bayesian score
     
     # Global Search Debug Logging
-    if len(candidates) > 0:
+    if len(candidates) > 0 and logger.isEnabledFor(logging.DEBUG):
         top_score = max(c["score"] for c in candidates)
         top_slot = next(c for c in candidates if c["score"] == top_score)
         avg_score = sum(c["score"] for c in candidates) / len(candidates)
         
-        print(f"\n[GLOBAL SEARCH] ============================================")
-        print(f"[GLOBAL SEARCH] Scanned {len(candidates)} total slots across entire window")
-        print(f"[REAL-TIME SEARCH] Found top slot at {top_slot['scheduledStart']} with score {top_score:.2f}")
-        print(f"[GLOBAL SEARCH] Average score: {avg_score:.2f}")
-        print(f"[GLOBAL SEARCH] Score range: [{min(c['score'] for c in candidates):.2f} - {max(c['score'] for c in candidates):.2f}]")
-        print(f"[GLOBAL SEARCH] Now sorting by quality (score descending)...")
-        print(f"[GLOBAL SEARCH] ============================================\n")
+        logger.debug("[GLOBAL SEARCH] Scanned %s total slots across entire window", len(candidates))
+        logger.debug("[REAL-TIME SEARCH] Found top slot at %s with score %.2f", top_slot['scheduledStart'], top_score)
+        logger.debug("[GLOBAL SEARCH] Average score: %.2f", avg_score)
+        logger.debug("[GLOBAL SEARCH] Score range: [%.2f - %.2f]", min(c['score'] for c in candidates), max(c['score'] for c in candidates))
+        logger.debug("[GLOBAL SEARCH] Now sorting by quality (score descending)...")
     
-    print(f"\n[SORTING DEBUG] ============================================")
-    print(f"[SORTING DEBUG] Sorting {len(candidates)} candidates by score (descending)...")
+    logger.debug("[SORTING DEBUG] Sorting %s candidates by score (descending)...", len(candidates))
     candidates.sort(key=lambda s: (-s["score"], s["scheduledStart"]))
     
-    if len(candidates) > 0:
-        print(f"[SORTING DEBUG] Top 5 candidates after sort:")
+    if len(candidates) > 0 and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[SORTING DEBUG] Top 5 candidates after sort:")
         for i, c in enumerate(candidates[:5]):
-            print(f"[SORTING DEBUG]   #{i+1}: {c['scheduledStart']} (score: {c['score']})")
-    print(f"[SORTING DEBUG] ============================================\n")
+            logger.debug("[SORTING DEBUG]   #%s: %s (score: %s)", i+1, c['scheduledStart'], c['score'])
 
     start_idx = (page - 1) * page_size
     end_idx = start_idx + page_size
     
-    print(f"\n[PAGINATION DEBUG] ============================================")
-    print(f"[PAGINATION DEBUG] Slicing candidates from {start_idx} to {end_idx} for page {page}")
-    print(f"[PAGINATION DEBUG] page={page}, page_size={page_size}")
-    print(f"[PAGINATION DEBUG] Total candidates before slicing: {len(candidates)}")
-    print(f"[PAGINATION DEBUG] ============================================\n")
+    if after is not None:
+        logger.debug("[PAGINATION DEBUG] Continuing after cursor %s (page_size=%s)", after, page_size)
+    else:
+        logger.debug("[PAGINATION DEBUG] Slicing candidates from %s to %s for page %s", start_idx, end_idx, page)
+        logger.debug("[PAGINATION DEBUG] page=%s, page_size=%s", page, page_size)
+    logger.debug("[PAGINATION DEBUG] Total candidates before slicing: %s", len(candidates))
     
-    result = candidates[start_idx:end_idx]
+    result = _paginate(candidates, page, page_size, after)
     
-    print(f"\n[SLOT SEARCH DEBUG] ============================================")
-    print(f"[SLOT SEARCH DEBUG] SEARCH COMPLETE")
-    print(f"[SLOT SEARCH DEBUG]   - Total raw candidates found: {len(candidates)}")
-    print(f"[SLOT SEARCH DEBUG]   - Requested page: {page} (size: {page_size})")
-    print(f"[SLOT SEARCH DEBUG]   - Pagination slice: [{start_idx}:{end_idx}]")
-    print(f"[SLOT SEARCH DEBUG]   - Returning {len(result)} suggestions")
+    logger.debug("[SLOT SEARCH DEBUG] SEARCH COMPLETE")
+    logger.debug("[SLOT SEARCH DEBUG]   - Total raw candidates found: %s", len(candidates))
+    logger.debug("[SLOT SEARCH DEBUG]   - Requested page: %s (size: %s)", page, page_size)
+    logger.debug("[SLOT SEARCH DEBUG]   - Pagination slice: [%s:%s]", start_idx, end_idx)
+    logger.debug("[SLOT SEARCH DEBUG]   - Returning %s suggestions", len(result))
     if len(candidates) > 0:
-        print(f"[SLOT SEARCH DEBUG]   - Top candidate (before pagination): {candidates[0]['scheduledStart']} (score: {candidates[0]['score']})")
+        logger.debug("[SLOT SEARCH DEBUG]   - Top candidate (before pagination): %s (score: %s)", candidates[0]['scheduledStart'], candidates[0]['score'])
     if len(result) > 0:
-        print(f"[SLOT SEARCH DEBUG]   - First suggestion on this page: {result[0]['scheduledStart']} (score: {result[0]['score']})")
-        print(f"[SLOT SEARCH DEBUG]   - Last suggestion on this page: {result[-1]['scheduledStart']} (score: {result[-1]['score']})")
+        logger.debug("[SLOT SEARCH DEBUG]   - First suggestion on this page: %s (score: %s)", result[0]['scheduledStart'], result[0]['score'])
+        logger.debug("[SLOT SEARCH DEBUG]   - Last suggestion on this page: %s (score: %s)", result[-1]['scheduledStart'], result[-1]['score'])
     else:
-        print(f"[SLOT SEARCH DEBUG]   - NO SUGGESTIONS ON THIS PAGE (check if page > total pages)")
-    print(f"[SLOT SEARCH DEBUG] ============================================\n")
+        logger.debug("[SLOT SEARCH DEBUG]   - NO SUGGESTIONS ON THIS PAGE (check if page > total pages)")
     
     return result
+
+
+# Placement order of a batch: higher priority first
+_PRIORITY_RANK = {"HIGH": 0, "MEDIUM": 1, "LOW": 2}
+
+
+def suggest_batch_for_user(
+    *,
+    user_id: int,
+    tasks: List[Dict],
+    time_budget_ms: int = 2000,
+    horizon_days: int = 21,
+    step_minutes: int = 15,
+) -> List[Dict]:
+    """
+    Jointly place several unscheduled tasks into non-overlapping free slots.
+
+    Preferences, busy intervals and the BN are loaded once for the whole
+    batch. Tasks are placed greedily, highest priority first and longer
+    tasks before shorter ones (input order breaks ties): each gets the best
+    slot suggest_slots_for_user() finds, and that slot is then marked busy
+    so later tasks can't overlap it. Once the time budget is spent the
+    remaining tasks are left unscheduled.
+
+    Args:
+        user_id: User to schedule for
+        tasks: Dicts with duration_minutes, task_type, priority and
+               optional window_start / window_end (naive local datetimes)
+        time_budget_ms: Wall-clock budget for the whole batch
+        horizon_days: Search horizon for tasks without a window
+        step_minutes: Grid step for tasks without a window
+
+    Returns:
+        One dict per task, in input order: the chosen suggestion
+        (scheduledStart, scheduledEnd, score, exceedsWorkHours) plus
+        "index" and "status" ("scheduled", "no_slot" or "time_budget")
+    """
+    deadline = perf_counter() + time_budget_ms / 1000.0
+
+    prefs: Optional[UserPreferences] = (
+        db.session.query(UserPreferences)
+        .filter(UserPreferences.user_id == user_id)
+        .first()
+    )
+    ranges = [
+        busy_range(
+            duration_minutes=int(task["duration_minutes"]),
+            horizon_days=horizon_days,
+            window_start=task.get("window_start"),
+            window_end=task.get("window_end"),
+        )
+        for task in tasks
+    ]
+    busy = BusyIndex.for_user(
+        user_id,
+        min((r[0] for r in ranges), default=None),
+        max((r[1] for r in ranges), default=None),
+    )
+    base_scorer = ScoringSession(user_id, "Meeting")
+    scorers = {"Meeting": base_scorer}
+
+    order = sorted(
+        range(len(tasks)),
+        key=lambda i: (
+            _PRIORITY_RANK.get(tasks[i].get("priority"), 1),
+            -int(tasks[i]["duration_minutes"]),
+            i,
+        ),
+    )
+
+    results: List[Optional[Dict]] = [None] * len(tasks)
+    for i in order:
+        task = tasks[i]
+        if perf_counter() > deadline:
+            results[i] = {"index": i, "status": "time_budget"}
+            continue
+
+        tt = task.get("task_type")
+        tt = tt if tt in ("Meeting", "Training", "Studies") else "Meeting"
+        if tt not in scorers:
+            scorers[tt] = base_scorer.for_task_type(tt)
+        best = suggest_slots_for_user(
+            user_id=user_id,
+            duration_minutes=int(task["duration_minutes"]),
+            task_type=tt,
+            page=1,
+            page_size=1,
+            horizon_days=horizon_days,
+            step_minutes=step_minutes,
+            window_start=task.get("window_start"),
+            window_end=task.get("window_end"),
+            busy=busy,
+            prefs=prefs,
+            scorer=scorers[tt],
+            use_cache=False,  # busy includes this batch's own assignments
+        )
+        if not best:
+            results[i] = {"index": i, "status": "no_slot"}
+            continue
+
+        slot = best[0]
+        busy.add(datetime.fromisoformat(slot["scheduledStart"]),
+                 datetime.fromisoformat(slot["scheduledEnd"]))
+        results[i] = {"index": i, "status": "scheduled", **slot}
+
+    placed = sum(1 for r in results if r["status"] == "scheduled")
+    logger.debug("[BATCH] Placed %s/%s tasks (BN loads: %s, busy intervals: %s)", placed, len(tasks), base_scorer.load_count, len(busy))
+    return results
+
+
+# Grid of /api/ai/nextFree slot starts, and days of busy intervals loaded at a time
+NEXT_FREE_STEP = timedelta(minutes=5)
+NEXT_FREE_CHUNK_DAYS = 7
+
+
+def _windows_in_hours(windows: Iterable[tuple[datetime, datetime]],
+                      hours_ok: List[bool]) -> Iterator[tuple[datetime, datetime]]:
+    """
+    Cut _scan_windows() ranges (each within one day) down to the hours of
+    the week flagged in `hours_ok`; a slot's score depends only on the hour
+    it starts in.
+    """
+    for lo, hi in windows:
+        midnight = datetime.combine(lo.date(), time())
+        base = hour_of_week(midnight)
+        h = lo.hour
+        while h <= hi.hour:
+            if not hours_ok[base + h]:
+                h += 1
+                continue
+            first = h
+            while h < hi.hour and hours_ok[base + h + 1]:
+                h += 1
+            yield (max(lo, midnight + timedelta(hours=first)),
+                   min(hi, midnight + timedelta(hours=h + 1) - _TICK))
+            h += 1
+
+
+def next_free_slot(
+    *,
+    user_id: int,
+    duration_minutes: int,
+    after: Optional[datetime] = None,
+    min_score: Optional[float] = None,
+    task_type: Optional[str] = None,
+    horizon_days: int = 21,
+    prefs: Optional[UserPreferences] = None,
+) -> Optional[Dict]:
+    """
+    Earliest free slot for a task ("put it at the next free time").
+
+    Unlike suggest_slots_for_user() nothing is ranked: the allowed windows
+    (no days off, start and end within work hours) are walked in time
+    order with _gap_scan(), which jumps over busy blocks, and the first
+    fit is returned, so the cost is a bisect per gap visited. Busy
+    intervals are loaded NEXT_FREE_CHUNK_DAYS at a time, so an answer in
+    the first week reads only that week.
+
+    With `min_score` the windows are first cut down to the hours of the
+    week whose score reaches it, so the first fit already qualifies and no
+    rejected slot is scored; the BN score table is read once.
+
+    Args:
+        user_id: User to schedule for
+        duration_minutes: Task duration
+        after: Earliest start wanted (default and lower bound: 30 minutes
+               from now)
+        min_score: Optional minimum candidate score (0-10)
+        task_type: Task type for scoring (Meeting/Training/Studies)
+        horizon_days: Days after the earliest start to search
+        prefs: The user's preferences, if the caller already loaded them
+
+    Returns:
+        Suggestion dict (scheduledStart, scheduledEnd, score,
+        exceedsWorkHours) starting on the NEXT_FREE_STEP grid, or None if
+        nothing fits within the horizon
+    """
+    if prefs is None:
+        prefs = (
+            db.session.query(UserPreferences)
+            .filter(UserPreferences.user_id == user_id)
+            .first()
+        )
+    try:
+        days_off: List[int] = [int(x) for x in ((prefs.days_off if prefs else []) or [])]
+    except Exception:
+        days_off = []
+    work_start: Optional[time] = prefs.workday_pref_start if prefs else None
+    work_end: Optional[time] = prefs.workday_pref_end if prefs else None
+    time_windows = [(work_start, work_end)] if work_start and work_end else []
+
+    earliest = datetime.now() + timedelta(minutes=30)
+    start = max(after, earliest) if after else earliest
+    last_start = start + timedelta(days=horizon_days)
+    duration = timedelta(minutes=duration_minutes)
+
+    tt = task_type if task_type in ("Meeting", "Training", "Studies") else "Meeting"
+    scorer = ScoringSession(user_id, tt)
+    hours_ok = scorer.hours_at_least(min_score) if min_score is not None else None
+
+    # Grid anchored at midnight, so slots start on round minutes
+    origin = datetime.combine(start.date(), time())
+    chunk_start = start
+    while chunk_start <= last_start:
+        chunk_end = min(
+            datetime.combine(chunk_start.date(), time()) + NEXT_FREE_CHUNK_DAYS * _DAY,
+            last_start + _TICK,
+        )
+        busy = BusyIndex.for_user(user_id, datetime.combine(chunk_start.date(), time()), chunk_end + duration)
+        windows = _scan_windows(chunk_start, chunk_end - _TICK, duration, days_off, time_windows)
+        if hours_ok is not None:
+            windows = _windows_in_hours(windows, hours_ok)
+
+        slot_start = next(_gap_scan(busy, windows, duration, origin, NEXT_FREE_STEP), None)
+        if slot_start is not None:
+            slot_end = slot_start + duration
+            return _candidate(slot_start, slot_end, scorer.score(slot_start, slot_end), work_start, work_end)
+        chunk_start = chunk_end
+
+    logger.debug("[NEXT FREE] No %s-minute slot for user %s within %s days", duration_minutes, user_id, horizon_days)
+    return None
@@ -0,0 +1,24 @@
+"""
+Performance benchmarks for the slot suggestion engine.
+
+Run from the backend directory:
+
+    python -m benchmarks --output bench.json
+    python -m benchmarks --sizes 0 100 --repeats 5 --compare bench.json
+
+The benchmarks seed synthetic users into an in-memory SQLite database and
+write their BN files to a temporary directory, so they never touch the
+development database or real BN state. See benchmarks/suggest_bench.py for
+the scenarios and the result format.
+
+benchmarks/inference_bench.py compares the approximate and exact BN
+inference modes:
+
+    python -m benchmarks.inference_bench
+"""
+
+import os
+
+# Must happen before config is imported: it reads these at import time
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
@@ -0,0 +1,3 @@
+from benchmarks.suggest_bench import main
+
+main()
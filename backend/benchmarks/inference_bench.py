@@ -0,0 +1,137 @@
+"""
+Micro-benchmark of the BN inference modes.
+
+Times compute_node_distribution() and infer_all_latent_nodes() on a user
+preference network with the approximate inference (most likely states of
+unobserved parents plugged in) and with exact=True (variable
+elimination), and reports how far apart their distributions are.
+
+Cases:
+    full evidence     all six Layer 1 nodes observed, as in production
+    partial evidence  only FocusPeakState and FlexibilityLevel observed
+
+Run from the backend directory:
+
+    python -m benchmarks.inference_bench --iterations 200
+"""
+
+import os
+
+# Must happen before config is imported: it reads these at import time
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import argparse
+import json
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from time import perf_counter
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from Ai.network.bayesian import UserBayesianNetwork, bn_persistence
+from Ai.network.bayesian.bn_inference import compute_node_distribution, infer_all_latent_nodes
+from benchmarks.seed import PROFILES, TASK_TYPES
+
+DEFAULT_ITERATIONS = 200
+PARTIAL_EVIDENCE = ("FocusPeakState", "FlexibilityLevel")
+QUERIES = ("EnergyPattern", "PreferredTimeOfDay_Meeting", "PreferredDayType_Meeting")
+
+
+def _build_network(history: int) -> UserBayesianNetwork:
+    """A trained network for the "office" profile with `history` observations."""
+    prefs = SimpleNamespace(
+        default_duration_minutes=60, deadline_behavior="ON_TIME", flexibility="MEDIUM",
+        **PROFILES["office"],
+    )
+    bn = UserBayesianNetwork(1)
+    bn.initialize_from_preferences(prefs)
+    monday = datetime(2025, 11, 24)
+    for i in range(history):
+        start = monday + timedelta(days=i % 7, hours=8 + i % 10)
+        bn.update_from_task({
+            "user_id": 1, "task_type": TASK_TYPES[i % 3], "priority": "MEDIUM",
+            "scheduled_start": start, "scheduled_end": start + timedelta(hours=1),
+            "duration_minutes": 60,
+        })
+    return bn
+
+
+def _time(fn: Callable[[], object], iterations: int) -> Dict[str, float]:
+    fn()
+    samples = []
+    for _ in range(iterations):
+        t0 = perf_counter()
+        fn()
+        samples.append((perf_counter() - t0) * 1e6)
+    p50, p95 = np.percentile(samples, [50, 95])
+    return {"p50_us": round(float(p50), 1), "p95_us": round(float(p95), 1)}
+
+
+def _max_diff(a: Dict[str, float], b: Dict[str, float]) -> float:
+    return max(abs(a[s] - b.get(s, 0.0)) for s in a)
+
+
+def run(iterations: int = DEFAULT_ITERATIONS, history: int = 50) -> List[Dict]:
+    """
+    Time both modes for every case and query.
+
+    Returns:
+        One entry per (case, query) with the latencies of both modes and
+        the largest probability difference between them
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as bn_dir:
+        bn_persistence.DATA_DIR = Path(bn_dir)
+        network = _build_network(history).network
+        full = dict(network.evidence)
+        cases = {
+            "full evidence": full,
+            "partial evidence": {k: full[k] for k in PARTIAL_EVIDENCE},
+        }
+
+        for case, evidence in cases.items():
+            network.evidence = dict(evidence)
+            for query in QUERIES:
+                approx = compute_node_distribution(network, query)
+                exact = compute_node_distribution(network, query, exact=True)
+                results.append(dict(
+                    case=case, query=query,
+                    approximate=_time(lambda: compute_node_distribution(network, query), iterations),
+                    exact=_time(lambda: compute_node_distribution(network, query, exact=True), iterations),
+                    max_diff=round(_max_diff(exact, approx), 4),
+                ))
+            results.append(dict(
+                case=case, query="infer_all_latent_nodes",
+                approximate=_time(lambda: infer_all_latent_nodes(network), iterations),
+                exact=_time(lambda: infer_all_latent_nodes(network, exact=True), iterations),
+                max_diff=None,
+            ))
+        network.evidence = full
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark approximate vs exact BN inference")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument("--history", type=int, default=50, help="observations in the network")
+    parser.add_argument("--output", help="optional JSON report path")
+    args = parser.parse_args(argv)
+
+    results = run(args.iterations, args.history)
+    for r in results:
+        diff = "-" if r["max_diff"] is None else f"{r['max_diff']:.4f}"
+        print(f"{r['case']:<17} {r['query']:<28}"
+              f"  approx p50 {r['approximate']['p50_us']:9.1f} us"
+              f"  exact p50 {r['exact']['p50_us']:9.1f} us  max diff {diff}")
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        print(f"Wrote {len(results)} results to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Synthetic users for the benchmarks.
+
+Each user gets preferences from one of PROFILES, `n_tasks` non-overlapping
+scheduled tasks spread around today (roughly three quarters in the past,
+like a real history) plus a few legacy due-date-only tasks, and a BN
+trained on those tasks.
+"""
+
+import random
+from datetime import datetime, time, timedelta
+from typing import Dict
+
+from models import User, UserPreferences, Task, db
+from Ai.network.inference import initialize_bn_for_user
+from retrain_bn_from_existing_tasks import retrain_user_bn
+
+# days_off uses the app convention Sun=0..Sat=6
+PROFILES: Dict[str, Dict] = {
+    "office": dict(
+        days_off=[0, 6],
+        workday_pref_start=time(9, 0),
+        workday_pref_end=time(17, 0),
+        focus_peak_start=time(10, 0),
+        focus_peak_end=time(12, 0),
+    ),
+    "early": dict(
+        days_off=[5, 6],
+        workday_pref_start=time(7, 0),
+        workday_pref_end=time(15, 0),
+        focus_peak_start=time(8, 0),
+        focus_peak_end=time(10, 0),
+    ),
+    "open": dict(
+        days_off=[],
+        workday_pref_start=None,
+        workday_pref_end=None,
+        focus_peak_start=None,
+        focus_peak_end=None,
+    ),
+}
+
+TASK_TYPES = ("Meeting", "Training", "Studies")
+PRIORITIES = ("LOW", "MEDIUM", "HIGH")
+DURATIONS = (15, 30, 45, 60, 90, 120)
+
+# Share of tasks that only have a legacy due_date (no scheduled_start)
+LEGACY_SHARE = 0.05
+
+
+def _task_span_days(n_tasks: int) -> int:
+    """Days the tasks are spread over: about six tasks per day, at least a month."""
+    return max(30, n_tasks // 6)
+
+
+def seed_user(user_id: int, n_tasks: int, profile: str, seed: int = 0) -> None:
+    """
+    Create a user with preferences, tasks and a trained BN.
+
+    Args:
+        user_id: ID of the new user
+        n_tasks: Number of tasks to create
+        profile: Key of PROFILES
+        seed: Random seed, so runs of the same commit see the same data
+    """
+    rng = random.Random(seed * 1_000_003 + user_id)
+
+    db.session.add(User(
+        id=user_id,
+        firebase_uid=f"bench_uid_{user_id}",
+        email=f"bench_{user_id}@example.com",
+    ))
+    db.session.add(UserPreferences(
+        user_id=user_id,
+        default_duration_minutes=60,
+        deadline_behavior="ON_TIME",
+        flexibility="MEDIUM",
+        **PROFILES[profile],
+    ))
+    db.session.commit()
+
+    span = _task_span_days(n_tasks)
+    first_day = datetime.combine(datetime.now().date(), time(0, 0)) - timedelta(days=span * 3 // 4)
+    taken: Dict = {}
+    rows = []
+    while len(rows) < n_tasks:
+        minutes = rng.choice(DURATIONS)
+        day = first_day + timedelta(days=rng.randrange(span))
+        start = day + timedelta(minutes=15 * rng.randrange(7 * 4, 19 * 4))
+        end = start + timedelta(minutes=minutes)
+        day_tasks = taken.setdefault(day, [])
+        if any(s < end and start < e for s, e in day_tasks):
+            continue
+        day_tasks.append((start, end))
+
+        row = dict(
+            title=f"bench task {len(rows)}",
+            task_type=rng.choice(TASK_TYPES),
+            priority=rng.choice(PRIORITIES),
+            status="TODO",
+            user_id=user_id,
+            duration_minutes=minutes,
+        )
+        if rng.random() < LEGACY_SHARE:
+            row["due_date"] = start
+        else:
+            row["scheduled_start"] = start
+            row["scheduled_end"] = end
+        rows.append(row)
+
+    db.session.bulk_insert_mappings(Task, rows)
+    db.session.commit()
+
+    initialize_bn_for_user(user_id)
+    if n_tasks:
+        retrain_user_bn(user_id)
@@ -0,0 +1,247 @@
+"""
+Latency benchmark for suggest_slots_for_user().
+
+Every scenario mirrors how a route calls the engine for one search case:
+
+    auto / day / week / month   /api/ai/suggest strategies
+    preferred_time              CASE 2.C: date range + time of day
+    fixed_datetime              CASE 2.D: date and time, no duration
+    time_only                   CASE 2.G: time of day only
+    duration_only               duration only (default horizon search)
+
+Scenarios that scan a horizon run once per horizon in HORIZONS_DAYS; the
+others run once (horizon_days is then null in the output). Calls bypass
+the suggestion cache.
+
+The JSON output has a "meta" block (commit, Python, settings) and one
+"results" entry per user size, profile, scenario and horizon with
+latency percentiles in milliseconds over `repeats` timed calls, the
+number of BN loads, the number of suggestions returned and the scan work
+of one call: slots scored, days pruned by the score bound and, for
+open-ended scans, days examined. Pass --compare with an earlier output
+file to print the p50/p95 change of every case.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, time, timedelta
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from config import app, db
+from Ai.network.bayesian import bn_persistence
+from Ai.suggest_slots import suggest_slots_for_user, ScoringSession
+from benchmarks.seed import PROFILES, seed_user
+
+TASK_COUNTS = (0, 100, 1000, 10000)
+HORIZONS_DAYS = (7, 21, 30, 90)
+DEFAULT_REPEATS = 20
+DURATION_MINUTES = 60
+
+
+def _day(now: datetime, offset: int) -> datetime:
+    return datetime.combine(now.date() + timedelta(days=offset), time(0, 0))
+
+
+def _end_of_day(now: datetime, offset: int) -> datetime:
+    return _day(now, offset + 1) - timedelta(microseconds=1)
+
+
+# name -> (uses horizon, kwargs builder(now, horizon_days))
+SCENARIOS: Dict[str, tuple[bool, Callable[[datetime, Optional[int]], Dict]]] = {
+    "auto": (True, lambda now, h: dict(window_start=now, horizon_days=h)),
+    "day": (False, lambda now, h: dict(
+        window_start=_day(now, 1), window_end=_end_of_day(now, 1), explicit_date_requested=True,
+    )),
+    "week": (False, lambda now, h: dict(window_start=now, window_end=_end_of_day(now, 6))),
+    "month": (False, lambda now, h: dict(window_start=now, window_end=_end_of_day(now, 29))),
+    "preferred_time": (True, lambda now, h: dict(
+        window_start=_day(now, 1), window_end=_end_of_day(now, h), preferred_time_of_day=(10, 0),
+        horizon_days=h, step_minutes=30,
+    )),
+    "fixed_datetime": (False, lambda now, h: dict(
+        preferred_start=_day(now, 1).replace(hour=10), explicit_datetime_given=True,
+        explicit_date_requested=True, step_minutes=30,
+    )),
+    "time_only": (True, lambda now, h: dict(
+        preferred_time_of_day=(16, 0), fixed_time_search=True, horizon_days=h, step_minutes=30,
+    )),
+    "duration_only": (True, lambda now, h: dict(horizon_days=h, step_minutes=30)),
+}
+
+
+def _percentiles(samples_ms: List[float]) -> Dict[str, float]:
+    p50, p95, p99 = np.percentile(samples_ms, [50, 95, 99])
+    return {
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "mean_ms": round(float(np.mean(samples_ms)), 3),
+        "max_ms": round(float(np.max(samples_ms)), 3),
+    }
+
+
+def time_scenario(user_id: int, kwargs: Dict, repeats: int, warmup: int = 1) -> Dict:
+    """
+    Time repeated identical searches.
+
+    Args:
+        user_id: User to search for
+        kwargs: Extra suggest_slots_for_user() arguments
+        repeats: Timed calls
+        warmup: Untimed calls made first
+
+    Returns:
+        Dict with latency percentiles, repeat count, BN loads, and the
+        number of suggestions and scan work counters of the last call
+    """
+    search = dict(user_id=user_id, duration_minutes=DURATION_MINUTES, use_cache=False, **kwargs)
+    for _ in range(warmup):
+        suggest_slots_for_user(**search)
+
+    samples = []
+    loads_before = ScoringSession.total_loads
+    suggestions, stats, scorer = [], {}, None
+    for _ in range(repeats):
+        # A fresh session per call, as the engine would open, to read its counters
+        stats, scorer = {}, ScoringSession(user_id, "Meeting")
+        t0 = perf_counter()
+        suggestions = suggest_slots_for_user(stats=stats, scorer=scorer, **search)
+        samples.append((perf_counter() - t0) * 1000)
+
+    result = _percentiles(samples)
+    result.update(
+        repeats=repeats,
+        bn_loads=ScoringSession.total_loads - loads_before,
+        suggestions=len(suggestions),
+        candidates_scored=scorer.scored if scorer else None,
+        days_pruned=scorer.days_pruned if scorer else None,
+        days_examined=stats.get("days_examined"),
+    )
+    return result
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, cwd=Path(__file__).parent, check=True,
+        )
+        return out.stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(
+    task_counts=TASK_COUNTS,
+    profiles=tuple(PROFILES),
+    scenarios=tuple(SCENARIOS),
+    horizons=HORIZONS_DAYS,
+    repeats: int = DEFAULT_REPEATS,
+    seed: int = 0,
+) -> Dict:
+    """
+    Seed one user per task count and profile, then time every scenario.
+
+    Returns:
+        Benchmark report ({"meta": ..., "results": [...]})
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as bn_dir, app.app_context():
+        bn_persistence.DATA_DIR = Path(bn_dir)
+        db.create_all()
+
+        user_id = 0
+        for n_tasks in task_counts:
+            for profile in profiles:
+                user_id += 1
+                seed_user(user_id, n_tasks, profile, seed)
+                now = datetime.now()
+                for name in scenarios:
+                    uses_horizon, build = SCENARIOS[name]
+                    for horizon in (horizons if uses_horizon else (None,)):
+                        stats = time_scenario(user_id, build(now, horizon), repeats)
+                        results.append(dict(
+                            tasks=n_tasks, profile=profile, scenario=name, horizon_days=horizon, **stats,
+                        ))
+                        print(f"{n_tasks:>6} {profile:<7} {name:<15} {str(horizon or '-'):>4}"
+                              f"  p50 {stats['p50_ms']:9.2f} ms  p95 {stats['p95_ms']:9.2f} ms"
+                              f"  loads {stats['bn_loads']}  scored {stats['candidates_scored']}", file=sys.stderr)
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "repeats": repeats,
+            "duration_minutes": DURATION_MINUTES,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def _case_key(entry: Dict) -> tuple:
+    return entry["tasks"], entry["profile"], entry["scenario"], entry["horizon_days"]
+
+
+def compare(old: Dict, new: Dict) -> List[str]:
+    """
+    Describe the latency change of every case present in both reports.
+
+    Returns:
+        One line per case, p50 and p95 of the new report relative to the old
+    """
+    baseline = {_case_key(e): e for e in old["results"]}
+    lines = []
+    for entry in new["results"]:
+        before = baseline.get(_case_key(entry))
+        if not before:
+            continue
+        ratios = [
+            entry[k] / before[k] if before[k] else float("nan")
+            for k in ("p50_ms", "p95_ms")
+        ]
+        tasks, profile, scenario, horizon = _case_key(entry)
+        lines.append(
+            f"{tasks:>6} {profile:<7} {scenario:<15} {str(horizon or '-'):>4}"
+            f"  p50 x{ratios[0]:.2f}  p95 x{ratios[1]:.2f}"
+        )
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark suggest_slots_for_user()")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(TASK_COUNTS), help="task counts per user")
+    parser.add_argument("--profiles", nargs="+", choices=list(PROFILES), default=list(PROFILES))
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--horizons", type=int, nargs="+", default=list(HORIZONS_DAYS))
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="timed calls per case")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_suggest.json", help="JSON report path")
+    parser.add_argument("--compare", help="earlier JSON report to compare against")
+    args = parser.parse_args(argv)
+
+    report = run(
+        task_counts=args.sizes,
+        profiles=args.profiles,
+        scenarios=args.scenarios,
+        horizons=args.horizons,
+        repeats=args.repeats,
+        seed=args.seed,
+    )
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    print(f"Wrote {len(report['results'])} results to {args.output}", file=sys.stderr)
+
+    if args.compare:
+        old = json.loads(Path(args.compare).read_text())
+        print(f"Compared with {args.compare} (commit {old['meta'].get('commit')}):")
+        for line in compare(old, report):
+            print(line)
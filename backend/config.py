@@ -5,6 +5,7 @@ from flask_cors import CORS
 import os
 import firebase_admin
 from firebase_admin import credentials, auth
+from services.logging_setup import init_logging, TRACE_HEADER, TRACE_ID_HEADER
 
 app = Flask(__name__)
 
@@ -17,7 +18,8 @@ CORS(
     resources={r"/api/*": {"origins": ALLOWED_ORIGINS}},
     supports_credentials=True, 
     methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
-    allow_headers=["Content-Type", "Authorization", "Accept", "Origin"],
+    allow_headers=["Content-Type", "Authorization", "Accept", "Origin", TRACE_HEADER],
+    expose_headers=[TRACE_ID_HEADER],
 )
 
 @app.after_request
@@ -27,11 +29,14 @@ def add_cors_headers(resp):
         resp.headers["Access-Control-Allow-Origin"] = origin
         resp.headers["Vary"] = "Origin"
         resp.headers["Access-Control-Allow-Credentials"] = "true"
-        resp.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization, Accept, Origin"
+        resp.headers["Access-Control-Allow-Headers"] = f"Content-Type, Authorization, Accept, Origin, {TRACE_HEADER}"
         resp.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS, PATCH"
     return resp
 # -------------------------
 
+# ---------- Logging ----------
+init_logging(app)
+
 IN_DOCKER = os.path.exists("/.dockerenv")
 if IN_DOCKER:
     try:
@@ -0,0 +1,31 @@
+"""free/busy bitmap
+
+Revision ID: 5d2c8e1f7a90
+Revises: b4e193c0d466
+Create Date: 2026-10-17 09:12:44.108213
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2c8e1f7a90'
+down_revision = 'b4e193c0d466'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('free_busy_bitmap',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('window_start', sa.DateTime(), nullable=False),
+    sa.Column('bits', sa.LargeBinary(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade():
+    op.drop_table('free_busy_bitmap')
@@ -0,0 +1,23 @@
+"""task (user_id, scheduled_end) index
+
+Revision ID: 8a41c7d2e3b5
+Revises: 5d2c8e1f7a90
+Create Date: 2026-10-17 15:03:21.517204
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8a41c7d2e3b5'
+down_revision = '5d2c8e1f7a90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_task_user_end', 'task', ['user_id', 'scheduled_end'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_task_user_end', table_name='task')
@@ -107,6 +107,8 @@ class Task(db.Model):
     __table_args__ = (
         # speeds up: "all tasks of a user ordered by start" queries
         db.Index("ix_task_user_start", "user_id", "scheduled_start"),
+        # speeds up: busy intervals overlapping a range (_load_busy_intervals)
+        db.Index("ix_task_user_end", "user_id", "scheduled_end"),
     )
 
     def to_json(self):
@@ -177,3 +179,21 @@ class UserPreferences(db.Model):
             "createdAt": self.created_at.isoformat() if self.created_at else None,
             "updatedAt": self.updated_at.isoformat() if self.updated_at else None,
         }
+
+
+class FreeBusyBitmap(db.Model):
+    """
+    Materialized free/busy picture of a user (see services/free_busy.py).
+
+    `bits` holds one bit per 5-minute cell from `window_start` on, set when
+    any busy interval touches the cell; it is kept up to date by the task
+    hooks and rolled forward by reconcile_free_busy.py.
+    """
+    __tablename__ = "free_busy_bitmap"
+
+    user_id = db.Column(
+        db.Integer, db.ForeignKey("user.id", ondelete="CASCADE"), primary_key=True
+    )
+    window_start = db.Column(db.DateTime, nullable=False)
+    bits = db.Column(db.LargeBinary, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
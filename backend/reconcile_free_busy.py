@@ -0,0 +1,31 @@
+"""
+Nightly maintenance of the free/busy bitmaps (services/free_busy.py).
+
+This script:
+1. Finds all users with tasks or a stored bitmap
+2. Rolls each user's window forward so it starts today
+3. Rebuilds the bitmap from the task table and reports users whose stored
+   bitmap had drifted from it
+
+Schedule it once a day, e.g. from cron:
+
+    0 3 * * *  cd /app && python reconcile_free_busy.py
+"""
+from config import app
+from services.free_busy import reconcile_all
+
+
+def main():
+    with app.app_context():
+        results = reconcile_all()
+
+        drifted = [r for r in results if r["drift_cells"]]
+        print(f"Reconciled free/busy bitmaps of {len(results)} users")
+        for r in drifted:
+            print(f"  ⚠️  User {r['user_id']}: {r['drift_cells']} cells differed from the task table")
+        if not drifted:
+            print("  ✅ No drift")
+
+
+if __name__ == "__main__":
+    main()
@@ -26,6 +26,7 @@ def task_to_observation(task: Task) -> dict:
         dur = int((end - start).total_seconds() // 60)
     
     return {
+        "task_id": task.id,
         "user_id": task.user_id,
         "task_type": task.task_type or "Meeting",
         "priority": task.priority or "MEDIUM",
@@ -80,7 +81,7 @@ def retrain_user_bn(user_id: int, dry_run: bool = False) -> dict:
         
         # Clear existing observations
         old_count = len(bn.observations)
-        bn.observations = []
+        bn.observations = {}
         bn.statistics = bn.statistics.__class__()  # Reset statistics
         
         # Add all observations
@@ -88,14 +89,14 @@ def retrain_user_bn(user_id: int, dry_run: bool = False) -> dict:
         for task in tasks:
             obs = task_to_observation(task)
             if obs["scheduled_start"] and obs["scheduled_end"]:
-                bn.observations.append(obs)
+                bn.observations[task.id] = obs
                 bn.statistics.add_observation(obs)
                 valid_count += 1
         
         # Recompute CPTs from observations
         if bn.observations:
             from Ai.network.bayesian.bn_learning import recompute_all_cpts_from_observations
-            recompute_all_cpts_from_observations(bn.network, bn.observations)
+            recompute_all_cpts_from_observations(bn.network, bn.observations.values())
         
         # Save to disk
         if not dry_run:
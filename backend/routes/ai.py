@@ -1,15 +1,29 @@
-from flask import Blueprint, request, jsonify, g
+from flask import Blueprint, Response, current_app, request, jsonify, g
 from datetime import datetime, timedelta, time as dtime
 import calendar
+import contextvars
+import json
+import logging
+import queue
+import threading
 from flask_cors import cross_origin
 from services.auth_middleware import auth_required
 from models import Task, db
 from Ai.NLP import handle_free_text_input, parse_free_text
-from Ai.suggest_slots import suggest_slots_for_user
+from Ai.suggest_slots import suggest_slots_for_user, suggest_batch_for_user, next_free_slot, busy_range, BusyIndex
 from routes.tasks import TimeConflictError  
+from services.suggestion_tokens import query_fingerprint, issue_token, read_token
+from services.logging_setup import get_logger
+from services.free_busy import is_slot_free
+
+logger = get_logger(__name__)
 
 ai_bp = Blueprint("ai", __name__, url_prefix="/api/ai")
 
+# Search horizon of the 'auto' strategy (/api/ai/suggest horizonDays)
+DEFAULT_HORIZON_DAYS = 30
+MAX_HORIZON_DAYS = 365
+
 CORS_ORIGINS = ["http://localhost:3000", "*"]
 
 
@@ -57,7 +71,7 @@ def _get_user_default_duration(user_id: int) -> int:
     prefs = db.session.query(UserPreferences).filter_by(user_id=user_id).first()
     default_duration = prefs.default_duration_minutes if prefs else 60
     
-    print(f"[DURATION DEBUG] User {user_id} default_duration_minutes: {default_duration}")
+    logger.debug("[DURATION DEBUG] User %s default_duration_minutes: %s", user_id, default_duration)
     
     return default_duration
 
@@ -80,6 +94,8 @@ def parse_task():
         - shouldCreateDirectly: true if all D/T/L present (CASE 2.A)
         - shouldCreateDirectly: false if at least one missing (CASE 2.B)
         - suggestions: empty if shouldCreateDirectly=true, populated otherwise
+        - page / nextToken: with suggestions, the page number and a
+          continuationToken (body or query) that resumes on the next page
     """
     # Check if BN is initialized (with lazy init for existing users)
     from Ai.network.inference import ensure_bn_initialized
@@ -105,15 +121,14 @@ def parse_task():
     has_duration = critical.get("has_duration", False)
     
     if has_date and has_time and not has_duration:
-        print(f"\n[CASE 4: DATE+TIME, NO DURATION] ============================================")
-        print(f"[CASE 4] User provided Date + Time but NO Duration")
-        print(f"[CASE 4] Fetching user's default_duration_minutes...")
+        logger.debug("[CASE 4] User provided Date + Time but NO Duration")
+        logger.debug("[CASE 4] Fetching user's default_duration_minutes...")
         
         # Fetch user's default duration from preferences
         default_duration = _get_user_default_duration(g.user.id)
         
-        print(f"[DURATION DEBUG] No duration in NLP, using User Preference: {default_duration} minutes")
-        print(f"[CASE 4] Setting duration to {default_duration} and creating task directly")
+        logger.debug("[DURATION DEBUG] No duration in NLP, using User Preference: %s minutes", default_duration)
+        logger.debug("[CASE 4] Setting duration to %s and creating task directly", default_duration)
         
         # Add duration to parsed data
         parsed["durationMinutes"] = default_duration
@@ -124,22 +139,19 @@ def parse_task():
                 start_dt = datetime.fromisoformat(parsed["dueDateTime"])
                 end_dt = start_dt + timedelta(minutes=default_duration)
                 
-                print(f"[CASE 4] Task details:")
-                print(f"[CASE 4]   - Start: {start_dt}")
-                print(f"[CASE 4]   - End: {end_dt}")
-                print(f"[CASE 4]   - Duration: {default_duration} minutes")
-                print(f"[CASE 4] Checking for conflicts...")
+                logger.debug("[CASE 4] Task details:")
+                logger.debug("[CASE 4]   - Start: %s", start_dt)
+                logger.debug("[CASE 4]   - End: %s", end_dt)
+                logger.debug("[CASE 4]   - Duration: %s minutes", default_duration)
+                logger.debug("[CASE 4] Checking for conflicts...")
                 
                 # Check for overlaps
-                from Ai.suggest_slots import _load_busy_intervals, _slot_is_free
-                busy_intervals = _load_busy_intervals(g.user.id)
-                is_free = _slot_is_free(start_dt, end_dt, busy_intervals)
+                is_free = is_slot_free(g.user.id, start_dt, end_dt)
                 
-                print(f"[CASE 4] Slot is FREE? {is_free}")
+                logger.debug("[CASE 4] Slot is FREE? %s", is_free)
                 
                 if not is_free:
-                    print(f"[CASE 4] ❌ CONFLICT! Returning 409 with parsed data")
-                    print(f"[CASE 4] ============================================\n")
+                    logger.info("[CASE 4] ❌ CONFLICT! Returning 409 with parsed data")
                     return jsonify({
                         "status": "conflict",
                         "message": "TimeConflict: Proposed time slot is already busy.",
@@ -155,7 +167,7 @@ def parse_task():
                     }), 409
                 
                 # No conflict → create task directly
-                print(f"[CASE 4] ✅ No conflict! Creating task directly...")
+                logger.debug("[CASE 4] ✅ No conflict! Creating task directly...")
                 from routes.tasks import create_task_with_bn_update
                 
                 task_type = parsed.get("task_type") or "Meeting"
@@ -174,8 +186,7 @@ def parse_task():
                     duration_minutes=default_duration,
                 )
                 
-                print(f"[CASE 4] ✅ Task created successfully with ID: {new_task.id}")
-                print(f"[CASE 4] ============================================\n")
+                logger.debug("[CASE 4] ✅ Task created successfully with ID: %s", new_task.id)
                 
                 result["shouldCreateDirectly"] = True
                 result["suggestions"] = []
@@ -184,9 +195,8 @@ def parse_task():
                 return jsonify(result), 200
                 
             except (ValueError, KeyError) as e:
-                print(f"[CASE 4] ❌ Error: {e}")
-                print(f"[CASE 4] Falling back to suggestion generation")
-                print(f"[CASE 4] ============================================\n")
+                logger.warning("[CASE 4] ❌ Error: %s", e)
+                logger.debug("[CASE 4] Falling back to suggestion generation")
                 # Continue with normal suggestion flow if parsing fails
     
     # Check if all three critical fields (D/T/L) are present
@@ -202,28 +212,24 @@ def parse_task():
                 duration = parsed.get("durationMinutes")
                 if not duration:
                     duration = _get_user_default_duration(g.user.id)
-                    print(f"[DURATION DEBUG] No duration in NLP, using User Preference: {duration} minutes")
+                    logger.debug("[DURATION DEBUG] No duration in NLP, using User Preference: %s minutes", duration)
                 else:
                     duration = int(duration)
                 end_dt = start_dt + timedelta(minutes=duration)
                 
-                print(f"\n[PARSE TASK OVERLAP CHECK] ============================================")
-                print(f"[PARSE TASK OVERLAP CHECK] Checking for overlaps:")
-                print(f"[PARSE TASK OVERLAP CHECK]   - Start: {start_dt}")
-                print(f"[PARSE TASK OVERLAP CHECK]   - End: {end_dt}")
-                print(f"[PARSE TASK OVERLAP CHECK]   - Duration: {duration} minutes")
+                logger.debug("[PARSE TASK OVERLAP CHECK] Checking for overlaps:")
+                logger.debug("[PARSE TASK OVERLAP CHECK]   - Start: %s", start_dt)
+                logger.debug("[PARSE TASK OVERLAP CHECK]   - End: %s", end_dt)
+                logger.debug("[PARSE TASK OVERLAP CHECK]   - Duration: %s minutes", duration)
                 
                 # Load busy intervals and check for overlap
-                from Ai.suggest_slots import _load_busy_intervals, _slot_is_free
-                busy_intervals = _load_busy_intervals(g.user.id)
-                is_free = _slot_is_free(start_dt, end_dt, busy_intervals)
+                is_free = is_slot_free(g.user.id, start_dt, end_dt)
                 
-                print(f"[PARSE TASK OVERLAP CHECK] Slot is FREE? {is_free}")
-                print(f"[PARSE TASK OVERLAP CHECK] ============================================\n")
+                logger.debug("[PARSE TASK OVERLAP CHECK] Slot is FREE? %s", is_free)
                 
                 if not is_free:
                     # CONFLICT DETECTED! Return 409 with task data
-                    print(f"[PARSE TASK 409] ❌ CONFLICT! Returning 409 with parsed data")
+                    logger.info("[PARSE TASK 409] ❌ CONFLICT! Returning 409 with parsed data")
                     return jsonify({
                         "status": "conflict",
                         "message": "TimeConflict: Proposed time slot is already busy.",
@@ -239,7 +245,7 @@ def parse_task():
                         "priority": parsed.get("priority") or "MEDIUM"
                     }), 409
             except (ValueError, KeyError) as e:
-                print(f"[PARSE TASK OVERLAP CHECK] Failed to parse datetime: {e}")
+                logger.warning("[PARSE TASK OVERLAP CHECK] Failed to parse datetime: %s", e)
                 # Continue with normal flow if parsing fails
         
         # No conflict or couldn't check → proceed with direct creation
@@ -254,7 +260,7 @@ def parse_task():
     if not duration:
         # CRITICAL FIX: Use user preference instead of hardcoded 60
         duration = _get_user_default_duration(g.user.id)
-        print(f"[DURATION DEBUG] No duration in NLP, using User Preference: {duration} minutes")
+        logger.debug("[DURATION DEBUG] No duration in NLP, using User Preference: %s minutes", duration)
     task_type = parsed.get("task_type") or "Meeting"
 
     try:
@@ -314,20 +320,14 @@ def parse_task():
     fixed_time_search = False
     if not has_date and has_duration and preferred_time_tuple:
         fixed_time_search = True
-        print(f"\n[CASE 2: FIXED-TIME SEARCH] ============================================")
-        print(f"[CASE 2] User provided Time + Duration but NO Date")
-        print(f"[CASE 2] Fixed time: {preferred_time_tuple[0]:02d}:{preferred_time_tuple[1]:02d}")
-        print(f"[CASE 2] Duration: {duration} minutes")
-        print(f"[CASE 2] Will scan next 30 days for slots at this exact time")
-        print(f"[CASE 2] ============================================\n")
+        logger.debug("[CASE 2] User provided Time + Duration but NO Date")
+        logger.debug("[CASE 2] Fixed time: %02d:%02d", preferred_time_tuple[0], preferred_time_tuple[1])
+        logger.debug("[CASE 2] Duration: %s minutes", duration)
+        logger.debug("[CASE 2] Will scan next 30 days for slots at this exact time")
 
-    # Generate suggestions based on known constraints
-    # BN will fill in missing fields (date, time, or duration)
-    suggestions = suggest_slots_for_user(
-        user_id=g.user.id,
+    search = dict(
         duration_minutes=int(duration),
         task_type=task_type,
-        page=page,
         page_size=3,
         horizon_days=30 if fixed_time_search else 21,  # Wider horizon for fixed-time search
         step_minutes=30,
@@ -342,8 +342,40 @@ def parse_task():
         fixed_time_search=fixed_time_search,  # CASE 2: Strict time filtering
     )
 
+    # Continuation token from the previous page: resume after its last slot
+    busy = BusyIndex.for_user(g.user.id, *busy_range(
+        duration_minutes=search["duration_minutes"],
+        horizon_days=search["horizon_days"],
+        preferred_start=preferred_start,
+        window_start=window_start,
+        window_end=window_end,
+    ))
+    query_fp = query_fingerprint(**search)
+    after = None
+    resumed = read_token(
+        body.get("continuationToken") or request.args.get("continuationToken"),
+        g.user.id, query_fp, busy.fingerprint(),
+    )
+    if resumed:
+        after, page = resumed
+
+    # Generate suggestions based on known constraints
+    # BN will fill in missing fields (date, time, or duration)
+    suggestions = suggest_slots_for_user(
+        user_id=g.user.id,
+        page=page,
+        busy=busy,
+        after=after,
+        **search,
+    )
+
     result["shouldCreateDirectly"] = False
     result["suggestions"] = suggestions
+    result["page"] = page
+    result["nextToken"] = (
+        issue_token(g.user.id, query_fp, busy.fingerprint(), suggestions[-1], page + 1)
+        if len(suggestions) == search["page_size"] else None
+    )
     return jsonify(result), 200
 
 
@@ -388,7 +420,7 @@ def create_from_text():
     duration = parsed.get("durationMinutes")
     if not duration:
         duration = _get_user_default_duration(g.user.id)
-        print(f"[DURATION DEBUG] No duration in NLP, using User Preference: {duration} minutes")
+        logger.debug("[DURATION DEBUG] No duration in NLP, using User Preference: %s minutes", duration)
     else:
         duration = int(duration)
     end_dt = start_dt + timedelta(minutes=duration)
@@ -428,11 +460,11 @@ def create_from_text():
         }), 201
     except TimeConflictError as e:
         # CRITICAL FIX: Return parsed date/time data with 409 so frontend can pass to suggest endpoint
-        print(f"[CONFLICT FIX] Returning 409 with parsed task data:")
-        print(f"[CONFLICT FIX]   - scheduledStart: {start_dt.isoformat()}")
-        print(f"[CONFLICT FIX]   - scheduledEnd: {end_dt.isoformat()}")
-        print(f"[CONFLICT FIX]   - durationMinutes: {duration}")
-        print(f"[CONFLICT FIX]   - task_type: {task_type}")
+        logger.debug("[CONFLICT FIX] Returning 409 with parsed task data:")
+        logger.debug("[CONFLICT FIX]   - scheduledStart: %s", start_dt.isoformat())
+        logger.debug("[CONFLICT FIX]   - scheduledEnd: %s", end_dt.isoformat())
+        logger.debug("[CONFLICT FIX]   - durationMinutes: %s", duration)
+        logger.debug("[CONFLICT FIX]   - task_type: %s", task_type)
         
         return jsonify({
             "status": "conflict", 
@@ -557,22 +589,43 @@ def get_manual_suggestions():
         - task_type (str): Type of task - Meeting/Training/Studies (default: "Meeting")
         - strategy (str): Search strategy - 'day'/'week'/'month'/'auto' (default: "auto")
         - referenceDate (str, optional): ISO format datetime to use as starting point
+        - page (int, optional): Page number (default: 1)
+        - horizonDays (int, optional): Days ahead the 'auto' strategy may search
+          (default: DEFAULT_HORIZON_DAYS, at most MAX_HORIZON_DAYS)
+        - continuationToken (str, optional): nextToken from the previous page;
+          resumes after that page instead of recomputing it (ignored once the
+          user's tasks change or the search differs)
     
     Returns:
-        JSON with suggestions array containing time slots with scores
+        JSON with suggestions array containing time slots with scores, the
+        page number, a nextToken for the following page (null on the last)
+        and daysExamined (days the 'auto' scan looked at, null otherwise)
+    """
+    logger.debug("[DEBUG] Suggest Endpoint Hit. Data: %s", request.get_json())
+    body, status = _manual_suggestions(g.user.id, request.get_json(silent=True) or {})
+    return jsonify(body), status
+
+
+def _manual_suggestions(user_id: int, data: dict, on_candidate=None):
+    """
+    Run a /api/ai/suggest search (see get_manual_suggestions for the fields).
+
+    Args:
+        user_id: User ID
+        data: Request body
+        on_candidate: Optional callback given each candidate as the scan
+                      finds it (used by the streaming endpoint)
+
+    Returns:
+        (response body dict, HTTP status)
     """
-    import traceback
-    print(f"\n[DEBUG] Suggest Endpoint Hit. Data: {request.get_json()}")
-    
     # Check if BN is initialized
     from Ai.network.inference import ensure_bn_initialized
-    if not ensure_bn_initialized(g.user.id):
-        return jsonify({
+    if not ensure_bn_initialized(user_id):
+        return {
             "message": "Please complete your preferences setup first",
             "action_required": "set_preferences"
-        }), 403
-    
-    data = request.get_json(silent=True) or {}
+        }, 403
     
     # CRITICAL FIX: Extract page and page_size FIRST, before any logic that uses them
     # Pagination support - must be at the very beginning
@@ -594,14 +647,22 @@ def get_manual_suggestions():
     if page_size > 20:
         page_size = 20
     
+    # The 'auto' scan stops once later days can't improve the page, so long
+    # horizons only cost what they actually examine
+    try:
+        horizon_days = int(data.get("horizonDays", DEFAULT_HORIZON_DAYS))
+    except (ValueError, TypeError):
+        horizon_days = DEFAULT_HORIZON_DAYS
+    horizon_days = max(1, min(horizon_days, MAX_HORIZON_DAYS))
+    
     # Parse input parameters
     # CRITICAL FIX: Use user preference instead of hardcoded 60
     duration = data.get("durationMinutes")
     if duration is not None:
         duration = int(duration)
     else:
-        duration = _get_user_default_duration(g.user.id)
-        print(f"[DURATION DEBUG] No duration in request, using User Preference: {duration} minutes")
+        duration = _get_user_default_duration(user_id)
+        logger.debug("[DURATION DEBUG] No duration in request, using User Preference: %s minutes", duration)
     
     task_type = data.get("task_type", "Meeting")
     if task_type not in ("Meeting", "Training", "Studies"):
@@ -613,26 +674,25 @@ def get_manual_suggestions():
     # Priority order: scheduledStart > scheduledEnd > dueDate > referenceDate > now
     target_task_date = None
     
-    print(f"\n[DATE EXTRACTION] ============================================")
-    print(f"[DATE EXTRACTION] Received data keys: {list(data.keys())}")
-    print(f"[DATE EXTRACTION]   - scheduledStart: {data.get('scheduledStart')}")
-    print(f"[DATE EXTRACTION]   - scheduledEnd: {data.get('scheduledEnd')}")
-    print(f"[DATE EXTRACTION]   - dueDate: {data.get('dueDate')}")
-    print(f"[DATE EXTRACTION]   - referenceDate: {data.get('referenceDate')}")
+    logger.debug("[DATE EXTRACTION] Received data keys: %s", list(data.keys()))
+    logger.debug("[DATE EXTRACTION]   - scheduledStart: %s", data.get('scheduledStart'))
+    logger.debug("[DATE EXTRACTION]   - scheduledEnd: %s", data.get('scheduledEnd'))
+    logger.debug("[DATE EXTRACTION]   - dueDate: %s", data.get('dueDate'))
+    logger.debug("[DATE EXTRACTION]   - referenceDate: %s", data.get('referenceDate'))
     
     # Try scheduledStart first (most specific)
     if data.get("scheduledStart"):
         try:
             target_task_date = datetime.fromisoformat(data["scheduledStart"].replace('Z', '+00:00'))
-            print(f"[DATE EXTRACTION] ✅ Using scheduledStart as target date: {target_task_date}")
+            logger.debug("[DATE EXTRACTION] ✅ Using scheduledStart as target date: %s", target_task_date)
         except (ValueError, AttributeError) as e:
-            print(f"[DATE EXTRACTION] ❌ Failed to parse scheduledStart: {e}")
+            logger.warning("[DATE EXTRACTION] ❌ Failed to parse scheduledStart: %s", e)
     
     # Try scheduledEnd if scheduledStart not available
     if not target_task_date and data.get("scheduledEnd"):
         try:
             target_task_date = datetime.fromisoformat(data["scheduledEnd"].replace('Z', '+00:00'))
-            print(f"[DEBUG] Using scheduledEnd as target date: {target_task_date}")
+            logger.debug("[DEBUG] Using scheduledEnd as target date: %s", target_task_date)
         except (ValueError, AttributeError):
             pass
     
@@ -640,7 +700,7 @@ def get_manual_suggestions():
     if not target_task_date and data.get("dueDate"):
         try:
             target_task_date = datetime.fromisoformat(data["dueDate"].replace('Z', '+00:00'))
-            print(f"[DEBUG] Using dueDate as target date: {target_task_date}")
+            logger.debug("[DEBUG] Using dueDate as target date: %s", target_task_date)
         except (ValueError, AttributeError):
             pass
     
@@ -652,40 +712,39 @@ def get_manual_suggestions():
             if ref_date_str.endswith('Z'):
                 ref_date_str = ref_date_str[:-1] + '+00:00'
             now = datetime.fromisoformat(ref_date_str)
-            print(f"[DEBUG] Using reference date from request (UTC): {now}")
+            logger.debug("[DEBUG] Using reference date from request (UTC): %s", now)
             
             # FIX: Convert to local system time FIRST, then make naive
             # This prevents early morning UTC shift (06:15 UTC becomes local time, not 06:15 local)
             if now.tzinfo is not None:
                 now = now.astimezone(None).replace(tzinfo=None)
-                print(f"[DEBUG] Converted to Local Naive Time: {now}")
+                logger.debug("[DEBUG] Converted to Local Naive Time: %s", now)
             else:
-                print(f"[DEBUG] Already offset-naive: {now}")
+                logger.debug("[DEBUG] Already offset-naive: %s", now)
         except (ValueError, AttributeError) as e:
-            print(f"[DEBUG] Failed to parse referenceDate '{ref_date_str}': {e}")
+            logger.warning("[DEBUG] Failed to parse referenceDate '%s': %s", ref_date_str, e)
             now = datetime.now()
-            print(f"[DEBUG] Falling back to current time: {now}")
+            logger.debug("[DEBUG] Falling back to current time: %s", now)
     else:
         now = datetime.now()
-        print(f"[DEBUG] No referenceDate provided, using current time: {now}")
+        logger.debug("[DEBUG] No referenceDate provided, using current time: %s", now)
     
     # Smart strategy defaulting: If scheduledStart is provided but no strategy, default to 'day'
     # This ensures date locking for NLP inputs like "Jan 5th for 60 minutes"
     if strategy is None:
         if data.get("scheduledStart") or data.get("dueDate"):
             strategy = "day"
-            print(f"[STRATEGY DEFAULT] ✅ scheduledStart/dueDate provided, defaulting to 'day' strategy")
+            logger.debug("[STRATEGY DEFAULT] ✅ scheduledStart/dueDate provided, defaulting to 'day' strategy")
         else:
             strategy = "auto"
-            print(f"[STRATEGY DEFAULT] ✅ No date provided, defaulting to 'auto' strategy")
+            logger.debug("[STRATEGY DEFAULT] ✅ No date provided, defaulting to 'auto' strategy")
     
     # Validate strategy
     if strategy not in ("day", "week", "month", "auto"):
         strategy = "auto"
-        print(f"[STRATEGY DEFAULT] ⚠️ Invalid strategy, falling back to 'auto'")
+        logger.warning("[STRATEGY DEFAULT] ⚠️ Invalid strategy, falling back to 'auto'")
     
-    print(f"[DATE EXTRACTION] Final strategy: {strategy}")
-    print(f"[DATE EXTRACTION] ============================================\n")
+    logger.debug("[DATE EXTRACTION] Final strategy: %s", strategy)
     
     # Calculate time window based on strategy
     # CRITICAL FIX: For "Same Day" conflict resolution, use the TARGET TASK'S date
@@ -709,41 +768,38 @@ def get_manual_suggestions():
             if window_end.tzinfo is not None:
                 window_end = window_end.astimezone(None).replace(tzinfo=None)
             
-            print(f"\n[WINDOW CONSTRAINT] ============================================")
-            print(f"[WINDOW CONSTRAINT] ✅ Using window from request (e.g., 'next week')")
-            print(f"[WINDOW CONSTRAINT] windowStart: {window_start}")
-            print(f"[WINDOW CONSTRAINT] windowEnd: {window_end}")
-            print(f"[WINDOW CONSTRAINT] Duration: {(window_end - window_start).days + 1} days")
-            print(f"[WINDOW CONSTRAINT] This overrides strategy-based calculation")
-            print(f"[WINDOW CONSTRAINT] ============================================\n")
+            logger.debug("[WINDOW CONSTRAINT] ✅ Using window from request (e.g., 'next week')")
+            logger.debug("[WINDOW CONSTRAINT] windowStart: %s", window_start)
+            logger.debug("[WINDOW CONSTRAINT] windowEnd: %s", window_end)
+            logger.debug("[WINDOW CONSTRAINT] Duration: %s days", (window_end - window_start).days + 1)
+            logger.debug("[WINDOW CONSTRAINT] This overrides strategy-based calculation")
             
             # Skip strategy-based calculation, window is already set
         except (ValueError, AttributeError) as e:
-            print(f"[WINDOW CONSTRAINT] ❌ Failed to parse window constraints: {e}")
-            print(f"[WINDOW CONSTRAINT] Falling back to strategy-based calculation")
+            logger.warning("[WINDOW CONSTRAINT] ❌ Failed to parse window constraints: %s", e)
+            logger.debug("[WINDOW CONSTRAINT] Falling back to strategy-based calculation")
             # Continue with strategy-based calculation below
     
     if not (request_window_start and request_window_end):
         # No explicit window provided, calculate based on strategy
-        print(f"[WINDOW CONSTRAINT] ⚪ No window constraint in request, using strategy: {strategy}")
+        logger.debug("[WINDOW CONSTRAINT] ⚪ No window constraint in request, using strategy: %s", strategy)
     
     if strategy == "day" and not (request_window_start and request_window_end):
         # Same day: Use the FULL day of the target task (00:00 to 23:59:59)
         # Priority: Use target_task_date if available, otherwise fall back to referenceDate (now)
-        print(f"\n[WINDOW CALCULATION] ============================================")
-        print(f"[WINDOW CALCULATION] Strategy: 'day' (Same Day)")
-        print(f"[WINDOW CALCULATION] target_task_date: {target_task_date}")
-        print(f"[WINDOW CALCULATION] now (referenceDate): {now}")
+        logger.debug("[WINDOW CALCULATION] Strategy: 'day' (Same Day)")
+        logger.debug("[WINDOW CALCULATION] target_task_date: %s", target_task_date)
+        logger.debug("[WINDOW CALCULATION] now (referenceDate): %s", now)
         
         if target_task_date:
             # Convert to local time if timezone-aware
             if target_task_date.tzinfo is not None:
                 target_task_date = target_task_date.astimezone(None).replace(tzinfo=None)
             target_date = target_task_date.date()
-            print(f"[WINDOW CALCULATION] ✅ Using extracted task date: {target_date}")
+            logger.debug("[WINDOW CALCULATION] ✅ Using extracted task date: %s", target_date)
         else:
             target_date = now.date()
-            print(f"[WINDOW CALCULATION] ⚠️ Falling back to referenceDate: {target_date}")
+            logger.warning("[WINDOW CALCULATION] ⚠️ Falling back to referenceDate: %s", target_date)
         
         window_start = datetime.combine(target_date, dtime(0, 0, 0))  # Start of day
         window_end = datetime.combine(target_date, dtime(23, 59, 59, 999999))  # End of day
@@ -751,13 +807,12 @@ def get_manual_suggestions():
         # CRITICAL SAFETY CHECK: If paginating (page > 1) with a locked date,
         # ENFORCE the window boundaries to prevent date leakage
         if page > 1 and data.get("scheduledStart"):
-            print(f"[PAGINATION SAFETY CHECK] Page {page} with scheduledStart - ENFORCING date lock")
-            print(f"[PAGINATION SAFETY CHECK] Window LOCKED to: {window_start.date()} to {window_end.date()}")
+            logger.debug("[PAGINATION SAFETY CHECK] Page %s with scheduledStart - ENFORCING date lock", page)
+            logger.debug("[PAGINATION SAFETY CHECK] Window LOCKED to: %s to %s", window_start.date(), window_end.date())
             # Window is already set correctly above, just logging for safety
         
-        print(f"[WINDOW CALCULATION] ✅ Final window_start: {window_start}")
-        print(f"[WINDOW CALCULATION] ✅ Final window_end: {window_end}")
-        print(f"[WINDOW CALCULATION] ============================================\n")
+        logger.debug("[WINDOW CALCULATION] ✅ Final window_start: %s", window_start)
+        logger.debug("[WINDOW CALCULATION] ✅ Final window_end: %s", window_end)
     elif strategy == "week" and not (request_window_start and request_window_end):
         # This week: from now until end of current calendar week (Saturday 23:59:59)
         # weekday() returns: 0=Monday, 1=Tuesday, ..., 5=Saturday, 6=Sunday
@@ -773,12 +828,10 @@ def get_manual_suggestions():
         saturday = now.date() + timedelta(days=days_until_saturday)
         window_end = datetime.combine(saturday, dtime(23, 59, 59, 999999))
         
-        print(f"[WINDOW CALCULATION] ============================================")
-        print(f"[WINDOW CALCULATION] Strategy: This Week")
-        print(f"[WINDOW CALCULATION] Current date: {now.date()} ({['Mon','Tue','Wed','Thu','Fri','Sat','Sun'][current_weekday]})")
-        print(f"[WINDOW CALCULATION] Days until Saturday: {days_until_saturday}")
-        print(f"[WINDOW CALCULATION] ✅ window_end set to: {window_end} (Saturday)")
-        print(f"[WINDOW CALCULATION] ============================================\n")
+        logger.debug("[WINDOW CALCULATION] Strategy: This Week")
+        logger.debug("[WINDOW CALCULATION] Current date: %s (%s)", now.date(), ['Mon','Tue','Wed','Thu','Fri','Sat','Sun'][current_weekday])
+        logger.debug("[WINDOW CALCULATION] Days until Saturday: %s", days_until_saturday)
+        logger.debug("[WINDOW CALCULATION] ✅ window_end set to: %s (Saturday)", window_end)
     elif strategy == "month" and not (request_window_start and request_window_end):
         # This month: from start of next week (Sunday) until last day of current month
         # Calculate current week's Saturday
@@ -805,15 +858,13 @@ def get_manual_suggestions():
         month_end = datetime(year, month, last_day_of_month, 23, 59, 59, 999999)
         window_end = month_end
         
-        print(f"[WINDOW CALCULATION] ============================================")
-        print(f"[WINDOW CALCULATION] Strategy: This Month")
-        print(f"[MONTH STRATEGY] Conflict Date: {now.date()}")
-        print(f"[WINDOW CALCULATION] Current weekday: {['Mon','Tue','Wed','Thu','Fri','Sat','Sun'][current_weekday]}")
-        print(f"[WINDOW CALCULATION] Current week ends: Saturday {saturday}")
-        print(f"[WINDOW CALCULATION] ✅ window_start set to: {window_start} (Next Sunday)")
-        print(f"[MONTH STRATEGY] Window: {window_start} to {window_end}")
-        print(f"[WINDOW CALCULATION] ✅ window_end set to: {window_end} (Last day of month)")
-        print(f"[WINDOW CALCULATION] ============================================\n")
+        logger.debug("[WINDOW CALCULATION] Strategy: This Month")
+        logger.debug("[MONTH STRATEGY] Conflict Date: %s", now.date())
+        logger.debug("[WINDOW CALCULATION] Current weekday: %s", ['Mon','Tue','Wed','Thu','Fri','Sat','Sun'][current_weekday])
+        logger.debug("[WINDOW CALCULATION] Current week ends: Saturday %s", saturday)
+        logger.debug("[WINDOW CALCULATION] ✅ window_start set to: %s (Next Sunday)", window_start)
+        logger.debug("[MONTH STRATEGY] Window: %s to %s", window_start, window_end)
+        logger.debug("[WINDOW CALCULATION] ✅ window_end set to: %s (Last day of month)", window_end)
     elif strategy == "auto" and not (request_window_start and request_window_end):
         # Next Best Slot: Global quality search starting from CURRENT TIME
         # CRITICAL: Search starts from NOW (datetime.now()), not from conflict date
@@ -822,9 +873,10 @@ def get_manual_suggestions():
         # Get current system time
         current_time = datetime.now()
         
-        # Set search window: from now to 30 days ahead
+        # Set search window: from now, open-ended up to horizon_days ahead
+        # (the scan stops expanding once later days can't improve the page)
         window_start = current_time
-        window_end = current_time + timedelta(days=30)
+        window_end = None
         
         # Extract conflict info for logging (but don't use it for window)
         conflict_info = "Unknown"
@@ -833,86 +885,74 @@ def get_manual_suggestions():
                 target_task_date = target_task_date.astimezone(None).replace(tzinfo=None)
             conflict_info = str(target_task_date)
         
-        print(f"[WINDOW CALCULATION] ============================================")
-        print(f"[WINDOW CALCULATION] Strategy: Next Best Slot (Global Quality Search)")
-        print(f"[REAL-TIME SEARCH] Current time is {current_time}")
-        print(f"[REAL-TIME SEARCH] Conflicted task was at: {conflict_info}")
-        print(f"[REAL-TIME SEARCH] Scanning for best slots from TODAY onwards")
-        print(f"[WINDOW CALCULATION] ✅ window_start: {window_start} (NOW)")
-        print(f"[WINDOW CALCULATION] ✅ window_end: {window_end} (30 days from now)")
-        print(f"[WINDOW CALCULATION] Will rank all candidates by Bayesian score (quality-first)")
-        print(f"[WINDOW CALCULATION] ============================================\n")
+        logger.debug("[WINDOW CALCULATION] Strategy: Next Best Slot (Global Quality Search)")
+        logger.debug("[REAL-TIME SEARCH] Current time is %s", current_time)
+        logger.debug("[REAL-TIME SEARCH] Conflicted task was at: %s", conflict_info)
+        logger.debug("[REAL-TIME SEARCH] Scanning for best slots from TODAY onwards")
+        logger.debug("[WINDOW CALCULATION] ✅ window_start: %s (NOW)", window_start)
+        logger.debug("[WINDOW CALCULATION] ✅ horizon: %s days from now", horizon_days)
+        logger.debug("[WINDOW CALCULATION] Will rank all candidates by Bayesian score (quality-first)")
     # Any other strategy leaves window_end as None for default horizon
     
     # CRITICAL PAGINATION CHECK: Validate that date lock is maintained on page 2+
     # NOTE: page and page_size are already extracted at the beginning of the function
-    print(f"\n[PAGINATION CHECK] ============================================")
-    print(f"[PAGINATION CHECK] Page: {page}")
-    print(f"[PAGINATION CHECK] scheduledStart present: {data.get('scheduledStart') is not None}")
-    print(f"[PAGINATION CHECK] scheduledStart value: {data.get('scheduledStart')}")
-    print(f"[PAGINATION CHECK] Strategy: {strategy}")
+    logger.debug("[PAGINATION CHECK] Page: %s", page)
+    logger.debug("[PAGINATION CHECK] scheduledStart present: %s", data.get('scheduledStart') is not None)
+    logger.debug("[PAGINATION CHECK] scheduledStart value: %s", data.get('scheduledStart'))
+    logger.debug("[PAGINATION CHECK] Strategy: %s", strategy)
     
     # SURGICAL FIX: Only warn about missing scheduledStart, don't fail hard
     # This allows conflict resolution to work while still detecting issues
     if page > 1 and strategy == "day" and not data.get("scheduledStart"):
-        print(f"[PAGINATION CHECK] ⚠️  WARNING: Page {page} with 'day' strategy but NO scheduledStart!")
-        print(f"[PAGINATION CHECK] ⚠️  This may cause date lock to be lost.")
-        print(f"[PAGINATION CHECK] ⚠️  Allowing for now to prevent breaking conflict resolution flow.")
-        print(f"[PAGINATION CHECK] ⚠️  Frontend should include scheduledStart in pagination requests.")
+        logger.warning("[PAGINATION CHECK] ⚠️  WARNING: Page %s with 'day' strategy but NO scheduledStart!", page)
+        logger.warning("[PAGINATION CHECK] ⚠️  This may cause date lock to be lost.")
+        logger.warning("[PAGINATION CHECK] ⚠️  Allowing for now to prevent breaking conflict resolution flow.")
+        logger.warning("[PAGINATION CHECK] ⚠️  Frontend should include scheduledStart in pagination requests.")
         # DO NOT return 400 - allow the request to proceed
     
     if page > 1:
         if data.get("scheduledStart"):
-            print(f"[PAGINATION CHECK] ✅ Page {page} validation passed - Date lock maintained: {data.get('scheduledStart')}")
+            logger.debug("[PAGINATION CHECK] ✅ Page %s validation passed - Date lock maintained: %s", page, data.get('scheduledStart'))
         else:
-            print(f"[PAGINATION CHECK] ⚪ Page {page} proceeding without date lock (flexible date search)")
+            logger.debug("[PAGINATION CHECK] ⚪ Page %s proceeding without date lock (flexible date search)", page)
     
-    print(f"[PAGINATION CHECK] ============================================\n")
     
     # CONSTRAINT SUMMARY: Show all active constraints for this request
     # CRITICAL: This must come AFTER page and page_size are extracted
-    print(f"\n{'='*80}")
-    print(f"CONSTRAINT SUMMARY - What Must Stay Locked")
-    print(f"{'='*80}")
-    print(f"📋 Request Type: {'PAGINATION (page > 1)' if page > 1 else 'INITIAL REQUEST (page 1)'}")
-    print(f"📄 Page: {page} | Page Size: {page_size}")
-    print(f"🎯 Strategy: {strategy}")
-    print(f"")
-    print(f"🔒 LOCKED CONSTRAINTS:")
+    logger.debug("CONSTRAINT SUMMARY - What Must Stay Locked")
+    logger.debug("📋 Request Type: %s", 'PAGINATION (page > 1)' if page > 1 else 'INITIAL REQUEST (page 1)')
+    logger.debug("📄 Page: %s | Page Size: %s", page, page_size)
+    logger.debug("🎯 Strategy: %s", strategy)
+    logger.debug("🔒 LOCKED CONSTRAINTS:")
     if target_task_date:
         locked_date = target_task_date.date()
-        print(f"   ✅ LOCKED DATE: {locked_date}")
-        print(f"      Source: scheduledStart/dueDate")
-        print(f"      Impact: Window MUST stay within this specific date")
+        logger.debug("   ✅ LOCKED DATE: %s", locked_date)
+        logger.debug("      Source: scheduledStart/dueDate")
+        logger.debug("      Impact: Window MUST stay within this specific date")
     else:
-        print(f"   ⚪ No date locked (flexible date search)")
+        logger.debug("   ⚪ No date locked (flexible date search)")
     
     if data.get("preferredTimeOfDay"):
-        print(f"   ✅ LOCKED TIME: {data.get('preferredTimeOfDay')}")
-        print(f"      Impact: Only suggest slots at this exact time")
+        logger.debug("   ✅ LOCKED TIME: %s", data.get('preferredTimeOfDay'))
+        logger.debug("      Impact: Only suggest slots at this exact time")
     else:
-        print(f"   ⚪ No time locked (flexible time search)")
+        logger.debug("   ⚪ No time locked (flexible time search)")
     
-    print(f"")
-    print(f"📊 Task Details:")
-    print(f"   - Duration: {duration} minutes")
-    print(f"   - Task Type: {task_type}")
-    print(f"")
+    logger.debug("📊 Task Details:")
+    logger.debug("   - Duration: %s minutes", duration)
+    logger.debug("   - Task Type: %s", task_type)
     if page > 1 and target_task_date:
-        print(f"⚠️  CRITICAL: This is page {page} with a locked date!")
-        print(f"   The window MUST NOT cross into another day.")
-        print(f"   If no more slots exist on {target_task_date.date()}, return empty list.")
-    print(f"{'='*80}\n")
+        logger.debug("⚠️  CRITICAL: This is page %s with a locked date!", page)
+        logger.debug("   The window MUST NOT cross into another day.")
+        logger.debug("   If no more slots exist on %s, return empty list.", target_task_date.date())
     
     # PAGINATION DEBUG: Show if date is locked
     if target_task_date and strategy == "day":
         locked_date = target_task_date.date()
-        print(f"\n[PAGINATION DEBUG] ============================================")
-        print(f"[PAGINATION DEBUG] Requesting Page {page} for Locked Date: {locked_date}")
-        print(f"[PAGINATION DEBUG] Page Size: {page_size}")
-        print(f"[PAGINATION DEBUG] Window: {window_start.date()} to {window_end.date()}")
-        print(f"[PAGINATION DEBUG] Strategy: {strategy} (date-locked)")
-        print(f"[PAGINATION DEBUG] ============================================\n")
+        logger.debug("[PAGINATION DEBUG] Requesting Page %s for Locked Date: %s", page, locked_date)
+        logger.debug("[PAGINATION DEBUG] Page Size: %s", page_size)
+        logger.debug("[PAGINATION DEBUG] Window: %s to %s", window_start.date(), window_end.date())
+        logger.debug("[PAGINATION DEBUG] Strategy: %s (date-locked)", strategy)
     
     # Call suggestion service
     try:
@@ -920,97 +960,392 @@ def get_manual_suggestions():
         # This allows suggestions even outside work hours or on days off
         explicit_date_requested = (strategy == "day")
         
-        print(f"[DEBUG] Calling suggest_slots_for_user with:")
-        print(f"  - user_id={g.user.id}")
-        print(f"  - duration={duration}")
-        print(f"  - task_type={task_type}")
-        print(f"  - strategy={strategy}")
-        print(f"  - page={page}")  # CRITICAL: Verify page parameter
-        print(f"  - page_size={page_size}")
-        print(f"  - window_start={window_start}")
-        print(f"  - window_end={window_end}")
-        print(f"  - explicit_date_requested={explicit_date_requested}")
+        logger.debug("[DEBUG] Calling suggest_slots_for_user with:")
+        logger.debug("  - user_id=%s", user_id)
+        logger.debug("  - duration=%s", duration)
+        logger.debug("  - task_type=%s", task_type)
+        logger.debug("  - strategy=%s", strategy)
+        logger.debug("  - page=%s", page)  # CRITICAL: Verify page parameter
+        logger.debug("  - page_size=%s", page_size)
+        logger.debug("  - window_start=%s", window_start)
+        logger.debug("  - window_end=%s", window_end)
+        logger.debug("  - explicit_date_requested=%s", explicit_date_requested)
+        
+        # Continuation token from the previous page: resume after its last
+        # slot instead of recomputing every earlier page
+        busy = BusyIndex.for_user(user_id, *busy_range(
+            duration_minutes=duration,
+            horizon_days=horizon_days,
+            window_start=window_start,
+            window_end=window_end,
+        ))
+        query_fp = query_fingerprint(
+            duration=duration,
+            task_type=task_type,
+            strategy=strategy,
+            page_size=page_size,
+            horizon_days=horizon_days,
+            window_start=window_start.date() if window_start else None,
+            window_end=window_end.date() if window_end else None,
+            explicit_date_requested=explicit_date_requested,
+        )
+        after = None
+        stats = {}
+        resumed = read_token(data.get("continuationToken"), user_id, query_fp, busy.fingerprint())
+        if resumed:
+            after, page = resumed
+            logger.debug("[PAGINATION] Resuming from continuation token at page %s", page)
         
         suggestions = suggest_slots_for_user(
-            user_id=g.user.id,
+            user_id=user_id,
             duration_minutes=duration,
             task_type=task_type,
             page=page,
             page_size=page_size,
-            horizon_days=21,  # Default horizon for 'auto'
+            horizon_days=horizon_days,  # Only bounds the 'auto' search
             step_minutes=15,  # FIX: Changed from 30 to 15 for finer granularity
             window_start=window_start,
             window_end=window_end,
             explicit_date_requested=explicit_date_requested,
+            busy=busy,
+            after=after,
+            stats=stats,
+            on_candidate=on_candidate,
         )
         
-        print(f"[DEBUG] Suggestions found: {len(suggestions)}")
+        logger.debug("[DEBUG] Suggestions found: %s", len(suggestions))
         
         # VALIDATION: If date-locked, verify all suggestions are on the locked date
-        if target_task_date and strategy == "day" and len(suggestions) > 0:
+        if target_task_date and strategy == "day" and len(suggestions) > 0 and logger.isEnabledFor(logging.DEBUG):
             locked_date = target_task_date.date()
-            print(f"\n[DATE LOCK VALIDATION] ============================================")
-            print(f"[DATE LOCK VALIDATION] Verifying suggestions for locked date: {locked_date}")
+            logger.debug("[DATE LOCK VALIDATION] Verifying suggestions for locked date: %s", locked_date)
             for i, sugg in enumerate(suggestions, 1):
                 try:
                     sugg_start = datetime.fromisoformat(sugg["scheduledStart"])
                     sugg_date = sugg_start.date()
                     if sugg_date == locked_date:
-                        print(f"[DATE LOCK VALIDATION]   ✅ Suggestion {i}: {sugg_start} (correct date)")
+                        logger.debug("[DATE LOCK VALIDATION]   ✅ Suggestion %s: %s (correct date)", i, sugg_start)
                     else:
-                        print(f"[DATE LOCK VALIDATION]   ❌ Suggestion {i}: {sugg_start} (WRONG DATE! Expected {locked_date})")
+                        logger.warning("[DATE LOCK VALIDATION]   ❌ Suggestion %s: %s (WRONG DATE! Expected %s)", i, sugg_start, locked_date)
                 except:
-                    print(f"[DATE LOCK VALIDATION]   ⚠️ Suggestion {i}: Failed to parse")
-            print(f"[DATE LOCK VALIDATION] ============================================\n")
+                    logger.warning("[DATE LOCK VALIDATION]   ⚠️ Suggestion %s: Failed to parse", i)
         
-        print(f"[DEBUG] Suggestions: {suggestions}")
+        logger.debug("[DEBUG] Suggestions: %s", suggestions)
         
-        # FINAL CONSTRAINT VERIFICATION SUMMARY
-        print(f"\n{'='*80}")
-        print(f"FINAL VERIFICATION - Constraints Maintained?")
-        print(f"{'='*80}")
-        print(f"📋 Returning {len(suggestions)} suggestions for page {page}")
-        
-        if len(suggestions) == 0:
-            print(f"⚠️  EMPTY RESULT")
-            if target_task_date:
-                print(f"   Reason: No more slots available on locked date {target_task_date.date()}")
-            else:
-                print(f"   Reason: No slots found in search window")
-        else:
-            print(f"✅ Found {len(suggestions)} suggestions")
-            
-            if target_task_date:
-                all_correct = all(
-                    datetime.fromisoformat(s["scheduledStart"]).date() == target_task_date.date()
-                    for s in suggestions
-                )
-                if all_correct:
-                    print(f"   ✅ All suggestions on locked date: {target_task_date.date()}")
+        # FINAL CONSTRAINT VERIFICATION SUMMARY (diagnostics only)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("FINAL VERIFICATION - Constraints Maintained?")
+            logger.debug("📋 Returning %s suggestions for page %s", len(suggestions), page)
+
+            if len(suggestions) == 0:
+                logger.debug("⚠️  EMPTY RESULT")
+                if target_task_date:
+                    logger.debug("   Reason: No more slots available on locked date %s", target_task_date.date())
                 else:
-                    print(f"   ❌ CONSTRAINT VIOLATION: Some suggestions on wrong date!")
-            
-            print(f"")
-            print(f"📅 Date Range:")
-            if len(suggestions) > 0:
-                dates = [datetime.fromisoformat(s["scheduledStart"]).date() for s in suggestions]
-                unique_dates = sorted(set(dates))
-                print(f"   {', '.join(str(d) for d in unique_dates)}")
-                if len(unique_dates) > 1 and target_task_date:
-                    print(f"   ⚠️  WARNING: Multiple dates found but date is locked to {target_task_date.date()}!")
-        
-        print(f"{'='*80}\n")
+                    logger.debug("   Reason: No slots found in search window")
+            else:
+                logger.debug("✅ Found %s suggestions", len(suggestions))
+
+                if target_task_date:
+                    all_correct = all(
+                        datetime.fromisoformat(s["scheduledStart"]).date() == target_task_date.date()
+                        for s in suggestions
+                    )
+                    if all_correct:
+                        logger.debug("   ✅ All suggestions on locked date: %s", target_task_date.date())
+                    else:
+                        logger.warning("   ❌ CONSTRAINT VIOLATION: Some suggestions on wrong date!")
+
+                logger.debug("📅 Date Range:")
+                if len(suggestions) > 0:
+                    dates = [datetime.fromisoformat(s["scheduledStart"]).date() for s in suggestions]
+                    unique_dates = sorted(set(dates))
+                    logger.debug("   %s", ', '.join(str(d) for d in unique_dates))
+                    if len(unique_dates) > 1 and target_task_date:
+                        logger.warning("   ⚠️  WARNING: Multiple dates found but date is locked to %s!", target_task_date.date())
+
+
+
+        next_token = None
+        if len(suggestions) == page_size:
+            next_token = issue_token(user_id, query_fp, busy.fingerprint(), suggestions[-1], page + 1)
         
-        return jsonify({
+        return {
             "suggestions": suggestions,
             "strategy": strategy,
             "duration": duration,
-            "task_type": task_type
-        }), 200
+            "task_type": task_type,
+            "page": page,
+            "nextToken": next_token,
+            "daysExamined": stats.get("days_examined"),
+        }, 200
     
     except Exception as e:
-        print(f"[ERROR] Suggestion failed: {e}")
-        print(traceback.format_exc())
+        logger.exception("[ERROR] Suggestion failed: %s", e)
+        return {
+            "message": f"Failed to generate suggestions: {str(e)}"
+        }, 500
+
+
+# ------------ /api/ai/suggest/stream ------------
+
+def _sse(event: str, payload: dict) -> str:
+    """Format one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+@ai_bp.route("/suggest/stream", methods=["POST", "OPTIONS"])
+@cross_origin(
+    origins=CORS_ORIGINS,
+    supports_credentials=True,
+    allow_headers=["Content-Type", "Authorization", "Accept", "Origin"],
+)
+@auth_required
+def stream_manual_suggestions():
+    """
+    Stream /api/ai/suggest results as Server-Sent Events.
+
+    Takes the same body and runs the same search as /api/ai/suggest. While
+    the scan runs, each candidate it finds is sent as a "candidate" event
+    (provisional: later ones may outrank it); the final ranked page follows
+    as a "page" event carrying the /api/ai/suggest response body, or as an
+    "error" event with the error body and its "status".
+
+    The search runs on a worker thread so events can be sent while it scans.
+    """
+    data = request.get_json(silent=True) or {}
+    user_id = g.user.id
+    app = current_app._get_current_object()
+    events = queue.Queue()
+
+    def search():
+        try:
+            with app.app_context():
+                body, status = _manual_suggestions(
+                    user_id, data, on_candidate=lambda c: events.put(_sse("candidate", c)),
+                )
+        except Exception as e:
+            logger.exception("[ERROR] Streaming suggestion failed: %s", e)
+            body, status = {"message": f"Failed to generate suggestions: {str(e)}"}, 500
+        try:
+            if status == 200:
+                events.put(_sse("page", body))
+            else:
+                events.put(_sse("error", dict(body, status=status)))
+        finally:
+            events.put(None)
+
+    # Copy the context so per-request log tracing follows the search
+    threading.Thread(target=contextvars.copy_context().run, args=(search,), daemon=True).start()
+
+    def stream():
+        while True:
+            event = events.get()
+            if event is None:
+                return
+            yield event
+
+    return Response(stream(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+
+
+# ------------ /api/ai/suggestBatch ------------
+
+# Upper bound on tasks per batch request
+MAX_BATCH_TASKS = 50
+
+
+def _parse_local_datetime(value):
+    """Parse an ISO datetime from the client into a naive local datetime (None if invalid)."""
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(None).replace(tzinfo=None)
+    return dt
+
+
+@ai_bp.route("/suggestBatch", methods=["POST", "OPTIONS"])
+@cross_origin(
+    origins=CORS_ORIGINS,
+    supports_credentials=True,
+    allow_headers=["Content-Type", "Authorization", "Accept", "Origin"],
+)
+@auth_required
+def suggest_batch():
+    """
+    Suggest non-overlapping time slots for several unscheduled tasks at once
+    (e.g. subtasks from a breakdown or a pasted to-do list).
+    
+    Request Body:
+        - tasks (list): Up to MAX_BATCH_TASKS items, each with
+            - title (str, optional): Echoed back in the result
+            - durationMinutes (int, optional): Uses user preference if not provided
+            - task_type (str): Meeting/Training/Studies (default: "Meeting")
+            - priority (str): LOW/MEDIUM/HIGH (default: "MEDIUM")
+            - windowStart / windowEnd (str, optional): ISO datetimes bounding the slot
+        - timeBudgetMs (int, optional): Time budget for the batch (default: 2000, max: 10000)
+    
+    Returns:
+        JSON with one assignment per task in request order. Scheduled tasks
+        carry scheduledStart/scheduledEnd/score; the others a status of
+        "no_slot" or "time_budget". No tasks are created.
+    """
+    from Ai.network.inference import ensure_bn_initialized
+    if not ensure_bn_initialized(g.user.id):
+        return jsonify({
+            "message": "Please complete your preferences setup first",
+            "action_required": "set_preferences"
+        }), 403
+    
+    data = request.get_json(silent=True) or {}
+    items = data.get("tasks")
+    if not isinstance(items, list) or not items:
+        return jsonify({"message": "tasks must be a non-empty list"}), 400
+    if len(items) > MAX_BATCH_TASKS:
+        return jsonify({"message": f"At most {MAX_BATCH_TASKS} tasks per batch"}), 400
+    
+    try:
+        time_budget_ms = min(max(int(data.get("timeBudgetMs", 2000)), 100), 10000)
+    except (ValueError, TypeError):
+        time_budget_ms = 2000
+    
+    default_duration = None
+    tasks = []
+    for idx, item in enumerate(items):
+        if not isinstance(item, dict):
+            return jsonify({"message": f"tasks[{idx}] must be an object"}), 400
+        
+        duration = item.get("durationMinutes")
+        if duration is None:
+            if default_duration is None:
+                default_duration = _get_user_default_duration(g.user.id)
+            duration = default_duration
+        try:
+            duration = int(duration)
+        except (ValueError, TypeError):
+            return jsonify({"message": f"tasks[{idx}].durationMinutes must be an integer"}), 400
+        if duration <= 0:
+            return jsonify({"message": f"tasks[{idx}].durationMinutes must be positive"}), 400
+        
+        window_start = _parse_local_datetime(item.get("windowStart"))
+        window_end = _parse_local_datetime(item.get("windowEnd"))
+        if not (window_start and window_end):
+            window_start = window_end = None
+        
+        tasks.append({
+            "duration_minutes": duration,
+            "task_type": item.get("task_type") or "Meeting",
+            "priority": (item.get("priority") or "MEDIUM").upper(),
+            "window_start": window_start,
+            "window_end": window_end,
+        })
+    
+    logger.debug("[BATCH] Scheduling %s tasks for user %s (budget: %s ms)", len(tasks), g.user.id, time_budget_ms)
+    
+    try:
+        assignments = suggest_batch_for_user(
+            user_id=g.user.id,
+            tasks=tasks,
+            time_budget_ms=time_budget_ms,
+        )
+    except Exception as e:
+        logger.exception("[ERROR] Batch suggestion failed: %s", e)
         return jsonify({
             "message": f"Failed to generate suggestions: {str(e)}"
         }), 500
+    
+    for assignment, item, task in zip(assignments, items, tasks):
+        assignment["title"] = item.get("title")
+        assignment["durationMinutes"] = task["duration_minutes"]
+        assignment["task_type"] = task["task_type"]
+        assignment["priority"] = task["priority"]
+    
+    return jsonify({
+        "assignments": assignments,
+        "scheduled": sum(1 for a in assignments if a["status"] == "scheduled"),
+    }), 200
+
+
+@ai_bp.route("/nextFree", methods=["GET", "OPTIONS"])
+@cross_origin(
+    origins=CORS_ORIGINS,
+    supports_credentials=True,
+    allow_headers=["Content-Type", "Authorization", "Accept", "Origin"],
+)
+@auth_required
+def get_next_free_slot():
+    """
+    Earliest free slot for a task ("put it at the next free time"),
+    without ranking a page of suggestions.
+    
+    Query Parameters:
+        - duration (int, optional): Task duration in minutes (uses user preference if not provided)
+        - after (str, optional): ISO datetime the slot may not start before (default: now)
+        - minScore (float, optional): Return the earliest slot scoring at least this (0-10)
+        - task_type (str, optional): Meeting/Training/Studies, for scoring (default: "Meeting")
+        - horizonDays (int, optional): Days ahead to search
+          (default: DEFAULT_HORIZON_DAYS, at most MAX_HORIZON_DAYS)
+    
+    Returns:
+        JSON with "slot" (scheduledStart, scheduledEnd, score,
+        exceedsWorkHours), or null with a message if nothing fits
+    """
+    from Ai.network.inference import ensure_bn_initialized
+    if not ensure_bn_initialized(g.user.id):
+        return jsonify({
+            "message": "Please complete your preferences setup first",
+            "action_required": "set_preferences"
+        }), 403
+    
+    duration = request.args.get("duration")
+    try:
+        duration = int(duration) if duration else _get_user_default_duration(g.user.id)
+    except ValueError:
+        return jsonify({"message": "duration must be an integer"}), 400
+    if duration <= 0:
+        return jsonify({"message": "duration must be positive"}), 400
+    
+    after = request.args.get("after")
+    after_dt = _parse_local_datetime(after)
+    if after and after_dt is None:
+        return jsonify({"message": "after must be an ISO datetime"}), 400
+    
+    min_score = request.args.get("minScore")
+    try:
+        min_score = float(min_score) if min_score else None
+    except ValueError:
+        return jsonify({"message": "minScore must be a number"}), 400
+    
+    try:
+        horizon_days = int(request.args.get("horizonDays", DEFAULT_HORIZON_DAYS))
+    except ValueError:
+        horizon_days = DEFAULT_HORIZON_DAYS
+    horizon_days = max(1, min(horizon_days, MAX_HORIZON_DAYS))
+    
+    try:
+        slot = next_free_slot(
+            user_id=g.user.id,
+            duration_minutes=duration,
+            after=after_dt,
+            min_score=min_score,
+            task_type=request.args.get("task_type") or "Meeting",
+            horizon_days=horizon_days,
+        )
+    except Exception as e:
+        logger.exception("[ERROR] Next free slot search failed: %s", e)
+        return jsonify({
+            "message": f"Failed to find a free slot: {str(e)}"
+        }), 500
+    
+    if slot is None:
+        return jsonify({
+            "slot": None,
+            "message": f"No free slot within {horizon_days} days",
+        }), 200
+    return jsonify({"slot": slot}), 200
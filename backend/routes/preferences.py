@@ -3,6 +3,10 @@ from datetime import time
 from config import db
 from models import UserPreferences
 from services.auth_middleware import auth_required
+from services.suggestion_cache import bump_schedule_version
+from services.logging_setup import get_logger
+
+logger = get_logger(__name__)
 
 preferences_bp = Blueprint("preferences", __name__)
 
@@ -101,6 +105,7 @@ def upsert_preferences():
     )
     db.session.add(pref)
     db.session.commit()
+    bump_schedule_version(g.user.id)
 
     # NEW: Initialize Bayesian Network from preferences
     # This trains the BN immediately so user can start creating tasks
@@ -108,9 +113,9 @@ def upsert_preferences():
     try:
         bn_success = initialize_bn_for_user(g.user.id)
         if not bn_success:
-            print(f"[Preferences] Warning: BN initialization failed for user {g.user.id}")
+            logger.warning("[Preferences] BN initialization failed for user %s", g.user.id)
     except Exception as e:
-        print(f"[Preferences] Error initializing BN: {e}")
+        logger.exception("[Preferences] Error initializing BN: %s", e)
         # Don't fail the request if BN init fails - preferences are still saved
 
     out = pref.to_json()
@@ -130,10 +135,9 @@ def update_preferences():
 
     data = request.get_json() or {}
     
-    print(f"\n[PREFERENCES UPDATE] ============================================")
-    print(f"[PREFERENCES UPDATE] Updating preferences for user {g.user.id}")
-    print(f"[PREFERENCES UPDATE] Current workday_pref_start: {existing.workday_pref_start}")
-    print(f"[PREFERENCES UPDATE] Request data: {data}")
+    logger.debug("[PREFERENCES UPDATE] Updating preferences for user %s", g.user.id)
+    logger.debug("[PREFERENCES UPDATE] Current workday_pref_start: %s", existing.workday_pref_start)
+    logger.debug("[PREFERENCES UPDATE] Request data: %s", data)
     
     # Update only the fields that are present in the request
     
@@ -145,18 +149,18 @@ def update_preferences():
         ):
             return jsonify({"message": "daysOff must be a list of integers in range 0..6"}), 400
         existing.days_off = sorted(set(days_off))
-        print(f"[PREFERENCES UPDATE] Updated days_off to: {existing.days_off}")
+        logger.debug("[PREFERENCES UPDATE] Updated days_off to: %s", existing.days_off)
 
     # Parse and update times
     try:
         if "workdayPrefStart" in data:
             workday_pref_start = parse_time(data.get("workdayPrefStart"))
-            print(f"[PREFERENCES UPDATE] Parsed workday_pref_start: {workday_pref_start}")
+            logger.debug("[PREFERENCES UPDATE] Parsed workday_pref_start: %s", workday_pref_start)
             existing.workday_pref_start = workday_pref_start
             
         if "workdayPrefEnd" in data:
             workday_pref_end = parse_time(data.get("workdayPrefEnd"))
-            print(f"[PREFERENCES UPDATE] Parsed workday_pref_end: {workday_pref_end}")
+            logger.debug("[PREFERENCES UPDATE] Parsed workday_pref_end: %s", workday_pref_end)
             existing.workday_pref_end = workday_pref_end
             
         if "focusPeakStart" in data:
@@ -196,10 +200,10 @@ def update_preferences():
             return jsonify({"message": "defaultDurationMinutes must be an integer"}), 400
 
     db.session.commit()
+    bump_schedule_version(g.user.id)
     
-    print(f"[PREFERENCES UPDATE] Successfully updated preferences")
-    print(f"[PREFERENCES UPDATE] New workday_pref_start: {existing.workday_pref_start}")
-    print(f"[PREFERENCES UPDATE] ============================================\n")
+    logger.debug("[PREFERENCES UPDATE] Successfully updated preferences")
+    logger.debug("[PREFERENCES UPDATE] New workday_pref_start: %s", existing.workday_pref_start)
 
     out = existing.to_json()
     out["exists"] = True
@@ -13,7 +13,15 @@ from Ai.network.inference import (
 )
 
 # Conflict detection
-from Ai.suggest_slots import _slot_is_free, _load_busy_intervals
+from Ai.suggest_slots import BusyIndex
+
+# Cached suggestions are keyed by the schedule version
+from services.suggestion_cache import bump_schedule_version
+# Materialized free/busy bitmap
+from services.free_busy import busy_interval, note_task_change
+from services.logging_setup import get_logger
+
+logger = get_logger(__name__)
 
 tasks_bp = Blueprint("tasks", __name__)
 
@@ -53,6 +61,7 @@ def _task_to_obs(t: Task) -> dict:
         dur = int((end - start).total_seconds() // 60)
 
     return {
+        "task_id": t.id,
         "user_id": t.user_id,
         "task_type": t.task_type or "Meeting",
         "priority": t.priority or "MEDIUM",
@@ -106,26 +115,24 @@ def create_task_with_bn_update(
         Exception: If DB commit fails
     """
     # Conflict detection guard: Check for time slot conflicts BEFORE creating task
-    print(f"\n[CONFLICT DEBUG] ============================================")
-    print(f"[CONFLICT DEBUG] Checking slot: {scheduled_start} to {scheduled_end}")
+    logger.debug("[CONFLICT DEBUG] Checking slot: %s to %s", scheduled_start, scheduled_end)
+    # Always against the task table: the free/busy bitmap can lose a
+    # concurrent update where row locks aren't supported (SQLite), so a
+    # clear bitmap doesn't prove the slot free here
     if scheduled_start and scheduled_end:
-        busy_intervals = _load_busy_intervals(user_id)
-        print(f"[CONFLICT DEBUG] Loaded {len(busy_intervals)} busy intervals:")
-        for i, (b_start, b_end) in enumerate(busy_intervals):
-            print(f"[CONFLICT DEBUG]   Interval {i+1}: {b_start} to {b_end}")
+        busy = BusyIndex.for_user(user_id, scheduled_start, scheduled_end)
+        logger.debug("[CONFLICT DEBUG] Loaded %s merged busy intervals", len(busy))
         
-        is_free = _slot_is_free(scheduled_start, scheduled_end, busy_intervals)
-        print(f"[CONFLICT DEBUG] Slot is FREE? {is_free}")
+        conflict = busy.conflict(scheduled_start, scheduled_end)
+        logger.debug("[CONFLICT DEBUG] Slot is FREE? %s", conflict is None)
         
-        if not is_free:
-            print(f"[CONFLICT DEBUG] ❌ CONFLICT DETECTED! Raising TimeConflictError")
-            print(f"[CONFLICT DEBUG] ============================================\n")
+        if conflict:
+            logger.info("[CONFLICT DEBUG] ❌ CONFLICT DETECTED with %s to %s! Raising TimeConflictError", conflict[0], conflict[1])
             raise TimeConflictError("TimeConflict: Proposed time slot is already busy.")
         else:
-            print(f"[CONFLICT DEBUG] ✅ No conflicts, proceeding with task creation")
+            logger.debug("[CONFLICT DEBUG] ✅ No conflicts, proceeding with task creation")
     else:
-        print(f"[CONFLICT DEBUG] No scheduled times, skipping conflict check")
-    print(f"[CONFLICT DEBUG] ============================================\n")
+        logger.debug("[CONFLICT DEBUG] No scheduled times, skipping conflict check")
     
     # Create Task object
     new_task = Task(
@@ -152,13 +159,15 @@ def create_task_with_bn_update(
     
     # Commit to database
     db.session.add(new_task)
+    note_task_change(user_id, None, busy_interval(new_task))
     db.session.commit()
+    bump_schedule_version(user_id)
     
     # Update BN with this observation
     try:
         record_observation(_task_to_obs(new_task))
     except Exception as e:
-        print(f"[BN] record_observation failed: {e}")
+        logger.warning("[BN] record_observation failed: %s", e)
     
     return new_task
 
@@ -236,7 +245,7 @@ def create_task():
             if scheduled_start:
                 # Calculate scheduled_end based on duration
                 scheduled_end = scheduled_start + timedelta(minutes=duration_minutes)
-                print(f"[DEBUG] Derived schedule from dueDate/dueTime: {scheduled_start} to {scheduled_end}")
+                logger.debug("[DEBUG] Derived schedule from dueDate/dueTime: %s to %s", scheduled_start, scheduled_end)
 
     # subtasks
     sub_tasks = data.get("subTasks") or []
@@ -285,6 +294,7 @@ def update_task(task_id):
         return jsonify({"message": "Task Not Found"}), 404
 
     before = _task_to_obs(task)  
+    busy_before = busy_interval(task)
 
     data = request.get_json(silent=True) or {}
 
@@ -325,17 +335,19 @@ def update_task(task_id):
         task.scheduled_end = datetime.fromisoformat(e) if e else None
 
     try:
+        note_task_change(g.user.id, busy_before, busy_interval(task))
         db.session.commit()
     except Exception as e:
         db.session.rollback()
         return jsonify({"message": str(e)}), 401
+    bump_schedule_version(g.user.id)
 
     # ---- BN hook: update ----
     try:
         after = _task_to_obs(task)
         update_observation(before, after)
     except Exception as e:
-        print(f"[BN] update_observation failed: {e}")
+        logger.warning("[BN] update_observation failed: %s", e)
 
     return jsonify({"message": "Task updated"}), 200
 
@@ -348,19 +360,22 @@ def delete_task(task_id):
         return jsonify({"message": "Task not found"}), 404
 
     obs = _task_to_obs(task)  
+    busy_before = busy_interval(task)
 
     try:
         db.session.delete(task)
+        note_task_change(g.user.id, busy_before, None)
         db.session.commit()
     except Exception as e:
         db.session.rollback()
         return jsonify({"message": str(e)}), 401
+    bump_schedule_version(g.user.id)
 
     # ---- BN hook: remove ----
     try:
         remove_observation(obs)
     except Exception as e:
-        print(f"[BN] remove_observation failed: {e}")
+        logger.warning("[BN] remove_observation failed: %s", e)
 
     return jsonify({"message": "Task deleted"}), 200
 
@@ -390,18 +405,20 @@ def toggle_task(task_id):
 
     before = _task_to_obs(task) 
 
+    # Busy time doesn't depend on status, so the free/busy bitmap is unchanged
     try:
         task.status = new_status
         db.session.commit()
     except Exception as e:
         db.session.rollback()
         return jsonify({"message": str(e)}), 401
+    bump_schedule_version(g.user.id)
 
   
     try:
         after = _task_to_obs(task)
         update_observation(before, after)
     except Exception as e:
-        print(f"[BN] update_observation (status) failed: {e}")
+        logger.warning("[BN] update_observation (status) failed: %s", e)
 
     return jsonify({"message": "Task status changed"}), 200
@@ -0,0 +1,290 @@
+"""
+Materialized per-user free/busy bitmap.
+
+A conflict check used to rebuild the user's busy picture from the task
+table every time. The bitmap keeps it precomputed: one bit per
+RESOLUTION cell over a rolling window of WINDOW_DAYS starting at a
+midnight, set when any busy interval (as _load_busy_intervals() defines
+them) touches the cell. Each user's bitmap is one row of the
+free_busy_bitmap table (about 3 KB).
+
+Cells are coarser than task times, so the bitmap is conservative: clear
+cells prove a range free, while a set cell only means "maybe busy" and
+the caller falls back to BusyIndex for the exact answer. Ranges outside
+the window are never proven free.
+
+Readers:
+    - is_slot_free(), the conflict pre-checks of /api/ai/parseTask: the
+      bitmap answers when it proves the range free, BusyIndex otherwise
+
+Writers:
+    - note_task_change(), called by the task create/update/delete hooks
+      inside the transaction of the task change: sets the cells of the new
+      interval and recomputes the cells of the old one from the DB
+    - reconcile_user(), run nightly by reconcile_free_busy.py: rolls the
+      window forward to today and rebuilds it from the DB
+
+Task writes that bypass the hooks leave the bitmap stale until the next
+reconcile, so bulk imports should call reconcile_user() afterwards.
+
+The row lock of note_task_change() is ignored by SQLite, where two
+concurrent task writes can lose one bitmap update until the next
+reconcile. The bitmap is therefore a read-side shortcut only: write
+paths (the create conflict guard) always check the task table.
+"""
+
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional
+
+from models import FreeBusyBitmap, Task, db
+from Ai.suggest_slots import BusyIndex, _load_busy_intervals
+from services.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+RESOLUTION = timedelta(minutes=5)
+WINDOW_DAYS = 90
+CELLS_PER_DAY = timedelta(days=1) // RESOLUTION
+
+Interval = tuple[datetime, datetime]
+
+
+class FreeBusyWindow:
+    """
+    Bitset of busy cells over [window_start, window_start + days).
+
+    Bit k covers [window_start + k * RESOLUTION, window_start + (k + 1) * RESOLUTION).
+
+    Attributes:
+        window_start: Start of the first cell (a midnight)
+        cells: Number of cells in the window
+        bits: The bitset, as an int (bit k = cell k)
+    """
+
+    def __init__(self, window_start: datetime, bits: int = 0, days: int = WINDOW_DAYS):
+        self.window_start = window_start
+        self.cells = days * CELLS_PER_DAY
+        self.bits = bits
+
+    @classmethod
+    def from_row(cls, row: FreeBusyBitmap) -> "FreeBusyWindow":
+        return cls(row.window_start, int.from_bytes(row.bits, "little"))
+
+    def to_bytes(self) -> bytes:
+        return self.bits.to_bytes((self.cells + 7) // 8, "little")
+
+    def cell_range(self, start: datetime, end: datetime) -> tuple[int, int]:
+        """
+        Cells [lo, hi) touched by [start, end), unclipped. A zero-length
+        interval touches the cell it lies in.
+        """
+        lo = (start - self.window_start) // RESOLUTION
+        hi = -((self.window_start - end) // RESOLUTION)
+        return lo, max(hi, lo + 1)
+
+    def cell_start(self, k: int) -> datetime:
+        return self.window_start + k * RESOLUTION
+
+    def _clipped_mask(self, start: datetime, end: datetime) -> int:
+        lo, hi = self.cell_range(start, end)
+        lo, hi = max(lo, 0), min(hi, self.cells)
+        return ((1 << (hi - lo)) - 1) << lo if lo < hi else 0
+
+    def mark(self, start: datetime, end: datetime) -> None:
+        """Set the cells touched by [start, end) (the part inside the window)."""
+        self.bits |= self._clipped_mask(start, end)
+
+    def clear(self, start: datetime, end: datetime) -> None:
+        """Clear the cells touched by [start, end) (the part inside the window)."""
+        self.bits &= ~self._clipped_mask(start, end)
+
+    def is_clear(self, start: datetime, end: datetime) -> bool:
+        """
+        Check that [start, end) lies in the window and touches no busy cell.
+
+        True proves the range free; False means "maybe busy".
+        """
+        lo, hi = self.cell_range(start, end)
+        if lo < 0 or hi > self.cells:
+            return False
+        return not (self.bits >> lo) & ((1 << (hi - lo)) - 1)
+
+
+def busy_interval(task: Task) -> Optional[Interval]:
+    """
+    Busy interval of a task, by the rules of _load_busy_intervals().
+
+    Returns:
+        (start, end) for a scheduled task or a legacy due_date-only task
+        (due_date + duration_minutes, 60 if unset); None if the task
+        doesn't block time
+    """
+    if task.scheduled_start is not None:
+        if task.scheduled_end is None:
+            return None
+        return task.scheduled_start, task.scheduled_end
+    if task.due_date is not None:
+        return task.due_date, task.due_date + timedelta(minutes=int(task.duration_minutes or 60))
+    return None
+
+
+def _window_start(today: date) -> datetime:
+    return datetime.combine(today, time(0, 0))
+
+
+def build_window(user_id: int, today: Optional[date] = None) -> FreeBusyWindow:
+    """
+    Compute a user's bitmap from the task table.
+
+    Args:
+        user_id: User ID
+        today: First day of the window (default: today)
+
+    Returns:
+        FreeBusyWindow of WINDOW_DAYS starting at midnight of `today`
+    """
+    window = FreeBusyWindow(_window_start(today or date.today()))
+    window_end = window.cell_start(window.cells)
+    for start, end in _load_busy_intervals(user_id, window.window_start, window_end):
+        window.mark(start, end)
+    return window
+
+
+def load_window(user_id: int) -> Optional[FreeBusyWindow]:
+    """Stored bitmap of a user, or None if none has been built yet."""
+    row = db.session.get(FreeBusyBitmap, user_id)
+    return FreeBusyWindow.from_row(row) if row else None
+
+
+def is_range_free(user_id: int, start: datetime, end: datetime) -> bool:
+    """
+    Check [start, end) against the stored bitmap only.
+
+    Args:
+        user_id: User ID
+        start: Range start
+        end: Range end
+
+    Returns:
+        True if the bitmap shows the range free; False if it may be busy,
+        lies outside the window or the user has no bitmap yet (check it
+        with BusyIndex then). Don't rely on True to accept a write (see
+        the module docstring)
+    """
+    window = load_window(user_id)
+    return window is not None and window.is_clear(start, end)
+
+
+def is_slot_free(user_id: int, start: datetime, end: datetime) -> bool:
+    """
+    Check [start, end) against the user's tasks, bitmap first.
+
+    A clear bitmap answers without touching the task table; "maybe busy"
+    falls back to BusyIndex for the exact answer. For read-side checks
+    only (see the module docstring): writes go through the create guard.
+
+    Args:
+        user_id: User ID
+        start: Range start
+        end: Range end
+
+    Returns:
+        True if no task overlaps the range
+    """
+    if is_range_free(user_id, start, end):
+        return True
+    return BusyIndex.for_user(user_id, start, end).is_free(start, end)
+
+
+def note_task_change(user_id: int, before: Optional[Interval], after: Optional[Interval]) -> None:
+    """
+    Apply a task's change of busy interval to the user's bitmap.
+
+    Call it in the transaction of the task change, after the change is
+    added to the session and before the commit: the bitmap row is locked
+    for update (on databases that support it), and the cells of `before`
+    are recomputed from the task table, which then already reflects the
+    change. The first call for a user builds the whole bitmap.
+
+    Args:
+        user_id: User ID
+        before: busy_interval() of the task before the change (None on create)
+        after: busy_interval() of the task after the change (None on delete)
+    """
+    if before == after:
+        return
+
+    row = (
+        db.session.query(FreeBusyBitmap)
+        .filter(FreeBusyBitmap.user_id == user_id)
+        .with_for_update()
+        .first()
+    )
+    if row is None:
+        window = build_window(user_id)
+        db.session.add(FreeBusyBitmap(user_id=user_id, window_start=window.window_start, bits=window.to_bytes()))
+        return
+
+    window = FreeBusyWindow.from_row(row)
+    if before is not None:
+        window.clear(*before)
+        # Other tasks may share the cells just cleared; one cell of margin
+        # also catches zero-length intervals sitting on the first boundary
+        lo, hi = window.cell_range(*before)
+        for start, end in _load_busy_intervals(user_id, window.cell_start(lo) - RESOLUTION, window.cell_start(hi)):
+            window.mark(start, end)
+    if after is not None:
+        window.mark(*after)
+    row.bits = window.to_bytes()
+
+
+def reconcile_user(user_id: int, today: Optional[date] = None) -> Dict:
+    """
+    Roll a user's bitmap forward to `today` and rebuild it from the DB.
+
+    Args:
+        user_id: User ID
+        today: First day of the new window (default: today)
+
+    Returns:
+        Dict with the user ID and "drift_cells", the number of cells where
+        the stored bitmap disagreed with the DB (over the days both windows
+        cover; 0 when the user had no bitmap)
+    """
+    fresh = build_window(user_id, today)
+    row = db.session.get(FreeBusyBitmap, user_id)
+
+    drift = 0
+    if row is None:
+        db.session.add(FreeBusyBitmap(user_id=user_id, window_start=fresh.window_start, bits=fresh.to_bytes()))
+    else:
+        stored = FreeBusyWindow.from_row(row)
+        shift = (fresh.window_start - stored.window_start) // RESOLUTION
+        overlap = min(stored.cells - shift, fresh.cells) if shift >= 0 else 0
+        if overlap > 0:
+            mask = (1 << overlap) - 1
+            drift = bin(((stored.bits >> shift) ^ fresh.bits) & mask).count("1")
+        row.window_start = fresh.window_start
+        row.bits = fresh.to_bytes()
+
+    if drift:
+        logger.warning("[FREE/BUSY] User %s: stored bitmap differed from tasks in %s cells", user_id, drift)
+    return {"user_id": user_id, "drift_cells": drift}
+
+
+def reconcile_all(today: Optional[date] = None) -> List[Dict]:
+    """
+    Nightly job: reconcile_user() every user with tasks or a bitmap,
+    committing after each user.
+
+    Returns:
+        reconcile_user() results
+    """
+    user_ids = {uid for (uid,) in db.session.query(Task.user_id).distinct()}
+    user_ids |= {uid for (uid,) in db.session.query(FreeBusyBitmap.user_id)}
+
+    results = []
+    for user_id in sorted(user_ids):
+        results.append(reconcile_user(user_id, today))
+        db.session.commit()
+    return results
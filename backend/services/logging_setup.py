@@ -0,0 +1,106 @@
+"""
+Logging for the backend.
+
+Modules get a named logger with get_logger(__name__) and log with lazy
+%-style arguments (logger.debug("slot %s", start)), so a disabled
+message costs a level check and nothing else. Loops and blocks that only
+exist to produce diagnostics are wrapped in logger.isEnabledFor(DEBUG).
+
+The level comes from the LOG_LEVEL environment variable (default INFO).
+When tracing is enabled (app.config["LOG_TRACE_ENABLED"], from the
+LOG_TRACE_ENABLED environment variable, off by default), a single
+request can be traced at DEBUG level regardless of LOG_LEVEL by sending
+the TRACE_HEADER header with the value "1"; the response then carries a
+trace id that prefixes every line logged for that request. Any client
+can send the header, so only enable it where verbose logs are fine.
+"""
+
+import logging
+import os
+import threading
+import uuid
+from contextvars import ContextVar
+from typing import Optional
+
+from flask import Flask, request
+
+TRACE_HEADER = "X-Taskinator-Trace"
+TRACE_ID_HEADER = "X-Taskinator-Trace-Id"
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(trace)s%(message)s"
+
+# Trace id of the current request, None when the request isn't traced
+_trace_id: ContextVar[Optional[str]] = ContextVar("trace_id", default=None)
+
+_logger_class_lock = threading.Lock()
+
+
+class _TraceLogger(logging.Logger):
+    """Logger that is enabled for every level while a traced request runs."""
+
+    def isEnabledFor(self, level: int) -> bool:
+        if _trace_id.get() is not None and level >= logging.DEBUG:
+            return self.manager.disable < level
+        return super().isEnabledFor(level)
+
+
+class _TraceFilter(logging.Filter):
+    """Prefix records logged during a traced request with its trace id."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        trace_id = _trace_id.get()
+        record.trace = f"[trace {trace_id}] " if trace_id else ""
+        return True
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Get a module logger that honours per-request tracing.
+
+    Args:
+        name: Logger name (pass __name__)
+
+    Returns:
+        logging.Logger for the module
+    """
+    manager = logging.Logger.manager
+    with _logger_class_lock:
+        previous = manager.loggerClass
+        manager.setLoggerClass(_TraceLogger)
+        try:
+            return logging.getLogger(name)
+        finally:
+            manager.loggerClass = previous
+
+
+def init_logging(app: Flask) -> None:
+    """
+    Configure the root handler and per-request tracing for the app.
+
+    Args:
+        app: Flask application
+    """
+    level = os.getenv("LOG_LEVEL", "INFO").upper()
+    app.config.setdefault("LOG_TRACE_ENABLED", os.getenv("LOG_TRACE_ENABLED", "0") == "1")
+    logging.basicConfig(level=level, format=LOG_FORMAT)
+    for handler in logging.getLogger().handlers:
+        handler.addFilter(_TraceFilter())
+
+    @app.before_request
+    def _start_trace():
+        if app.config["LOG_TRACE_ENABLED"] and request.headers.get(TRACE_HEADER) == "1":
+            _trace_id.set(uuid.uuid4().hex[:8])
+            get_logger(__name__).debug("%s %s", request.method, request.path)
+        else:
+            _trace_id.set(None)
+
+    @app.after_request
+    def _add_trace_id(resp):
+        trace_id = _trace_id.get()
+        if trace_id:
+            resp.headers[TRACE_ID_HEADER] = trace_id
+        return resp
+
+    @app.teardown_request
+    def _end_trace(_exc):
+        _trace_id.set(None)
@@ -0,0 +1,108 @@
+"""
+Short-lived cache of slot suggestion results.
+
+The conflict-resolution modal tends to ask /api/ai/suggest the same
+question several times in a row. suggest_slots_for_user() keeps its
+recent results here so a repeated search returns without scanning.
+
+A cache key covers everything a result depends on:
+    - the user and every search parameter
+    - the current time, truncated to the minute
+    - the user's schedule_version, bumped by every task create, update,
+      delete or toggle and by preference changes
+    - the user's bn_version (stamp of the saved BN file)
+
+so a change to the schedule, preferences or BN simply makes old entries
+unreachable; they age out through LRU eviction and the TTL.
+
+The cache and the version counters live in process memory.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+# Entries are only useful while the user is looking at the same dialog
+CACHE_TTL_SECONDS = 60
+CACHE_MAX_ENTRIES = 512
+
+_versions: Dict[int, int] = {}
+_versions_lock = threading.Lock()
+
+
+def schedule_version(user_id: int) -> int:
+    """
+    Current schedule version of a user.
+
+    Args:
+        user_id: User ID
+
+    Returns:
+        Counter that changes whenever the user's tasks or preferences do
+    """
+    return _versions.get(user_id, 0)
+
+
+def bump_schedule_version(user_id: int) -> None:
+    """
+    Invalidate cached suggestions of a user (call after committing a
+    change to their tasks or preferences).
+
+    Args:
+        user_id: User ID
+    """
+    with _versions_lock:
+        _versions[user_id] = _versions.get(user_id, 0) + 1
+
+
+class SuggestionCache:
+    """
+    Thread-safe LRU cache with a per-entry time to live.
+
+    Attributes:
+        max_entries: Entries kept before the least recently used is evicted
+        ttl: Seconds an entry stays valid
+        hits: Number of lookups answered from the cache
+        misses: Number of lookups that were not
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the value stored under `key`, or None if absent or expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store `value` under `key`, evicting the least recently used entry if full."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+suggestion_cache = SuggestionCache()
@@ -0,0 +1,152 @@
+"""
+Continuation tokens for paginated slot suggestions.
+
+The first /api/ai/suggest (or /api/ai/parseTask) call returns a token
+describing where its page ended; the next call sends it back and the
+engine resumes from there instead of recomputing every earlier page.
+
+A token is stateless (signed, nothing is stored server-side) and encodes:
+    - the user it was issued to
+    - a fingerprint of the search parameters (duration, window, ...)
+    - the fingerprint of the user's busy intervals at issue time
+    - the ranking cursor (score, start, end) of the last returned slot
+    - the number of the page it leads to, and an expiry time
+
+It stops being accepted when any of these no longer match: another user,
+different search parameters, an expired token, or, most importantly,
+any change to the user's tasks (the busy fingerprint differs). Callers
+then fall back to plain page-number pagination.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+from config import app
+from services.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+# Tokens are short-lived: they only need to survive a user paging through results
+TOKEN_TTL_SECONDS = 15 * 60
+
+# Process-local fallback key (tokens then don't survive a restart, which is fine)
+_FALLBACK_KEY = os.urandom(32)
+
+
+def _signing_key() -> bytes:
+    secret = app.config.get("SECRET_KEY")
+    if secret:
+        return secret.encode() if isinstance(secret, str) else secret
+    return _FALLBACK_KEY
+
+
+def _sign(payload: bytes) -> str:
+    digest = hmac.new(_signing_key(), payload, hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest[:18]).decode().rstrip("=")
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+def query_fingerprint(**params) -> str:
+    """
+    Digest of the parameters that define a suggestion search.
+
+    Args:
+        **params: Search parameters (values are stringified, order-independent)
+
+    Returns:
+        Short hex digest
+    """
+    canonical = json.dumps({k: str(v) for k, v in params.items()}, sort_keys=True)
+    return hashlib.sha1(canonical.encode()).hexdigest()[:16]
+
+
+def issue_token(
+    user_id: int,
+    query_fp: str,
+    busy_fp: str,
+    last_suggestion: Dict,
+    next_page: int,
+) -> str:
+    """
+    Create a continuation token for the page after `last_suggestion`.
+
+    Args:
+        user_id: User the results belong to
+        query_fp: query_fingerprint() of the search
+        busy_fp: BusyIndex.fingerprint() the results were computed against
+        last_suggestion: Last suggestion of the returned page
+        next_page: Page number the token leads to
+
+    Returns:
+        Opaque URL-safe token string
+    """
+    payload = json.dumps({
+        "u": user_id,
+        "q": query_fp,
+        "b": busy_fp,
+        "c": [last_suggestion["score"], last_suggestion["scheduledStart"], last_suggestion["scheduledEnd"]],
+        "p": next_page,
+        "e": int(time.time()) + TOKEN_TTL_SECONDS,
+    }, separators=(",", ":")).encode()
+    body = base64.urlsafe_b64encode(payload).decode().rstrip("=")
+    return f"{body}.{_sign(payload)}"
+
+
+def read_token(
+    token: Optional[str],
+    user_id: int,
+    query_fp: str,
+    busy_fp: str,
+) -> Optional[Tuple[Tuple[int, str, str], int]]:
+    """
+    Validate a continuation token against the current request.
+
+    Args:
+        token: Token sent by the client (may be None/empty)
+        user_id: Requesting user
+        query_fp: query_fingerprint() of the current search
+        busy_fp: Current BusyIndex.fingerprint() of the user
+
+    Returns:
+        (rank cursor for suggest_slots_for_user(after=...), page number),
+        or None if the token is missing, malformed, expired or stale
+    """
+    if not token or not isinstance(token, str) or "." not in token:
+        return None
+
+    body, signature = token.rsplit(".", 1)
+    try:
+        payload = _b64decode(body)
+    except (ValueError, TypeError):
+        return None
+    if not hmac.compare_digest(_sign(payload), signature):
+        logger.warning("[SUGGEST TOKEN] Rejected token with bad signature")
+        return None
+
+    try:
+        data = json.loads(payload)
+        score, start, end = data["c"]
+        cursor = (-int(score), str(start), str(end))
+        page = int(data["p"])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+    if data.get("u") != user_id or data.get("q") != query_fp:
+        logger.debug("[SUGGEST TOKEN] Token does not match this search, ignoring it")
+        return None
+    if data.get("e", 0) < time.time():
+        logger.debug("[SUGGEST TOKEN] Token expired, ignoring it")
+        return None
+    if data.get("b") != busy_fp:
+        logger.debug("[SUGGEST TOKEN] Tasks changed since the token was issued, ignoring it")
+        return None
+
+    return cursor, page
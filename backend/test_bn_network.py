@@ -0,0 +1,325 @@
+"""
+Tests for the user Bayesian Network (Ai/network/bayesian).
+
+Uses a temporary BN data directory so no real bn_user_<id>.json files
+are created or modified.
+"""
+
+import itertools
+import tempfile
+import unittest
+from datetime import datetime, time, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+
+from Ai.network.bayesian import UserBayesianNetwork, BNRegistry, bn_persistence
+from Ai.network.bayesian.bn_core import BayesianNetwork, BNNode, CPT
+from Ai.network.bayesian.bn_inference import compute_node_distribution, infer_all_latent_nodes
+from Ai.network.bayesian.bn_latent import (
+    LATENT_NODES, latent_posterior, precompute_latent_table
+)
+from Ai.network.bayesian.bn_learning import (
+    map_hour_to_time_of_day, map_weekday_to_day_type, hour_of_week
+)
+
+TEST_USER_ID = 4343
+
+PREFS = SimpleNamespace(
+    workday_pref_start=time(9, 0),
+    workday_pref_end=time(17, 0),
+    focus_peak_start=time(10, 0),
+    focus_peak_end=time(12, 0),
+    days_off=[5, 6],
+    flexibility="MEDIUM",
+    deadline_behavior="ON_TIME",
+    default_duration_minutes=60,
+)
+
+
+def _obs(start: datetime, task_type: str = "Meeting", minutes: int = 60) -> dict:
+    return {
+        "user_id": TEST_USER_ID,
+        "task_type": task_type,
+        "priority": "MEDIUM",
+        "scheduled_start": start,
+        "scheduled_end": start + timedelta(minutes=minutes),
+        "duration_minutes": minutes,
+    }
+
+
+class UserBayesianNetworkTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._data_dir = patch.object(bn_persistence, "DATA_DIR", Path(self._tmp.name))
+        self._data_dir.start()
+        UserBayesianNetwork(TEST_USER_ID).initialize_from_preferences(PREFS)
+
+    def tearDown(self):
+        self._data_dir.stop()
+        self._tmp.cleanup()
+
+    def _reference_score(self, bn, task_type: str, start: datetime) -> float:
+        """Slot score computed straight from BN inference."""
+        time_dist = compute_node_distribution(bn.network, f"PreferredTimeOfDay_{task_type}")
+        day_dist = compute_node_distribution(bn.network, f"PreferredDayType_{task_type}")
+        time_prob = time_dist.get(map_hour_to_time_of_day(start.hour), 0.2)
+        day_prob = day_dist.get(map_weekday_to_day_type(start.weekday()), 0.33)
+        return max(0.0, min(10.0, (0.6 * time_prob + 0.4 * day_prob) * 10.0))
+
+    def test_score_table_matches_inference(self):
+        bn = UserBayesianNetwork(TEST_USER_ID)
+        for day in range(3):
+            bn.update_from_task(_obs(datetime(2025, 11, 24 + day, 8 + day)))
+
+        monday = datetime(2025, 11, 24)
+        for task_type in ("Meeting", "Training", "Studies"):
+            table = bn.score_table(task_type)
+            self.assertEqual(len(table), 168)
+            for h in range(168):
+                start = monday + timedelta(hours=h)
+                self.assertEqual(hour_of_week(start), h)
+                expected = self._reference_score(bn, task_type, start)
+                self.assertAlmostEqual(table[h], expected)
+                self.assertAlmostEqual(
+                    bn.predict_slot_score(task_type, start, start + timedelta(hours=1)), expected
+                )
+
+    def test_batch_scores_match_single_slot_scores(self):
+        bn = UserBayesianNetwork(TEST_USER_ID)
+        bn.update_from_task(_obs(datetime(2025, 11, 29, 19)))
+
+        starts = np.arange("2025-11-23T22:30", "2025-12-02T03:00", 37, dtype="datetime64[m]")
+        ends = starts + np.timedelta64(60, "m")
+        for task_type in ("Meeting", "Studies"):
+            scores = bn.predict_slot_scores(task_type, starts, ends)
+            expected = [
+                bn.predict_slot_score(task_type, s, e)
+                for s, e in zip(starts.astype(datetime), ends.astype(datetime))
+            ]
+            self.assertEqual(scores.tolist(), expected)
+        self.assertEqual(bn.predict_slot_scores("Meeting", starts[:0], ends[:0]).shape, (0,))
+
+    def test_score_table_rebuilt_only_on_change(self):
+        bn = UserBayesianNetwork(TEST_USER_ID)
+        table = bn.score_table("Meeting")
+        self.assertIs(bn.score_table("Meeting"), table)
+
+        bn.update_from_task(_obs(datetime(2025, 11, 25, 19)))
+        updated = bn.score_table("Meeting")
+        self.assertIsNot(updated, table)
+        self.assertIs(bn.score_table("Meeting"), updated)
+
+        bn.network.set_evidence("FocusPeakState", "EVENING")
+        self.assertIsNot(bn.score_table("Meeting"), updated)
+
+    def test_compiled_cpts_match_functions(self):
+        bn = UserBayesianNetwork(TEST_USER_ID)
+        bn.update_from_task(_obs(datetime(2025, 11, 29, 19)))
+        bn.update_from_task(_obs(datetime(2025, 11, 25, 9)))
+
+        for node in bn.network.nodes.values():
+            cpt = node.cpt
+            if cpt is None:
+                continue
+            for combo in cpt._generate_parent_combinations():
+                parents = {p.name: v for p, v in zip(node.parents, combo)}
+                for state in node.states:
+                    expected = (cpt.func(state, parents, cpt.historical_dist) if cpt.history
+                                else cpt.func(state, parents))
+                    self.assertEqual(cpt.get_probability(state, parents), expected)
+        self.assertIsNotNone(bn.network.get_node("PreferredDayType_Meeting").cpt.historical_dist)
+
+    def test_users_share_the_template_but_not_what_they_learn(self):
+        UserBayesianNetwork(TEST_USER_ID + 1).initialize_from_preferences(PREFS)
+        a = UserBayesianNetwork(TEST_USER_ID)
+        b = UserBayesianNetwork(TEST_USER_ID + 1)
+        prior = b.score_table("Meeting")
+
+        a.update_from_task(_obs(datetime(2025, 11, 29, 19)))
+        a.network.set_evidence("FocusPeakState", "EVENING")
+
+        self.assertIs(a.network.nodes["UserPersona"], b.network.nodes["UserPersona"])
+        self.assertIsNot(a.network.nodes["PreferredTimeOfDay_Meeting"], b.network.nodes["PreferredTimeOfDay_Meeting"])
+        self.assertNotEqual(a.score_table("Meeting"), prior)
+        self.assertEqual(UserBayesianNetwork(TEST_USER_ID + 1).score_table("Meeting"), prior)
+        self.assertEqual(b.network.evidence["FocusPeakState"], "MORNING")
+
+    def test_latent_table_matches_inference(self):
+        bn = UserBayesianNetwork(TEST_USER_ID)
+        self.assertEqual(precompute_latent_table(bn.network), 5 * 4 * 4 * 4 * 4 * 3)
+
+        workdays = bn.network.get_node("WorkdayWindow").states
+        for workday, focus in zip(workdays, ("MORNING", "EVENING", "NONE", "AFTERNOON", "EVENING")):
+            bn.network.set_evidence("WorkdayWindow", workday)
+            bn.network.set_evidence("FocusPeakState", focus)
+            posterior = latent_posterior(bn.network)
+            inferred = infer_all_latent_nodes(bn.network)
+            for name in LATENT_NODES:
+                self.assertEqual(posterior.states[name], inferred[name])
+                self.assertEqual(posterior.distributions[name], compute_node_distribution(bn.network, name))
+
+        # Evidence beyond Layer 1 has no table entry
+        bn.network.set_evidence("UserPersona", "WORKAHOLIC")
+        self.assertIsNone(latent_posterior(bn.network))
+
+
+class ExactInferenceTest(unittest.TestCase):
+
+    def setUp(self):
+        # A -> B, A -> C, (B, C) -> D with arbitrary normalized tables
+        self.network = BayesianNetwork()
+        a = BNNode("A", ["a0", "a1"])
+        b = BNNode("B", ["b0", "b1", "b2"], [a])
+        c = BNNode("C", ["c0", "c1"], [a])
+        d = BNNode("D", ["d0", "d1"], [b, c])
+        weights = itertools.count(1)
+        for node in (a, b, c, d):
+            cpt = CPT(node)
+            for combo in cpt._generate_parent_combinations():
+                row = [next(weights) % 5 + 1 for _ in node.states]
+                cpt.table[combo] = {s: w / sum(row) for s, w in zip(node.states, row)}
+            node.set_cpt(cpt)
+            self.network.add_node(node)
+
+    def _enumerate(self, query: str, evidence: dict) -> dict:
+        """P(query | evidence) by summing the full joint."""
+        nodes = list(self.network.nodes.values())
+        totals = dict.fromkeys(self.network.nodes[query].states, 0.0)
+        for states in itertools.product(*(n.states for n in nodes)):
+            assignment = dict(zip(self.network.nodes, states))
+            if any(assignment[k] != v for k, v in evidence.items()):
+                continue
+            p = 1.0
+            for n in nodes:
+                p *= n.cpt.get_probability(assignment[n.name], {q.name: assignment[q.name] for q in n.parents})
+            totals[assignment[query]] += p
+        total = sum(totals.values())
+        return {s: p / total for s, p in totals.items()}
+
+    def test_structure_metadata_follows_add_node(self):
+        network = self.network
+        self.assertEqual([n.name for n in network.get_children("A")], ["B", "C"])
+        self.assertEqual(network.topological_sort(), ["A", "B", "C", "D"])
+        self.assertEqual(network.parent_index()["D"], (1, 2))
+        order, key = network.topological_order(), network.structure_key()
+        self.assertIs(network.topological_order(), order)
+
+        network.add_node(BNNode("E", ["e0", "e1"], [network.nodes["D"], network.nodes["A"]]))
+        self.assertEqual([n.name for n in network.get_children("A")], ["B", "C", "E"])
+        self.assertEqual(network.topological_sort(), ["A", "B", "C", "D", "E"])
+        self.assertEqual(network.parent_index()["E"], (3, 0))
+        self.assertNotEqual(network.structure_key(), key)
+
+    def test_exact_distribution_matches_enumeration(self):
+        cases = [("D", {}), ("A", {"D": "d1"}), ("B", {"C": "c0", "D": "d0"}), ("C", {"B": "b2"})]
+        for query, evidence in cases:
+            exact = compute_node_distribution(self.network, query, evidence, exact=True)
+            expected = self._enumerate(query, evidence)
+            for state in expected:
+                self.assertAlmostEqual(exact[state], expected[state])
+
+    def test_exact_distribution_ignores_unknown_evidence_values(self):
+        cases = [("B", {"A": "whatever", "C": "c0"}), ("A", {"D": "not-a-state", "B": "b1"})]
+        for query, evidence in cases:
+            exact = compute_node_distribution(self.network, query, evidence, exact=True)
+            known = {k: v for k, v in evidence.items() if v in self.network.nodes[k].states}
+            expected = self._enumerate(query, known)
+            for state in expected:
+                self.assertAlmostEqual(exact[state], expected[state])
+
+    def test_exact_latent_states_are_posterior_modes(self):
+        inferred = infer_all_latent_nodes(self.network, {"D": "d1"}, exact=True)
+        self.assertEqual(set(inferred), {"A", "B", "C"})
+        for name, (state, prob) in inferred.items():
+            posterior = self._enumerate(name, {"D": "d1"})
+            self.assertEqual(state, max(posterior, key=posterior.get))
+            self.assertAlmostEqual(prob, posterior[state])
+
+
+class BNRegistryTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._data_dir = patch.object(bn_persistence, "DATA_DIR", Path(self._tmp.name))
+        self._data_dir.start()
+        for user_id in (TEST_USER_ID, TEST_USER_ID + 1, TEST_USER_ID + 2):
+            UserBayesianNetwork(user_id).initialize_from_preferences(PREFS)
+        self.registry = BNRegistry()
+
+    def tearDown(self):
+        self._data_dir.stop()
+        self._tmp.cleanup()
+
+    def _assert_matches_reload(self, bn):
+        fresh = UserBayesianNetwork(TEST_USER_ID)
+        for task_type in ("Meeting", "Training", "Studies"):
+            self.assertEqual(bn.score_table(task_type), fresh.score_table(task_type))
+
+    def test_network_reused_until_its_file_changes(self):
+        bn = self.registry.get(TEST_USER_ID)
+        self.assertIs(self.registry.get(TEST_USER_ID), bn)
+
+        # Another worker saves the user's BN
+        UserBayesianNetwork(TEST_USER_ID).update_from_task(_obs(datetime(2025, 11, 25, 19)))
+        reloaded = self.registry.get(TEST_USER_ID)
+        self.assertIsNot(reloaded, bn)
+        self._assert_matches_reload(reloaded)
+
+        stats = self.registry.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["invalidations"]), (1, 1, 1))
+
+    def test_mutated_network_stays_cached_and_matches_reload(self):
+        training = _obs(datetime(2025, 11, 26, 7), task_type="Training")
+        with self.registry.lease(TEST_USER_ID) as bn:
+            bn.score_table("Training")
+            for day in range(3):
+                bn.update_from_task(_obs(datetime(2025, 11, 24 + day, 8 + day)))
+            bn.update_from_task(training)
+            bn.remove_task(_obs(datetime(2025, 11, 24, 8)))
+            bn.remove_task(training)
+
+        self.assertIs(self.registry.get(TEST_USER_ID), bn)
+        self._assert_matches_reload(bn)
+
+    def test_observations_removed_by_task_id(self):
+        def obs(task_id, start, task_type="Meeting"):
+            return dict(_obs(start, task_type), task_id=task_id)
+
+        with self.registry.lease(TEST_USER_ID) as bn:
+            for day in range(4):
+                bn.update_from_task(obs(day + 1, datetime(2025, 11, 24 + day, 8 + 2 * day)))
+            bn.update_from_task(obs(9, datetime(2025, 11, 29, 7), "Studies"))
+
+            # The same task, moved and retyped; the Studies history empties
+            bn.replace_task(obs(9, datetime(2025, 11, 29, 7), "Studies"),
+                            obs(9, datetime(2025, 11, 30, 20), "Training"))
+            bn.remove_task(obs(2, datetime(2025, 11, 1, 12)))
+            bn.remove_task(obs(42, datetime(2025, 11, 24, 8)))
+
+        self.assertEqual(sorted(bn.observations), [1, 3, 4, 9])
+        self.assertNotIn("Studies", bn.statistics.task_type_counts)
+        self._assert_matches_reload(bn)
+        fresh = UserBayesianNetwork(TEST_USER_ID)
+        self.assertEqual(bn.statistics.hour_counts_by_type, fresh.statistics.hour_counts_by_type)
+
+    def test_least_recently_used_networks_are_evicted(self):
+        registry = BNRegistry(max_entries=2)
+        first = registry.get(TEST_USER_ID)
+        registry.get(TEST_USER_ID + 1)
+        registry.get(TEST_USER_ID)
+        registry.get(TEST_USER_ID + 2)
+        self.assertIs(registry.get(TEST_USER_ID), first)
+        self.assertEqual(registry.stats()["evictions"], 1)
+
+        tiny = BNRegistry(max_bytes=1)
+        tiny.get(TEST_USER_ID)
+        tiny.get(TEST_USER_ID + 1)
+        self.assertEqual(tiny.stats()["entries"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+"""
+Tests for the materialized free/busy bitmap (services/free_busy.py).
+"""
+
+import random
+import unittest
+from unittest.mock import patch
+from datetime import date, datetime, time, timedelta
+
+from config import app, db
+from models import User, Task, FreeBusyBitmap
+from Ai.suggest_slots import BusyIndex
+from routes.tasks import TimeConflictError, create_task_with_bn_update
+from services.free_busy import (
+    FreeBusyWindow, busy_interval, is_slot_free, load_window, note_task_change, reconcile_user,
+)
+
+TEST_USER_ID = 4343
+DAY = datetime(2026, 3, 2)
+
+
+class FreeBusyWindowTest(unittest.TestCase):
+
+    def test_clear_cells_prove_a_range_free(self):
+        rng = random.Random(7)
+        for _ in range(200):
+            busy = []
+            for _ in range(rng.randrange(6)):
+                start = DAY + timedelta(minutes=rng.randrange(24 * 60), seconds=rng.randrange(60))
+                busy.append((start, start + timedelta(minutes=rng.choice((0, 1, 7, 30, 95)))))
+            window = FreeBusyWindow(DAY, days=1)
+            for start, end in busy:
+                window.mark(start, end)
+            index = BusyIndex(busy)
+
+            for _ in range(20):
+                start = DAY + timedelta(minutes=rng.randrange(23 * 60))
+                end = start + timedelta(minutes=rng.choice((0, 5, 15, 60)))
+                if window.is_clear(start, end):
+                    self.assertTrue(index.is_free(start, end), (busy, start, end))
+
+    def test_ranges_outside_the_window_are_never_clear(self):
+        window = FreeBusyWindow(DAY, days=1)
+        self.assertTrue(window.is_clear(DAY + timedelta(hours=9), DAY + timedelta(hours=10)))
+        self.assertFalse(window.is_clear(DAY - timedelta(hours=1), DAY + timedelta(hours=1)))
+        self.assertFalse(window.is_clear(DAY + timedelta(hours=23), DAY + timedelta(hours=25)))
+
+    def test_bytes_round_trip(self):
+        window = FreeBusyWindow(DAY)
+        window.mark(DAY + timedelta(days=40, hours=9), DAY + timedelta(days=40, hours=10))
+        row = FreeBusyBitmap(user_id=1, window_start=DAY, bits=window.to_bytes())
+        self.assertEqual(FreeBusyWindow.from_row(row).bits, window.bits)
+
+
+class FreeBusyHooksTest(unittest.TestCase):
+
+    def setUp(self):
+        self.ctx = app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self._cleanup()
+        db.session.add(User(id=TEST_USER_ID, firebase_uid="free_busy_test_uid", email="free_busy@example.com"))
+        db.session.commit()
+        self.today = date.today()
+        self.base = datetime.combine(self.today + timedelta(days=1), time(9, 0))
+
+    def tearDown(self):
+        self._cleanup()
+        db.session.remove()
+        self.ctx.pop()
+
+    def _cleanup(self):
+        FreeBusyBitmap.query.filter_by(user_id=TEST_USER_ID).delete()
+        Task.query.filter_by(user_id=TEST_USER_ID).delete()
+        User.query.filter_by(id=TEST_USER_ID).delete()
+        db.session.commit()
+
+    def _task(self, start: datetime, minutes: int) -> Task:
+        return Task(
+            title="busy", task_type="Meeting", priority="MEDIUM", status="TODO", user_id=TEST_USER_ID,
+            duration_minutes=minutes, scheduled_start=start, scheduled_end=start + timedelta(minutes=minutes),
+        )
+
+    def _create(self, task: Task) -> Task:
+        db.session.add(task)
+        note_task_change(TEST_USER_ID, None, busy_interval(task))
+        db.session.commit()
+        return task
+
+    def test_create_and_delete_keep_shared_cells_busy(self):
+        first = self._create(self._task(self.base, 32))                             # 09:00-09:32
+        self._create(self._task(self.base + timedelta(minutes=33), 30))             # 09:33-10:03
+        window = load_window(TEST_USER_ID)
+        self.assertFalse(window.is_clear(self.base, self.base + timedelta(minutes=5)))
+        self.assertTrue(window.is_clear(self.base + timedelta(minutes=65), self.base + timedelta(hours=2)))
+
+        before = busy_interval(first)
+        db.session.delete(first)
+        note_task_change(TEST_USER_ID, before, None)
+        db.session.commit()
+
+        window = load_window(TEST_USER_ID)
+        self.assertTrue(window.is_clear(self.base, self.base + timedelta(minutes=30)))
+        # 09:30-09:35 is shared with the remaining task
+        self.assertFalse(window.is_clear(self.base + timedelta(minutes=30), self.base + timedelta(minutes=35)))
+        self.assertEqual(reconcile_user(TEST_USER_ID, self.today)["drift_cells"], 0)
+
+    def test_reconcile_reports_writes_that_bypassed_the_hooks(self):
+        self._create(self._task(self.base, 60))
+        db.session.add(self._task(self.base + timedelta(hours=3), 60))
+        db.session.commit()
+
+        result = reconcile_user(TEST_USER_ID, self.today)
+        db.session.commit()
+        self.assertEqual(result["drift_cells"], 12)
+        window = load_window(TEST_USER_ID)
+        self.assertFalse(window.is_clear(self.base + timedelta(hours=3), self.base + timedelta(hours=4)))
+
+    def test_slot_check_reads_the_bitmap_before_the_tasks(self):
+        self._create(self._task(self.base, 32))                                     # 09:00-09:32
+        with patch.object(BusyIndex, "for_user", wraps=BusyIndex.for_user) as for_user:
+            self.assertTrue(is_slot_free(TEST_USER_ID, self.base + timedelta(hours=2), self.base + timedelta(hours=3)))
+            self.assertEqual(for_user.call_count, 0)
+
+            # 09:30-09:35 is "maybe busy": the task table has the answer
+            self.assertTrue(is_slot_free(TEST_USER_ID, self.base + timedelta(minutes=33), self.base + timedelta(hours=1)))
+            self.assertFalse(is_slot_free(TEST_USER_ID, self.base + timedelta(minutes=30), self.base + timedelta(hours=1)))
+            self.assertEqual(for_user.call_count, 2)
+
+    def test_create_guard_checks_tasks_despite_a_clear_bitmap(self):
+        # A concurrent write whose bitmap update was lost
+        self._create(self._task(self.base + timedelta(hours=5), 30))
+        db.session.add(self._task(self.base, 60))
+        db.session.commit()
+        self.assertTrue(load_window(TEST_USER_ID).is_clear(self.base, self.base + timedelta(hours=1)))
+
+        with self.assertRaises(TimeConflictError):
+            create_task_with_bn_update(
+                TEST_USER_ID, "double booked", "Meeting", "MEDIUM", "TODO",
+                scheduled_start=self.base, scheduled_end=self.base + timedelta(hours=1),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
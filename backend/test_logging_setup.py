@@ -0,0 +1,48 @@
+"""
+Tests for module loggers and per-request tracing (services/logging_setup.py).
+"""
+
+import logging
+import unittest
+
+from flask import Flask
+
+from services.logging_setup import get_logger, init_logging, TRACE_HEADER, TRACE_ID_HEADER
+
+
+class LoggingSetupTest(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        init_logging(self.app)
+        self.logger = get_logger("test_logging_setup.module")
+        self.logger.setLevel(logging.INFO)
+
+        @self.app.route("/ping")
+        def ping():
+            self.enabled = self.logger.isEnabledFor(logging.DEBUG)
+            self.logger.debug("slot %s", "10:00")
+            return "ok"
+
+    def test_debug_is_off_without_trace(self):
+        resp = self.app.test_client().get("/ping")
+        self.assertFalse(self.enabled)
+        self.assertNotIn(TRACE_ID_HEADER, resp.headers)
+
+    def test_trace_header_ignored_unless_enabled(self):
+        resp = self.app.test_client().get("/ping", headers={TRACE_HEADER: "1"})
+        self.assertFalse(self.enabled)
+        self.assertNotIn(TRACE_ID_HEADER, resp.headers)
+
+    def test_trace_header_enables_debug_for_that_request(self):
+        self.app.config["LOG_TRACE_ENABLED"] = True
+        with self.assertLogs("test_logging_setup.module", level=logging.DEBUG) as logs:
+            resp = self.app.test_client().get("/ping", headers={TRACE_HEADER: "1"})
+        self.assertTrue(self.enabled)
+        self.assertIn(TRACE_ID_HEADER, resp.headers)
+        self.assertEqual(logs.records[0].getMessage(), "slot 10:00")
+        self.assertFalse(self.logger.isEnabledFor(logging.DEBUG))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,434 @@
+"""
+Regression tests for the slot suggestion engine (Ai/suggest_slots.py).
+
+Runs suggest_slots_for_user() against the app database with a throwaway
+user and a temporary BN data directory, so no real BN files are touched.
+"""
+
+import tempfile
+import unittest
+from datetime import datetime, time, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+from config import app, db
+from models import User, UserPreferences, Task
+from Ai.network.bayesian import bn_persistence
+from Ai.network.inference import initialize_bn_for_user
+from Ai.suggest_slots import (
+    suggest_slots_for_user, suggest_batch_for_user, next_free_slot, ScoringSession, BusyIndex, _overlaps, _within,
+    _is_day_off, _load_busy_intervals, _scan_windows, _gap_scan, OccupancyGrid, _TopK, rank_key,
+)
+import Ai.suggest_slots as suggest_slots
+from services.suggestion_cache import suggestion_cache, bump_schedule_version
+
+TEST_USER_ID = 4242
+
+
+class SuggestSlotsEngineTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._data_dir = patch.object(bn_persistence, "DATA_DIR", Path(self._tmp.name))
+        self._data_dir.start()
+
+        self.ctx = app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self._cleanup()
+
+        db.session.add(User(
+            id=TEST_USER_ID,
+            firebase_uid="suggest_engine_test_uid",
+            email="suggest_engine@example.com",
+        ))
+        db.session.add(UserPreferences(
+            user_id=TEST_USER_ID,
+            days_off=[5, 6],
+            workday_pref_start=time(9, 0),
+            workday_pref_end=time(17, 0),
+            focus_peak_start=time(10, 0),
+            focus_peak_end=time(12, 0),
+            default_duration_minutes=60,
+            deadline_behavior="ON_TIME",
+            flexibility="MEDIUM",
+        ))
+        db.session.commit()
+        initialize_bn_for_user(TEST_USER_ID)
+        suggestion_cache.clear()
+
+    def tearDown(self):
+        self._cleanup()
+        db.session.remove()
+        self.ctx.pop()
+        self._data_dir.stop()
+        self._tmp.cleanup()
+
+    def _cleanup(self):
+        Task.query.filter_by(user_id=TEST_USER_ID).delete()
+        UserPreferences.query.filter_by(user_id=TEST_USER_ID).delete()
+        User.query.filter_by(id=TEST_USER_ID).delete()
+        db.session.commit()
+
+    def _add_task(self, start: datetime, minutes: int = 60):
+        db.session.add(Task(
+            title="busy",
+            task_type="Meeting",
+            priority="MEDIUM",
+            status="TODO",
+            user_id=TEST_USER_ID,
+            duration_minutes=minutes,
+            scheduled_start=start,
+            scheduled_end=start + timedelta(minutes=minutes),
+        ))
+        db.session.commit()
+
+    def _assert_single_bn_load(self, **kwargs):
+        before = ScoringSession.total_loads
+        suggestions = suggest_slots_for_user(user_id=TEST_USER_ID, **kwargs)
+        self.assertLessEqual(ScoringSession.total_loads - before, 1)
+        return suggestions
+
+    def test_duration_only_loads_bn_once(self):
+        suggestions = self._assert_single_bn_load(duration_minutes=60)
+        self.assertTrue(suggestions)
+
+    def test_window_scan_loads_bn_once(self):
+        start = datetime.combine(datetime.now().date() + timedelta(days=1), time(0, 0))
+        self._add_task(start.replace(hour=10))
+        suggestions = self._assert_single_bn_load(
+            duration_minutes=45,
+            window_start=start,
+            window_end=start + timedelta(days=6),
+            page=2,
+        )
+        self.assertTrue(suggestions)
+
+    def test_preferred_time_paths_load_bn_once(self):
+        start = datetime.combine(datetime.now().date() + timedelta(days=1), time(0, 0))
+        self._assert_single_bn_load(
+            duration_minutes=60,
+            window_start=start,
+            window_end=start + timedelta(days=6),
+            preferred_time_of_day=(10, 0),
+        )
+        self._assert_single_bn_load(duration_minutes=60, preferred_time_of_day=(11, 0))
+        self._assert_single_bn_load(
+            duration_minutes=60,
+            preferred_start=start.replace(hour=10),
+            explicit_datetime_given=True,
+            explicit_date_requested=True,
+        )
+
+    def test_auto_scan_stops_expanding_the_horizon(self):
+        now = datetime.now()
+        stats = {}
+        lazy = suggest_slots_for_user(
+            user_id=TEST_USER_ID, duration_minutes=60, window_start=now, horizon_days=90,
+            stats=stats, use_cache=False,
+        )
+        eager = suggest_slots_for_user(
+            user_id=TEST_USER_ID, duration_minutes=60, window_start=now,
+            window_end=now + timedelta(days=90), use_cache=False,
+        )
+        self.assertEqual(lazy, eager)
+        self.assertLess(stats["days_examined"], 30)
+
+    def test_scoring_session_counts_scan_work(self):
+        scorer = ScoringSession(TEST_USER_ID, "Meeting")
+        suggestions = suggest_slots_for_user(
+            user_id=TEST_USER_ID, duration_minutes=60, scorer=scorer, use_cache=False,
+        )
+        self.assertTrue(suggestions)
+        self.assertGreaterEqual(scorer.scored, len(suggestions))
+        # Weekend days are off and weekdays share bounds: once the page is
+        # full, the remaining days can't beat it
+        self.assertGreater(scorer.days_pruned, 0)
+
+    def test_on_candidate_sees_every_returned_slot(self):
+        seen = []
+        suggestions = suggest_slots_for_user(
+            user_id=TEST_USER_ID, duration_minutes=60, window_start=datetime.now(),
+            on_candidate=seen.append, use_cache=False,
+        )
+        self.assertTrue(suggestions)
+        for suggestion in suggestions:
+            self.assertIn(suggestion, seen)
+
+    def test_window_scan_returns_best_of_whole_window(self):
+        start = datetime.combine(datetime.now().date() + timedelta(days=1), time(0, 0))
+        kwargs = dict(duration_minutes=60, window_start=start, window_end=start + timedelta(days=13))
+        for page in (1, 3):
+            suggestions = suggest_slots_for_user(user_id=TEST_USER_ID, page=page, **kwargs)
+            with patch.object(suggest_slots, "_TopK", lambda k, after=None, on_accept=None: _TopK(10 ** 9, after, on_accept)):
+                exhaustive = suggest_slots_for_user(user_id=TEST_USER_ID, page=page, use_cache=False, **kwargs)
+            self.assertTrue(suggestions)
+            self.assertEqual(suggestions, exhaustive)
+
+    def test_continuation_cursor_matches_page_numbers(self):
+        start = datetime.combine(datetime.now().date() + timedelta(days=1), time(0, 0))
+        kwargs = dict(duration_minutes=60, window_start=start, window_end=start + timedelta(days=6))
+        pages = [suggest_slots_for_user(user_id=TEST_USER_ID, page=p, **kwargs) for p in (1, 2, 3)]
+        after = None
+        for expected in pages:
+            got = suggest_slots_for_user(user_id=TEST_USER_ID, after=after, **kwargs)
+            self.assertEqual(got, expected)
+            after = rank_key(got[-1])
+
+    def test_continuation_cursor_matches_page_numbers_on_grid_engine(self):
+        start = datetime.combine(datetime.now().date() + timedelta(days=1), time(0, 0))
+        self._add_task(start + timedelta(days=2, hours=10))
+        kwargs = dict(duration_minutes=60, window_start=start, window_end=start + timedelta(days=40))
+        self.assertTrue(suggest_slots._use_grid_engine(start, kwargs["window_end"], timedelta(hours=1), timedelta(minutes=15)))
+        after = None
+        for page in range(1, 6):
+            expected = suggest_slots_for_user(user_id=TEST_USER_ID, page=page, **kwargs)
+            got = suggest_slots_for_user(user_id=TEST_USER_ID, after=after, **kwargs)
+            self.assertTrue(got)
+            self.assertEqual(got, expected)
+            after = rank_key(got[-1])
+
+    def test_time_only_slots_respect_allowed_windows(self):
+        tomorrow = datetime.combine(datetime.now().date() + timedelta(days=1), time(0, 0))
+        self._add_task(tomorrow.replace(hour=10))
+        suggestions = suggest_slots_for_user(
+            user_id=TEST_USER_ID, duration_minutes=60, preferred_time_of_day=(10, 0), page_size=50,
+        )
+        self.assertTrue(suggestions)
+        for s in suggestions:
+            start = datetime.fromisoformat(s["scheduledStart"])
+            end = datetime.fromisoformat(s["scheduledEnd"])
+            self.assertEqual((start.hour, start.minute), (10, 0))
+            self.assertFalse(_is_day_off(start, [5, 6]))
+            self.assertTrue(_within(end.time(), time(9, 0), time(17, 0)))
+            self.assertNotEqual(start.date(), tomorrow.date())
+
+    def test_repeated_search_served_from_cache_until_schedule_changes(self):
+        kwargs = dict(user_id=TEST_USER_ID, duration_minutes=60)
+        first = suggest_slots_for_user(**kwargs)
+        self.assertTrue(first)
+
+        before = ScoringSession.total_loads
+        hits = suggestion_cache.hits
+        self.assertEqual(suggest_slots_for_user(**kwargs), first)
+        self.assertEqual(suggestion_cache.hits, hits + 1)
+        self.assertEqual(ScoringSession.total_loads, before)
+
+        # Booking the best slot bumps the schedule version: no stale result
+        best = datetime.fromisoformat(first[0]["scheduledStart"])
+        self._add_task(best)
+        bump_schedule_version(TEST_USER_ID)
+        after = suggest_slots_for_user(**kwargs)
+        self.assertEqual(suggestion_cache.hits, hits + 1)
+        self.assertNotIn(first[0]["scheduledStart"], [s["scheduledStart"] for s in after])
+
+    def test_busy_intervals_bounded_by_range(self):
+        day = datetime(2025, 11, 24)
+        self._add_task(day - timedelta(days=400))                  # old history
+        self._add_task(day.replace(hour=23), minutes=120)           # runs into the range
+        self._add_task(day + timedelta(days=1, hours=10))
+        self._add_task(day + timedelta(days=3, hours=10))           # after the range
+        db.session.add(Task(title="legacy", user_id=TEST_USER_ID, duration_minutes=30,
+                            due_date=day + timedelta(days=1, hours=14)))
+        db.session.commit()
+
+        everything = _load_busy_intervals(TEST_USER_ID)
+        self.assertEqual(len(everything), 5)
+
+        start, end = day + timedelta(days=1), day + timedelta(days=2)
+        bounded = _load_busy_intervals(TEST_USER_ID, start, end)
+        self.assertEqual(sorted(bounded), sorted(
+            (s, e) for s, e in everything if _overlaps(s, e, start, end)
+        ))
+        self.assertIn((start.replace(hour=14), start.replace(hour=14, minute=30)), bounded)
+
+    def test_busy_intervals_include_long_tasks_started_before_the_range(self):
+        day = datetime(2025, 11, 24)
+        trip = day - timedelta(days=8)
+        self._add_task(trip, minutes=10 * 24 * 60)                  # 10-day trip into the range
+        db.session.add(Task(title="legacy trip", user_id=TEST_USER_ID, duration_minutes=10 * 24 * 60,
+                            due_date=trip))
+        db.session.add(Task(title="legacy", user_id=TEST_USER_ID, duration_minutes=60,
+                            due_date=day - timedelta(days=3)))     # ended before the range
+        db.session.commit()
+
+        trip_end = trip + timedelta(days=10)
+        self.assertEqual(_load_busy_intervals(TEST_USER_ID, day, day + timedelta(days=1)),
+                         [(trip, trip_end), (trip, trip_end)])
+        self.assertFalse(BusyIndex.for_user(TEST_USER_ID, day, day + timedelta(days=1)).is_free(
+            day.replace(hour=10), day.replace(hour=11)))
+
+    def test_batch_assigns_non_overlapping_slots_by_priority(self):
+        start = datetime.combine(datetime.now().date() + timedelta(days=1), time(0, 0))
+        window = dict(window_start=start, window_end=start + timedelta(days=2))
+        tasks = [
+            dict(duration_minutes=30, task_type="Studies", priority="LOW", **window),
+            dict(duration_minutes=90, task_type="Meeting", priority="HIGH", **window),
+            dict(duration_minutes=60, task_type="Training", priority="HIGH", **window),
+        ]
+        before = ScoringSession.total_loads
+        results = suggest_batch_for_user(user_id=TEST_USER_ID, tasks=tasks)
+        self.assertLessEqual(ScoringSession.total_loads - before, 1)
+
+        self.assertEqual([r["index"] for r in results], [0, 1, 2])
+        self.assertTrue(all(r["status"] == "scheduled" for r in results))
+        slots = [(datetime.fromisoformat(r["scheduledStart"]), datetime.fromisoformat(r["scheduledEnd"]))
+                 for r in results]
+        for i, a in enumerate(slots):
+            for b in slots[i + 1:]:
+                self.assertFalse(_overlaps(*a, *b))
+
+        # The first placed task gets exactly what a single request would suggest
+        alone = suggest_slots_for_user(user_id=TEST_USER_ID, page_size=1, duration_minutes=90,
+                                       task_type="Meeting", **window)
+        self.assertEqual(results[1]["scheduledStart"], alone[0]["scheduledStart"])
+
+    def test_batch_respects_time_budget(self):
+        results = suggest_batch_for_user(
+            user_id=TEST_USER_ID,
+            tasks=[dict(duration_minutes=60, priority="MEDIUM")] * 2,
+            time_budget_ms=-1,
+        )
+        self.assertEqual([r["status"] for r in results], ["time_budget"] * 2)
+
+    def _first_fit(self, after: datetime, minutes: int, accept=lambda t: True) -> datetime:
+        """Step through the 5-minute grid until a slot is free, allowed and accepted."""
+        busy = BusyIndex.for_user(TEST_USER_ID)
+        duration = timedelta(minutes=minutes)
+        t = datetime.combine(after.date(), time())
+        while True:
+            if (t >= after and not _is_day_off(t, [5, 6]) and _within(t.time(), time(9), time(17))
+                    and _within((t + duration).time(), time(9), time(17)) and busy.is_free(t, t + duration)
+                    and accept(t)):
+                return t
+            t += timedelta(minutes=5)
+
+    def test_next_free_is_the_earliest_fit(self):
+        day = datetime.combine(datetime.now().date() + timedelta(days=2), time(0, 0))
+        self._add_task(day.replace(hour=9), 180)
+        self._add_task(day.replace(hour=12, minute=7), 53)
+        self._add_task(day.replace(hour=13, minute=30), 30)
+
+        slot = next_free_slot(user_id=TEST_USER_ID, duration_minutes=45, after=day)
+        self.assertEqual(slot["scheduledStart"], self._first_fit(day, 45).isoformat())
+
+    def test_next_free_above_threshold_scores_only_the_result(self):
+        day = datetime.combine(datetime.now().date() + timedelta(days=2), time(0, 0))
+        self._add_task(day.replace(hour=10), 60)
+        scorer = ScoringSession(TEST_USER_ID, "Meeting")
+        best = max(scorer.day_bound((day + timedelta(days=i)).date()) for i in range(7))
+
+        with patch.object(ScoringSession, "score", autospec=True, side_effect=ScoringSession.score) as score:
+            slot = next_free_slot(user_id=TEST_USER_ID, duration_minutes=60, after=day, min_score=best)
+        self.assertEqual(score.call_count, 1)
+        self.assertGreaterEqual(slot["score"], best)
+        expected = self._first_fit(
+            day, 60, lambda t: int(round(scorer.score(t, t + timedelta(minutes=60)))) >= best
+        )
+        self.assertEqual(slot["scheduledStart"], expected.isoformat())
+
+
+class TopKTest(unittest.TestCase):
+
+    def test_matches_full_sort(self):
+        day = datetime(2025, 11, 24)
+        scores = [3, 7, 7, 1, 9, 7, 3, 9, 0, 7, 5, 5]
+        candidates = [
+            {"scheduledStart": (day + timedelta(minutes=15 * i)).isoformat(), "score": score}
+            for i, score in enumerate(scores)
+        ]
+        key = lambda c: (-c["score"], c["scheduledStart"])
+        for k in (1, 3, 5, 20):
+            top = _TopK(k)
+            for candidate in candidates:
+                top.push(candidate)
+            self.assertEqual(sorted(top.items(), key=key), sorted(candidates, key=key)[:k])
+
+
+class BusyIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        day = datetime(2025, 11, 24)
+        self.at = lambda h, m=0: day.replace(hour=h, minute=m)
+        self.busy = [
+            (self.at(9), self.at(10)),
+            (self.at(9, 30), self.at(11)),   # overlaps the first
+            (self.at(11), self.at(12)),      # touches the merged block
+            (self.at(14), self.at(15)),
+        ]
+        self.index = BusyIndex(self.busy)
+
+    def test_matches_linear_overlap_check(self):
+        for h in range(7, 17):
+            for m in (0, 15, 30, 45):
+                for dur in (15, 30, 60, 120):
+                    start = self.at(h, m)
+                    end = start + timedelta(minutes=dur)
+                    expected = not any(_overlaps(start, end, b, e) for b, e in self.busy)
+                    self.assertEqual(self.index.is_free(start, end), expected, (start, end))
+
+    def test_next_free(self):
+        self.assertEqual(self.index.next_free(self.at(8)), self.at(8))
+        self.assertEqual(self.index.next_free(self.at(9, 45)), self.at(12))
+        self.assertEqual(self.index.next_free(self.at(12)), self.at(12))
+        self.assertEqual(self.index.next_free(self.at(14)), self.at(15))
+
+
+class GapScanTest(unittest.TestCase):
+    """_gap_scan() must yield exactly what a fixed-step cursor scan yields."""
+
+    def setUp(self):
+        self.day = datetime(2025, 11, 24, 7, 10)
+        at = lambda d, h, m=0: datetime(2025, 11, 24 + d, h, m)
+        self.busy = [
+            (at(0, 9), at(0, 10, 20)),
+            (at(0, 13), at(0, 13, 45)),
+            (at(1, 8, 25), at(1, 12)),
+            (at(2, 0), at(2, 23, 59)),
+            (at(3, 16), at(4, 9)),
+        ]
+        self.index = BusyIndex(self.busy)
+
+    def _cursor_scan(self, start, end, duration, step, days_off, window):
+        found = []
+        cursor = start
+        while cursor < end:
+            slot_end = cursor + duration
+            if (not _is_day_off(cursor, days_off)
+                    and _within(cursor.time(), *window) and _within(slot_end.time(), *window)
+                    and not any(_overlaps(cursor, slot_end, b, e) for b, e in self.busy)):
+                found.append(cursor)
+            cursor += step
+        return found
+
+    def test_matches_cursor_scan(self):
+        end = self.day + timedelta(days=6)
+        for window in [(time(8, 25), time(17)), (time(0), time(23, 59)), (time(22), time(6))]:
+            for dur in (15, 45, 90, 600):
+                for step in (5, 15, 30):
+                    duration, step_td = timedelta(minutes=dur), timedelta(minutes=step)
+                    windows = _scan_windows(self.day, end - timedelta(microseconds=1),
+                                            duration, [6], [window])
+                    self.assertEqual(
+                        list(_gap_scan(self.index, windows, duration, self.day, step_td)),
+                        self._cursor_scan(self.day, end, duration, step_td, [6], window),
+                        (window, dur, step),
+                    )
+
+    def test_occupancy_grid_matches_gap_scan(self):
+        end = self.day + timedelta(days=6)
+        for origin in (self.day, self.day + timedelta(seconds=42)):
+            for dur in (15, 45, 600):
+                for only_at in (None, (9, 25), (11, 0)):
+                    duration, step = timedelta(minutes=dur), timedelta(minutes=15)
+                    windows = list(_scan_windows(origin, end - timedelta(microseconds=1),
+                                                 duration, [6], [(time(8, 25), time(17))]))
+                    expected = list(_gap_scan(self.index, windows, duration, origin, step,
+                                              only_at, snap_time=time(8, 25)))
+                    grid = OccupancyGrid(self.index, origin, end + duration)
+                    offsets = grid.free_starts(windows, duration, step, only_at, time(8, 25))
+                    self.assertEqual(grid.datetimes(offsets), expected, (origin, dur, only_at))
+
+
+if __name__ == "__main__":
+    unittest.main()
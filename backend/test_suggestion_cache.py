@@ -0,0 +1,106 @@
+"""
+Tests for the suggestion result cache (services/suggestion_cache.py).
+"""
+
+import tempfile
+import time
+import unittest
+from datetime import time as dtime
+from pathlib import Path
+from unittest.mock import patch
+
+from config import app, db
+from models import User, UserPreferences, Task
+from Ai.network.bayesian import bn_persistence
+from Ai.network.inference import initialize_bn_for_user
+from routes import register_blueprints
+from services import suggestion_cache
+from services.suggestion_cache import SuggestionCache, schedule_version, bump_schedule_version
+
+TEST_USER_ID = 4444
+TEST_UID = "suggestion_cache_test_uid"
+
+
+class SuggestionCacheTest(unittest.TestCase):
+
+    def test_lru_eviction(self):
+        cache = SuggestionCache(max_entries=2, ttl=60)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)  # "b" is now least recently used
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((cache.get("a"), cache.get("c")), (1, 3))
+        self.assertEqual(len(cache), 2)
+
+    def test_entries_expire(self):
+        cache = SuggestionCache(ttl=60)
+        cache.put("a", [1])
+        later = time.monotonic() + 61
+        with patch.object(suggestion_cache.time, "monotonic", return_value=later):
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+
+    def test_bump_changes_only_that_user(self):
+        before = schedule_version(1), schedule_version(2)
+        bump_schedule_version(1)
+        self.assertEqual((schedule_version(1), schedule_version(2)), (before[0] + 1, before[1]))
+
+
+
+class SuggestRouteCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._data_dir = patch.object(bn_persistence, "DATA_DIR", Path(self._tmp.name))
+        self._data_dir.start()
+        self._auth = patch("services.auth_middleware.verify_firebase_token",
+                           return_value={"uid": TEST_UID, "email": "suggestion_cache@example.com"})
+        self._auth.start()
+        if "ai" not in app.blueprints:
+            register_blueprints(app)
+
+        self.ctx = app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self._cleanup()
+        db.session.add(User(id=TEST_USER_ID, firebase_uid=TEST_UID, email="suggestion_cache@example.com"))
+        db.session.add(UserPreferences(
+            user_id=TEST_USER_ID, days_off=[5, 6],
+            workday_pref_start=dtime(9, 0), workday_pref_end=dtime(17, 0),
+            focus_peak_start=dtime(10, 0), focus_peak_end=dtime(12, 0),
+            default_duration_minutes=60, deadline_behavior="ON_TIME", flexibility="MEDIUM",
+        ))
+        db.session.commit()
+        initialize_bn_for_user(TEST_USER_ID)
+        suggestion_cache.suggestion_cache.clear()
+
+    def tearDown(self):
+        self._cleanup()
+        db.session.remove()
+        self.ctx.pop()
+        self._auth.stop()
+        self._data_dir.stop()
+        self._tmp.cleanup()
+
+    def _cleanup(self):
+        Task.query.filter_by(user_id=TEST_USER_ID).delete()
+        UserPreferences.query.filter_by(user_id=TEST_USER_ID).delete()
+        User.query.filter_by(id=TEST_USER_ID).delete()
+        db.session.commit()
+
+    def test_repeated_auto_and_week_requests_hit_the_cache(self):
+        cache = suggestion_cache.suggestion_cache
+        client = app.test_client()
+        for strategy in ("auto", "week"):
+            body = {"durationMinutes": 60, "strategy": strategy}
+            first = client.post("/api/ai/suggest", json=body, headers={"Authorization": "Bearer x"})
+            hits = cache.hits
+            second = client.post("/api/ai/suggest", json=body, headers={"Authorization": "Bearer x"})
+            self.assertEqual(first.status_code, 200)
+            self.assertEqual(cache.hits, hits + 1, strategy)
+            self.assertEqual(second.get_json()["suggestions"], first.get_json()["suggestions"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+"""
+Tests for continuation tokens (services/suggestion_tokens.py).
+"""
+
+import time
+import unittest
+from unittest.mock import patch
+
+from services import suggestion_tokens
+from services.suggestion_tokens import query_fingerprint, issue_token, read_token
+from Ai.suggest_slots import rank_key
+
+LAST = {"scheduledStart": "2025-11-25T10:15:00", "scheduledEnd": "2025-11-25T11:15:00", "score": 7}
+
+
+class SuggestionTokenTest(unittest.TestCase):
+
+    def setUp(self):
+        self.query_fp = query_fingerprint(duration=60, strategy="week", page_size=3)
+        self.token = issue_token(1, self.query_fp, "busy-v1", LAST, 2)
+
+    def test_round_trip(self):
+        self.assertEqual(read_token(self.token, 1, self.query_fp, "busy-v1"), (rank_key(LAST), 2))
+
+    def test_invalid_when_tasks_change(self):
+        self.assertIsNone(read_token(self.token, 1, self.query_fp, "busy-v2"))
+
+    def test_invalid_for_other_user_or_search(self):
+        self.assertIsNone(read_token(self.token, 2, self.query_fp, "busy-v1"))
+        other = query_fingerprint(duration=90, strategy="week", page_size=3)
+        self.assertIsNone(read_token(self.token, 1, other, "busy-v1"))
+
+    def test_rejects_tampering_and_garbage(self):
+        body, signature = self.token.rsplit(".", 1)
+        forged = issue_token(1, self.query_fp, "busy-v1", dict(LAST, score=1), 9).split(".")[0]
+        self.assertIsNone(read_token(f"{forged}.{signature}", 1, self.query_fp, "busy-v1"))
+        for garbage in (None, "", "abc", "abc.def", "!!!.???"):
+            self.assertIsNone(read_token(garbage, 1, self.query_fp, "busy-v1"))
+
+    def test_expires(self):
+        with patch.object(suggestion_tokens.time, "time", return_value=time.time() + suggestion_tokens.TOKEN_TTL_SECONDS + 1):
+            self.assertIsNone(read_token(self.token, 1, self.query_fp, "busy-v1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
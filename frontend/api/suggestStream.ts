@@ -0,0 +1,90 @@
+// api/suggestStream.ts
+import { getIdToken } from "../firebase/firebaseClient";
+
+// Same base URL resolution as axiosClient (axios can't read a streamed body in the browser)
+const API_BASE = (process.env.NEXT_PUBLIC_API_URL || "http://localhost:5000").replace(/\/$/, "");
+
+export type StreamedSuggestion = {
+  scheduledStart: string;
+  scheduledEnd: string;
+  score?: number;
+  exceedsWorkHours?: boolean;
+};
+
+/**
+ * Insert a provisional candidate into the best `size` suggestions so far,
+ * ordered like the backend ranks them (score desc, then start).
+ */
+export const mergeProvisional = (
+  current: StreamedSuggestion[],
+  candidate: StreamedSuggestion,
+  size = 3
+): StreamedSuggestion[] =>
+  [
+    ...current.filter(
+      (s) => s.scheduledStart !== candidate.scheduledStart || s.scheduledEnd !== candidate.scheduledEnd
+    ),
+    candidate,
+  ]
+    .sort((a, b) => (b.score ?? 0) - (a.score ?? 0) || a.scheduledStart.localeCompare(b.scheduledStart))
+    .slice(0, size);
+
+/**
+ * POST /ai/suggest/stream (same body as /ai/suggest) and read its
+ * Server-Sent Events. `onCandidate` receives provisional slots while the
+ * backend is still scanning; the promise resolves with the final ranked
+ * page, i.e. the /ai/suggest response body.
+ */
+export const streamSuggestions = async (
+  body: Record<string, unknown>,
+  onCandidate: (candidate: StreamedSuggestion) => void
+): Promise<any> => {
+  const token = await getIdToken();
+  const res = await fetch(`${API_BASE}/api/ai/suggest/stream`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+      Accept: "text/event-stream",
+      ...(token ? { Authorization: `Bearer ${token}` } : {}),
+    },
+    body: JSON.stringify(body),
+  });
+  if (!res.ok || !res.body) {
+    throw new Error(`Suggestion stream failed (${res.status})`);
+  }
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let end;
+    while ((end = buffer.indexOf("\n\n")) !== -1) {
+      const message = buffer.slice(0, end);
+      buffer = buffer.slice(end + 2);
+
+      let event = "message";
+      let data = "";
+      for (const line of message.split("\n")) {
+        if (line.startsWith("event: ")) event = line.slice(7);
+        else if (line.startsWith("data: ")) data += line.slice(6);
+      }
+      if (!data) continue;
+
+      const payload = JSON.parse(data);
+      if (event === "candidate") {
+        onCandidate(payload);
+      } else if (event === "page") {
+        reader.cancel();
+        return payload;
+      } else if (event === "error") {
+        reader.cancel();
+        throw new Error(payload.message || `Suggestion stream failed (${payload.status})`);
+      }
+    }
+  }
+  throw new Error("Suggestion stream ended without a result");
+};
@@ -30,6 +30,8 @@ interface SuggestionSelectionModalProps {
   suggestions: Suggestion[];
   onSelect: (suggestion: Suggestion) => void;
   isLoading?: boolean;
+  // True while streamed suggestions are provisional (search still running)
+  isStreaming?: boolean;
   metadata?: TaskMetadata | null;
   onRefresh?: (preservedConstraints?: {scheduledStart?: string; strategy?: string; durationMinutes?: number}) => void;
   page?: number;
@@ -47,6 +49,7 @@ const SuggestionSelectionModal: React.FC<SuggestionSelectionModalProps> = ({
   suggestions,
   onSelect,
   isLoading = false,
+  isStreaming = false,
   metadata = null,
   onRefresh,
   page = 1,
@@ -179,6 +182,14 @@ const SuggestionSelectionModal: React.FC<SuggestionSelectionModalProps> = ({
           </div>
         )}
 
+        {/* Provisional results notice while the search is still streaming */}
+        {isStreaming && (
+          <div className="flex items-center gap-2 mb-2 text-sm opacity-70">
+            <span className="loading loading-spinner loading-xs"></span>
+            <span>Still searching - better slots may appear</span>
+          </div>
+        )}
+
         {/* Suggestions List */}
         <div className="space-y-3 min-h-[420px] relative">
           {isLoading && (
@@ -305,7 +316,7 @@ const SuggestionSelectionModal: React.FC<SuggestionSelectionModalProps> = ({
                     console.log("[MODAL DEBUG] Calling handleNextPageInternal");
                     handleNextPageInternal();
                   }}
-                  disabled={isLoading || !hasMorePages || suggestions.length < 3}
+                  disabled={isLoading || isStreaming || !hasMorePages || suggestions.length < 3}
                   title={
                     !hasMorePages || suggestions.length < 3 
                       ? "No more suggestions available" 
@@ -6,6 +6,7 @@ import { fetchTasks, createTask, updateTask } from "@/utils/taskUtils";
 import { FuzzySearchBar } from "@/components/searchBar";
 import NaturalLanguageTaskInput from "@/components/nlpInput";
 import apiClient from "@/api/axiosClient";
+import { streamSuggestions, mergeProvisional } from "@/api/suggestStream";
 import OnboardingModal from "@/components/OnboardingModal";
 import ConflictResolverModal from "@/components/ConflictResolverModal";
 import SuggestionSelectionModal from "@/components/SuggestionSelectionModal";
@@ -25,7 +26,9 @@ const MainPage: React.FC = () => {
   const [conflictSuggestions, setConflictSuggestions] = useState<any[]>([]);
   const [pendingTaskData, setPendingTaskData] = useState<TaskFormData | null>(null);
   const [isLoadingSuggestions, setIsLoadingSuggestions] = useState(false);
+  const [isStreamingSuggestions, setIsStreamingSuggestions] = useState(false);
   const [suggestionPage, setSuggestionPage] = useState(1);
+  const [suggestionToken, setSuggestionToken] = useState<string | null>(null);
   const [currentStrategy, setCurrentStrategy] = useState<"day" | "week" | "month" | "auto" | null>(null);
 
   useEffect(() => {
@@ -156,33 +159,44 @@ const handleTaskSubmit = async (taskData: TaskFormData) => {
         referenceDate: referenceDate,
       });
 
-      const res = await apiClient.post("/ai/suggest?page=1", {
+      // Stream the search: show provisional slots as soon as the backend
+      // finds them, then replace them with the final ranked page
+      setConflictSuggestions([]);
+      const data = await streamSuggestions({
         durationMinutes: duration,
         task_type: pendingTaskData.task_type || "Meeting",
         strategy: strategy,
         referenceDate: referenceDate,
+        page: 1,
         pageSize: 3,  // UX: Show top 3 scored suggestions per page
         // CRITICAL FIX: Pass task date fields for backend extraction
         scheduledStart: (pendingTaskData as any).scheduledStart || null,
         scheduledEnd: (pendingTaskData as any).scheduledEnd || null,
         dueDate: pendingTaskData.dueDate || null,
+      }, (candidate) => {
+        setConflictSuggestions((prev) => mergeProvisional(prev, candidate));
+        setIsLoadingSuggestions(false);
+        setIsStreamingSuggestions(true);
+        setShowSuggestionModal(true);
       });
 
-      const data = res.data;
       if (Array.isArray(data?.suggestions) && data.suggestions.length > 0) {
         setConflictSuggestions(data.suggestions);
+        setSuggestionToken(data.nextToken ?? null);
         setShowSuggestionModal(true);
       } else {
+        setShowSuggestionModal(false);
         alert("No available time slots found for the selected strategy.");
         setShowConflictModal(true); // Re-show conflict modal
       }
     } catch (err: any) {
       console.error("Failed to fetch conflict resolution suggestions:", err);
-      console.error("Error details:", err?.response?.data);
+      setShowSuggestionModal(false);
       alert("Failed to fetch alternative time slots. Please try again.");
       setShowConflictModal(true); // Re-show conflict modal
     } finally {
       setIsLoadingSuggestions(false);
+      setIsStreamingSuggestions(false);
     }
   };
 
@@ -270,6 +284,8 @@ const handleTaskSubmit = async (taskData: TaskFormData) => {
         referenceDate: referenceDate,
         page: nextPage,  // CRITICAL: Pass page in body, not query string
         pageSize: 3,  // UX: Show top 3 scored suggestions per page
+        // Resume after the current page (backend falls back to `page` if the token is stale)
+        continuationToken: suggestionToken,
         // CRITICAL FIX: Pass task date fields for backend extraction
         scheduledStart: (pendingTaskData as any).scheduledStart || null,
         scheduledEnd: (pendingTaskData as any).scheduledEnd || null,
@@ -280,6 +296,7 @@ const handleTaskSubmit = async (taskData: TaskFormData) => {
       if (Array.isArray(data?.suggestions) && data.suggestions.length > 0) {
         // FIX: REPLACE suggestions for strict pagination (don't append)
         setConflictSuggestions(data.suggestions);
+        setSuggestionToken(data.nextToken ?? null);
         setSuggestionPage(nextPage);
         console.log("[DEBUG] Loaded page", nextPage, "with", data.suggestions.length, "suggestions");
       } else {
@@ -344,6 +361,7 @@ const handleTaskSubmit = async (taskData: TaskFormData) => {
       const data = res.data;
       if (Array.isArray(data?.suggestions) && data.suggestions.length > 0) {
         setConflictSuggestions(data.suggestions);
+        setSuggestionToken(data.nextToken ?? null);
         setSuggestionPage(prevPage);
         console.log("[DEBUG] Loaded page", prevPage, "with", data.suggestions.length, "suggestions");
       } else {
@@ -463,6 +481,7 @@ const handleTaskSubmit = async (taskData: TaskFormData) => {
         suggestions={conflictSuggestions}
         onSelect={handleSuggestionSelect}
         isLoading={isLoadingSuggestions}
+        isStreaming={isStreamingSuggestions}
         metadata={pendingTaskData ? {
           title: pendingTaskData.title,
           task_type: pendingTaskData.task_type,